@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada sin interfaz gráfica (no importa Qt)
+
+Ejemplos:
+    python3 cli.py https://youtu.be/xxxx -o ~/Descargas
+    python3 cli.py -i urls.txt --format video --quality 720p -o ~/Videos -j 4
+    python3 cli.py -i urls.txt --ssh-config "Servidor Casa" --remote-folder /srv/media
+
+Cada evento se escribe en stdout como una línea JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from config import APP_NAME, APP_VERSION, DEFAULT_DOWNLOAD_FOLDER, VIDEO_QUALITIES
+from download.downloader import YouTubeDownloader
+from download.job_queue import DownloadJob, DownloadQueue, JOB_DONE, JOB_FAILED
+from download.pipeline import JobProcessor, PipelineReporter, STAGE_DOWNLOAD
+from download.progress import ProgressHook
+from download.transcription_service import get_transcription_service
+from utils.app_settings import AppSettings
+from utils.config_manager import SSHConfigManager
+from utils.download_archive import get_download_archive
+from utils.validators import InputValidator
+
+
+class JsonLinesReporter(PipelineReporter):
+    """Escribe mensajes y progreso como líneas JSON (una por evento)"""
+
+    def __init__(self, stream=None, min_interval=0.5):
+        """
+        Inicializa el reporter
+
+        Args:
+            stream: Flujo de salida (por defecto stdout)
+            min_interval: Segundos mínimos entre eventos de progreso de un mismo trabajo
+                (los cambios de porcentaje a 0 o 100 siempre se escriben)
+        """
+        self.stream = stream or sys.stdout
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._hooks = {}
+        self._last_progress = {}
+
+    def emit(self, event, **fields):
+        """Escribe un evento"""
+        record = {'event': event, 'time': round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def message(self, text, message_type="info"):
+        self.emit('message', type=message_type, text=text)
+
+    def progress(self, job, percent, text):
+        now = time.time()
+        last_time, last_percent = self._last_progress.get(job.job_id, (0, None))
+        if percent == last_percent and percent not in (0, 100):
+            return
+        if now - last_time < self.min_interval and percent not in (0, 100):
+            return
+        self._last_progress[job.job_id] = (now, percent)
+        self.emit('progress', job_id=job.job_id, percent=percent, text=text)
+
+    def progress_hook(self, job):
+        with self._lock:
+            if job.job_id not in self._hooks:
+                self._hooks[job.job_id] = ProgressHook(
+                    lambda percent, text: self.progress(job, percent, text)
+                )
+            return self._hooks[job.job_id]
+
+    def job_changed(self, job):
+        """Evento de cambio de estado de un trabajo"""
+        if job is None:
+            return
+        self.emit('job', **job.to_dict())
+        if job.status in (JOB_DONE, JOB_FAILED):
+            with self._lock:
+                self._hooks.pop(job.job_id, None)
+            self._last_progress.pop(job.job_id, None)
+
+
+def read_urls(args):
+    """
+    Reúne las URLs de la línea de comandos y del archivo de URLs
+
+    Returns:
+        list: URLs sin líneas vacías ni comentarios
+    """
+    urls = list(args.urls)
+    if args.input_file:
+        if args.input_file == '-':
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.input_file, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        urls.extend(line.strip() for line in lines
+                    if line.strip() and not line.strip().startswith('#'))
+    return urls
+
+
+def build_ssh_config(args):
+    """
+    Construye la configuración SSH a partir de una configuración guardada
+    y/o de los argumentos
+
+    Returns:
+        dict: Configuración SSH o None si no se pidió destino SSH
+    """
+    if not (args.ssh_config or args.ssh_host):
+        return None
+
+    ssh_config = {}
+    if args.ssh_config:
+        saved = SSHConfigManager().get_config(args.ssh_config)
+        if not saved:
+            raise SystemExit(f"No existe la configuración SSH guardada: {args.ssh_config}")
+        ssh_config.update({
+            'host': saved.get('host'),
+            'port': int(saved.get('port', 22)),
+            'username': saved.get('username'),
+            'password': saved.get('password') or None,
+            'key_file': saved.get('key_file') or None,
+            'remote_folder': saved.get('remote_folder'),
+        })
+
+    overrides = {
+        'host': args.ssh_host,
+        'port': args.ssh_port,
+        'username': args.ssh_user,
+        'key_file': args.ssh_key,
+        'remote_folder': args.remote_folder,
+    }
+    ssh_config.update({k: v for k, v in overrides.items() if v is not None})
+    if args.ssh_password_env:
+        ssh_config['password'] = os.environ.get(args.ssh_password_env)
+    ssh_config.setdefault('port', 22)
+
+    missing = [k for k in ('host', 'username', 'remote_folder') if not ssh_config.get(k)]
+    if missing:
+        raise SystemExit(f"Faltan datos SSH: {', '.join(missing)}")
+    return ssh_config
+
+
+def parse_args(argv=None):
+    """Define y procesa los argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description=f"{APP_NAME} {APP_VERSION} - modo sin interfaz gráfica"
+    )
+    parser.add_argument('urls', nargs='*', help="URLs a descargar (vídeos, listas o canales)")
+    parser.add_argument('-i', '--input-file', help="Archivo con una URL por línea ('-' para stdin)")
+    parser.add_argument('-o', '--output', default=None,
+                        help=f"Carpeta local de destino (por defecto {DEFAULT_DOWNLOAD_FOLDER})")
+    parser.add_argument('-f', '--format', choices=('audio', 'video'), default='audio',
+                        help="Formato de salida (audio = MP3, video = MP4)")
+    parser.add_argument('-q', '--quality', choices=VIDEO_QUALITIES, default=VIDEO_QUALITIES[0],
+                        help="Calidad del vídeo")
+    parser.add_argument('-t', '--transcribe', action='store_true',
+                        help="Transcribir el audio (solo audio con destino local); se usan los "
+                             "subtítulos de la plataforma si los hay y si no, Whisper")
+    parser.add_argument('--force-whisper', action='store_true',
+                        help="Transcribir siempre con Whisper aunque haya subtítulos")
+    parser.add_argument('--transcript-only', action='store_true',
+                        help="Generar solo la transcripción, sin guardar el audio (destino local)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Descargas simultáneas (por defecto, el valor guardado en la configuración)")
+
+    archive = parser.add_argument_group("archivo de descargas")
+    archive.add_argument('--no-archive', action='store_true',
+                         help="No omitir ni registrar contenido ya descargado")
+    archive.add_argument('--archive-import', metavar='FILE',
+                         help="Importar un archivo --download-archive de yt-dlp antes de empezar")
+    archive.add_argument('--archive-export', metavar='FILE',
+                         help="Exportar el archivo de descargas en formato yt-dlp al terminar")
+
+    ssh = parser.add_argument_group("destino SSH")
+    ssh.add_argument('--ssh-config', metavar='NAME', help="Usar una configuración SSH guardada")
+    ssh.add_argument('--ssh-host')
+    ssh.add_argument('--ssh-port', type=int)
+    ssh.add_argument('--ssh-user')
+    ssh.add_argument('--ssh-key', metavar='FILE')
+    ssh.add_argument('--ssh-password-env', metavar='VAR',
+                     help="Variable de entorno que contiene la contraseña SSH")
+    ssh.add_argument('--remote-folder')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal del modo sin interfaz"""
+    args = parse_args(argv)
+    # stdout es solo para las líneas JSON
+    YouTubeDownloader.set_console_output(False)
+    urls = read_urls(args)
+    if not urls and not args.archive_export:
+        print("No se indicó ninguna URL", file=sys.stderr)
+        return 2
+
+    for url in urls:
+        is_valid, error_msg = InputValidator.validate_url(url)
+        if not is_valid:
+            print(f"{error_msg}: {url}", file=sys.stderr)
+            return 2
+
+    ssh_config = build_ssh_config(args)
+    use_ssh = ssh_config is not None
+    if args.transcript_only and use_ssh:
+        print("--transcript-only solo admite destino local", file=sys.stderr)
+        return 2
+    is_audio = args.format == 'audio' or args.transcript_only
+    quality = None if is_audio else args.quality
+    output_folder = ssh_config['remote_folder'] if use_ssh else (args.output or DEFAULT_DOWNLOAD_FOLDER)
+
+    if not use_ssh:
+        is_valid, error_msg = InputValidator.validate_folder(output_folder)
+        if not is_valid:
+            print(error_msg, file=sys.stderr)
+            return 2
+
+    reporter = JsonLinesReporter()
+    archive = None if args.no_archive else get_download_archive()
+    if archive and args.archive_import:
+        imported = archive.import_file(args.archive_import)
+        reporter.message(f"Importadas {imported} entradas al archivo de descargas", "info")
+
+    workers = args.jobs or AppSettings().get_max_concurrent_downloads()
+    processor = JobProcessor(
+        reporter,
+        archive=archive,
+        stage_limits={STAGE_DOWNLOAD: {'workers': workers, 'max_pending': 0}}
+    )
+    download_queue = DownloadQueue(stages=processor.build_stages(), on_change=reporter.job_changed)
+
+    def make_job(entry_url):
+        return DownloadJob(entry_url, output_folder, is_audio, quality, use_ssh, ssh_config,
+                           args.transcribe and is_audio and not use_ssh, archive is not None,
+                           args.force_whisper, args.transcript_only)
+
+    for url in urls:
+        entries = YouTubeDownloader.iter_entries(url, archive.contains if archive else None)
+        download_queue.submit_iter(entries, make_job, source=url)
+
+    try:
+        download_queue.wait()
+    except KeyboardInterrupt:
+        reporter.message("Interrumpido por el usuario", "warning")
+        download_queue.shutdown()
+        return 130
+    finally:
+        # Los procesos de transcripción no son daemon: sin esto la salida los esperaría
+        get_transcription_service().shutdown(wait=False)
+
+    counts = download_queue.counts()
+    reporter.emit('summary', done=counts[JOB_DONE], failed=counts[JOB_FAILED])
+
+    if archive and args.archive_export:
+        exported = archive.export_file(args.archive_export)
+        reporter.message(f"Exportadas {exported} entradas a {args.archive_export}", "info")
+
+    return 1 if counts[JOB_FAILED] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
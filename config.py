@@ -4,6 +4,7 @@
 Configuración de la aplicación
 """
 
+import os
 from pathlib import Path
 
 # Configuración de la aplicación
@@ -111,6 +112,122 @@ VIDEO_QUALITIES = [
     "240p"
 ]
 
+# Cola de descargas: número de trabajos que se ejecutan a la vez
+MAX_CONCURRENT_DOWNLOADS = 3
+
+# Caché de metadatos (~/.youtube_downloader/metadata_cache.db)
+METADATA_CACHE_TTL = 3 * 3600  # segundos (las URLs de formatos caducan)
+METADATA_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Transcripción en procesos aparte (cada uno con su modelo Whisper en caché).
+# Un proceso que se cae (p. ej. por falta de memoria) se reemplaza y el
+# trabajo se reintenta TRANSCRIBE_CRASH_RETRIES veces.
+TRANSCRIBE_WORKERS = 2  # procesos de transcripción
+TRANSCRIBE_TORCH_THREADS = max(1, (os.cpu_count() or 2) // TRANSCRIBE_WORKERS)  # hilos de torch por proceso
+TRANSCRIBE_CRASH_RETRIES = 1
+
+# Audios largos: se dividen en tramos cortando en silencios y los tramos se
+# transcriben en paralelo en los procesos del servicio
+TRANSCRIBE_LONG_AUDIO_SECONDS = 20 * 60  # a partir de esta duración
+TRANSCRIBE_MIN_CHUNK_SECONDS = 5 * 60  # duración mínima de un tramo
+TRANSCRIBE_CHUNKS_PER_WORKER = 2  # tramos por proceso (reparte mejor la carga)
+TRANSCRIBE_SILENCE_NOISE_DB = -35  # nivel considerado silencio
+TRANSCRIBE_SILENCE_MIN_SECONDS = 0.5  # duración mínima de un silencio
+TRANSCRIBE_CUT_SEARCH_SECONDS = 60  # distancia máxima del corte a su posición ideal
+
+# Origen de la transcripción: "auto" usa los subtítulos de la plataforma en el
+# idioma pedido (manuales y, si se permite, automáticos) y solo ejecuta
+# Whisper si no hay; "whisper" ejecuta siempre Whisper
+TRANSCRIBE_SOURCE = "auto"
+TRANSCRIBE_USE_AUTO_CAPTIONS = True
+TRANSCRIBE_SUBTITLE_FORMATS = ("json3", "vtt", "srt")  # por orden de preferencia
+
+# Trabajos de solo transcripción: el formato de audio más pequeño que sigue
+# siendo adecuado para Whisper (que trabaja a 16 kHz mono) se decodifica
+# directamente a PCM, sin descargar el archivo ni convertirlo a MP3.
+# abr>=? acepta también formatos sin tasa conocida; los segmentos DASH no
+# los puede leer ffmpeg directamente.
+TRANSCRIBE_ONLY_FORMAT = (
+    "worstaudio[abr>=?32][protocol!=http_dash_segments]"
+    "/worstaudio[protocol!=http_dash_segments]"
+    "/worst[protocol!=http_dash_segments]"
+)
+
+# Etapas del procesamiento: trabajos simultáneos y cola máxima de cada una.
+# La cola de subida es pequeña para que, si el servidor va lento, las
+# descargas esperen en vez de llenar el disco local.
+PIPELINE_STAGES = {
+    "extract": {"workers": 4, "max_pending": 0},
+    "download": {"workers": MAX_CONCURRENT_DOWNLOADS, "max_pending": 0},
+    "upload": {"workers": 2, "max_pending": 2},
+    "transcribe": {"workers": TRANSCRIBE_WORKERS, "max_pending": 4},
+}
+
+# Transmisión directa a SSH (sin archivo temporal local)
+STREAM_TO_SSH = True
+STREAM_BLOCK_SIZE = 1024 * 1024  # bytes por bloque
+STREAM_PIPE_BLOCKS = 16  # bloques máximos en memoria entre descarga y subida
+
+# Conexiones SSH compartidas (una sesión autenticada por servidor y usuario)
+SSH_POOL_IDLE_TIMEOUT = 300  # segundos sin uso antes de cerrar la sesión
+SSH_POOL_KEEPALIVE = 30  # segundos entre keepalives
+SSH_POOL_HEALTH_CHECK_AFTER = 15  # segundos sin uso antes de comprobar la sesión al reutilizarla
+SSH_POOL_MAX_CHANNELS = 8  # canales por sesión (OpenSSH admite 10 por defecto)
+
+# Subidas SFTP en tubería. En vuelo puede haber hasta
+# SFTP_PACKET_SIZE * SFTP_MAX_IN_FLIGHT bytes sin confirmar (limitado también
+# por la ventana que anuncie el servidor); en enlaces con mucha latencia
+# conviene subir SFTP_MAX_IN_FLIGHT.
+SFTP_WINDOW_SIZE = 16 * 1024 * 1024  # ventana del canal (bytes que el servidor puede enviarnos)
+SFTP_MAX_PACKET_SIZE = 32768  # paquete máximo del canal
+SFTP_PACKET_SIZE = 32768  # bytes por petición de escritura
+SFTP_MAX_IN_FLIGHT = 64  # peticiones de escritura sin confirmar
+SFTP_READ_BLOCK_SIZE = 8 * 1024 * 1024  # bytes del archivo local mapeados/leídos a la vez
+
+# Subida segmentada: los archivos grandes se dividen en rangos que se
+# escriben a la vez, cada uno por su propia conexión (o canal)
+SFTP_SEGMENT_THRESHOLD = 256 * 1024 * 1024  # bytes; por debajo se usa un solo canal
+SFTP_SEGMENTS = 4  # rangos (y canales) simultáneos
+SFTP_SEGMENT_SEPARATE_SESSIONS = True  # una conexión TCP por rango (si no, canales de la misma)
+
+# Subidas reanudables: se escribe en "<nombre>.part" y se renombra al terminar.
+# Si ya existe un .part, se comprueba el hash de su último tramo y se continúa
+# desde ahí.
+SFTP_PART_SUFFIX = ".part"
+SFTP_RESUME_CHECK_BYTES = 1024 * 1024  # bytes del tramo final que se comparan
+SFTP_UPLOAD_RETRIES = 3  # intentos de subida por trabajo (cada uno continúa el anterior)
+
+# Verificación de integridad: SHA-256 por bloques calculado mientras se sube,
+# comparado con sha256sum en el servidor. Solo se reenvían los bloques que no
+# coinciden.
+SFTP_VERIFY_BLOCK_SIZE = 64 * 1024 * 1024  # bytes por bloque verificado
+SFTP_VERIFY_RETRIES = 2  # reenvíos de bloques que no coinciden
+SFTP_REQUIRE_VERIFICATION = True  # fallar si el servidor no puede calcular el hash
+
+# Índice remoto de contenido: archivo JSON en la carpeta remota que relaciona
+# cada archivo con su contenido (clave del medio y SHA-256), para no volver a
+# descargar ni subir lo que ya está en el servidor. Se guarda una copia en
+# ~/.youtube_downloader/remote_manifests/ y se reconcilia con el listado de la
+# carpeta cuando los archivos cambian por otros medios.
+REMOTE_MANIFEST_ENABLED = True
+REMOTE_MANIFEST_NAME = ".youtube_downloader_manifest.json"
+REMOTE_MANIFEST_TTL = 60  # segundos que se reutiliza el índice sin volver a listar la carpeta
+
+# Explorador de carpetas remotas
+SSH_BROWSER_CACHE_TTL = 30  # segundos que se reutiliza el listado de una carpeta
+SSH_BROWSER_BATCH_SIZE = 200  # filas que se añaden al árbol de una vez
+SSH_BROWSER_PREFETCH_LIMIT = 20  # subcarpetas visibles que se listan por adelantado
+SSH_SEARCH_MAX_DEPTH = 8  # niveles bajo la carpeta actual en los que se busca
+SSH_SEARCH_MAX_RESULTS = 2000  # la búsqueda se detiene al llegar a este número
+SSH_SEARCH_WALK_WORKERS = 4  # canales SFTP simultáneos si el servidor no tiene find
+SSH_SEARCH_CACHE_TTL = 300  # segundos que se reutilizan los resultados de una búsqueda
+
+# Caché de modelos Whisper del proceso: se cargan una vez y se descargan
+# (el menos usado primero) si se supera el presupuesto de memoria o si pasan
+# WHISPER_MODEL_IDLE_TIMEOUT segundos sin usarse
+WHISPER_MODEL_RAM_BUDGET = 4 * 1024 * 1024 * 1024  # bytes
+WHISPER_MODEL_IDLE_TIMEOUT = 600  # segundos
+
 # Configuración de audio
 AUDIO_QUALITY = "192"  # kbps
 AUDIO_CODEC = "mp3"
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades de audio con ffmpeg para transcribir: duración, silencios,
+división en tramos y decodificación a PCM en memoria
+"""
+
+import math
+import os
+import re
+import subprocess
+from typing import List, Optional, Tuple
+
+from config import (
+    TRANSCRIBE_SILENCE_NOISE_DB, TRANSCRIBE_SILENCE_MIN_SECONDS, TRANSCRIBE_CUT_SEARCH_SECONDS
+)
+
+
+# Formato que espera Whisper: mono, 16 kHz
+SAMPLE_RATE = 16000
+# Archivos PCM en bruto: muestras de 16 bits
+PCM_SAMPLE_BYTES = 2
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """
+    Duración de un archivo de audio
+
+    Returns:
+        float: Segundos, o None si ffprobe no está disponible o falla
+    """
+    try:
+        completed = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+            capture_output=True, text=True, timeout=60
+        )
+        return float(completed.stdout.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def detect_silences(audio_path: str, noise_db: float = TRANSCRIBE_SILENCE_NOISE_DB,
+                    min_silence: float = TRANSCRIBE_SILENCE_MIN_SECONDS) -> List[Tuple[float, float]]:
+    """
+    Detecta los silencios de un archivo con el filtro silencedetect de ffmpeg
+
+    Args:
+        audio_path: Ruta al archivo de audio
+        noise_db: Nivel por debajo del cual se considera silencio (dB)
+        min_silence: Duración mínima de un silencio (segundos)
+
+    Returns:
+        list: [(inicio, fin), ...] en segundos; vacía si ffmpeg falla
+    """
+    try:
+        completed = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-nostdin', '-vn', '-i', audio_path,
+             # Analizar a baja resolución basta para encontrar pausas y es más rápido
+             '-af', f'aresample=8000,silencedetect=noise={noise_db}dB:d={min_silence}',
+             '-f', 'null', '-'],
+            capture_output=True, text=True, errors='replace'
+        )
+    except OSError:
+        return []
+
+    silences = []
+    start = None
+    for line in completed.stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(duration: float, silences: List[Tuple[float, float]], parts: int,
+                search_window: float = TRANSCRIBE_CUT_SEARCH_SECONDS) -> List[Tuple[float, float]]:
+    """
+    Divide la duración en tramos de tamaño parecido cortando en silencios
+
+    Cada corte se hace en el centro del silencio más cercano a su posición
+    ideal (a menos de search_window segundos); si no hay ninguno, se corta
+    en la posición ideal.
+
+    Returns:
+        list: [(inicio, fin), ...] contiguos que cubren toda la duración
+    """
+    parts = max(1, int(parts))
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    cuts = []
+    previous = 0.0
+    for index in range(1, parts):
+        target = duration * index / parts
+        candidates = [m for m in midpoints if previous < m < duration and abs(m - target) <= search_window]
+        cut = min(candidates, key=lambda m: abs(m - target)) if candidates else target
+        if cut > previous:
+            cuts.append(cut)
+            previous = cut
+
+    bounds = [0.0] + cuts + [duration]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i + 1] > bounds[i]]
+
+
+def load_audio_range(audio_path: str, start: float = 0.0, duration: Optional[float] = None):
+    """
+    Decodifica (un tramo de) un archivo a PCM mono de 16 kHz en memoria
+
+    Args:
+        audio_path: Ruta al archivo (o URL que ffmpeg sepa leer)
+        start: Segundo inicial
+        duration: Segundos a decodificar (None = hasta el final)
+
+    Returns:
+        numpy.ndarray: Muestras float32 en [-1, 1], listas para model.transcribe
+
+    Raises:
+        RuntimeError: si ffmpeg falla
+    """
+    import numpy as np
+
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin']
+    if start:
+        cmd += ['-ss', f'{start:.3f}']
+    cmd += ['-i', audio_path]
+    if duration is not None:
+        cmd += ['-t', f'{duration:.3f}']
+    cmd += ['-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-']
+
+    completed = subprocess.run(cmd, capture_output=True)
+    if completed.returncode != 0:
+        error = completed.stderr.decode(errors='replace').strip()
+        raise RuntimeError(f"ffmpeg no pudo decodificar el audio: {error[-500:]}")
+    return np.frombuffer(completed.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_to_pcm(source: str, pcm_path: str, headers: Optional[dict] = None) -> float:
+    """
+    Decodifica un archivo o una URL a PCM mono de 16 kHz en bruto (s16le)
+
+    El resultado se lee después con load_pcm_range mediante memoria mapeada,
+    sin volver a decodificar ni crear un archivo comprimido intermedio.
+
+    Args:
+        source: Ruta o URL (http, m3u8) que ffmpeg sepa leer
+        pcm_path: Archivo de destino
+        headers: Cabeceras HTTP para la URL (las de yt-dlp)
+
+    Returns:
+        float: Duración decodificada en segundos
+
+    Raises:
+        RuntimeError: si ffmpeg falla
+    """
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y']
+    if headers:
+        cmd += ['-headers', ''.join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd += ['-i', source, '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', pcm_path]
+
+    try:
+        completed = subprocess.run(cmd, capture_output=True)
+    except OSError as e:
+        raise RuntimeError(f"No se pudo ejecutar ffmpeg: {str(e)}")
+    if completed.returncode != 0:
+        error = completed.stderr.decode(errors='replace').strip()
+        raise RuntimeError(f"ffmpeg no pudo decodificar el audio: {error[-500:]}")
+    return pcm_duration(pcm_path)
+
+
+def pcm_duration(pcm_path: str) -> float:
+    """Duración en segundos de un archivo PCM de decode_to_pcm"""
+    return os.path.getsize(pcm_path) / (PCM_SAMPLE_BYTES * SAMPLE_RATE)
+
+
+def load_pcm_range(pcm_path: str, start: float = 0.0, end: Optional[float] = None):
+    """
+    Lee un tramo de un archivo PCM de decode_to_pcm
+
+    El archivo se mapea en memoria: solo se leen las páginas del tramo, y
+    varios procesos que leen el mismo archivo comparten la caché del sistema.
+
+    Returns:
+        numpy.ndarray: Muestras float32 en [-1, 1], listas para model.transcribe
+    """
+    import numpy as np
+
+    samples = np.memmap(pcm_path, dtype=np.int16, mode='r')
+    first = int(start * SAMPLE_RATE)
+    last = len(samples) if end is None else min(len(samples), int(math.ceil(end * SAMPLE_RATE)))
+    return samples[first:last].astype(np.float32) / 32768.0
+
+
+def detect_silences_pcm(pcm_path: str, noise_db: float = TRANSCRIBE_SILENCE_NOISE_DB,
+                        min_silence: float = TRANSCRIBE_SILENCE_MIN_SECONDS,
+                        frame_seconds: float = 0.05) -> List[Tuple[float, float]]:
+    """
+    Detecta los silencios de un archivo PCM de decode_to_pcm
+
+    Equivale a detect_silences pero sin otra pasada de ffmpeg: se mide la
+    energía de ventanas de frame_seconds sobre el archivo mapeado.
+
+    Returns:
+        list: [(inicio, fin), ...] en segundos
+    """
+    import numpy as np
+
+    samples = np.memmap(pcm_path, dtype=np.int16, mode='r')
+    frame = max(1, int(frame_seconds * SAMPLE_RATE))
+    frames = len(samples) // frame
+    threshold = 32768.0 * 10 ** (noise_db / 20)
+
+    # Por bloques, para no convertir el archivo entero a float a la vez
+    quiet = np.empty(frames, dtype=bool)
+    block = 4096
+    for first in range(0, frames, block):
+        count = min(block, frames - first)
+        chunk = samples[first * frame:(first + count) * frame].astype(np.float32).reshape(count, frame)
+        quiet[first:first + count] = np.sqrt(np.mean(chunk * chunk, axis=1)) < threshold
+
+    silences = []
+    edges = np.diff(np.concatenate(([0], quiet.astype(np.int8), [0])))
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if (end - start) * frame_seconds >= min_silence:
+            silences.append((start * frame / SAMPLE_RATE, end * frame / SAMPLE_RATE))
+    return silences
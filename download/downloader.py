@@ -5,13 +5,40 @@ Lógica de descarga de vídeos de YouTube
 """
 
 import os
-import yt_dlp
-from config import AUDIO_QUALITY, AUDIO_CODEC
+# yt_dlp se importa dentro de cada método: tarda en cargarse y no hace falta
+# para mostrar la ventana
+from config import AUDIO_QUALITY, AUDIO_CODEC, TRANSCRIBE_ONLY_FORMAT
+from utils.metadata_cache import MetadataCache, get_metadata_cache
+
+
+# Clases de extractores de yt-dlp (se cargan una vez, al primer uso)
+_extractor_classes = None
+
+# Salida de consola de yt-dlp en las descargas (ver set_console_output)
+_console_options = {'quiet': False, 'no_warnings': False}
 
 
 class YouTubeDownloader:
     """Clase para manejar las descargas de YouTube"""
     
+    @staticmethod
+    def set_console_output(enabled):
+        """
+        Activa o desactiva los mensajes de yt-dlp en consola durante las descargas
+        
+        yt-dlp escribe su salida ([download], progreso...) en stdout salvo en
+        modo silencioso; el modo sin interfaz la desactiva para que stdout
+        solo contenga sus líneas JSON (los errores siguen saliendo por stderr).
+        
+        Args:
+            enabled: False para silenciar yt-dlp
+        """
+        _console_options.clear()
+        if enabled:
+            _console_options.update({'quiet': False, 'no_warnings': False})
+        else:
+            _console_options.update({'quiet': True, 'no_warnings': True, 'noprogress': True})
+    
     @staticmethod
     def get_audio_options(output_path):
         """
@@ -37,8 +64,7 @@ class YouTubeDownloader:
                 'preferredcodec': AUDIO_CODEC,
                 'preferredquality': AUDIO_QUALITY,
             }],
-            'quiet': False,
-            'no_warnings': False,
+            **_console_options,
         }
     
     @staticmethod
@@ -86,8 +112,7 @@ class YouTubeDownloader:
             'format': format_selector,
             'outtmpl': output_template,
             'merge_output_format': 'mp4',
-            'quiet': False,
-            'no_warnings': False,
+            **_console_options,
         }
     
     @staticmethod
@@ -109,26 +134,188 @@ class YouTubeDownloader:
             return YouTubeDownloader.get_video_options(output_folder, quality)
     
     @staticmethod
-    def get_video_info(url):
+    def get_output_variant(is_audio, quality=None):
+        """
+        Describe el archivo que produce una descarga (para reconocerlo después)
+        
+        Args:
+            is_audio: True si es solo audio
+            quality: Calidad del vídeo (solo si is_audio=False)
+            
+        Returns:
+            dict: {'ext': extensión final, 'format': selector de formato y,
+                en audio, códec y calidad de la conversión}
+        """
+        if is_audio:
+            options = YouTubeDownloader.get_audio_options("")
+            return {'ext': AUDIO_CODEC, 'format': f"{options['format']} {AUDIO_CODEC} {AUDIO_QUALITY}k"}
+        return {'ext': 'mp4', 'format': YouTubeDownloader.get_video_format_selector(quality)}
+    
+    @staticmethod
+    def get_transcription_format(info):
+        """
+        Elige el audio que se transcribe en un trabajo de solo transcripción
+        
+        Se selecciona el formato de audio más pequeño adecuado para Whisper
+        (TRANSCRIBE_ONLY_FORMAT) sobre la información ya extraída; su URL se
+        decodifica después a PCM sin descargar el archivo.
+        
+        Args:
+            info: Información extraída (ver get_video_info); debe conservar
+                la lista de formatos
+            
+        Returns:
+            dict: Formato elegido (con 'url' y 'http_headers')
+        
+        Raises:
+            Exception: si ningún formato se puede leer
+        """
+        import yt_dlp
+        ydl_opts = {
+            'format': TRANSCRIBE_ONLY_FORMAT,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            selected = ydl.process_ie_result(dict(info), download=False)
+        
+        fmt = (selected.get('requested_formats') or [selected])[0]
+        if not fmt.get('url'):
+            raise Exception("No hay ningún formato de audio que se pueda leer directamente")
+        return fmt
+    
+    @staticmethod
+    def get_output_basename(info, output_folder):
+        """
+        Ruta (sin extensión) que yt-dlp daría al contenido en una carpeta
+        
+        Args:
+            info: Información extraída
+            output_folder: Carpeta de destino
+            
+        Returns:
+            str: Ruta con el título saneado como nombre de archivo
+        """
+        import yt_dlp
+        ydl_opts = {
+            'outtmpl': os.path.join(output_folder, "%(title)s.%(ext)s"),
+            'quiet': True,
+            'no_warnings': True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return os.path.splitext(ydl.prepare_filename(info))[0]
+    
+    @staticmethod
+    def get_media_key(url):
+        """
+        Calcula la clave "<extractor> <id>" de una URL sin acceder a la red
+        
+        Args:
+            url: URL del contenido
+            
+        Returns:
+            str: Clave en el formato del archivo de descargas de yt-dlp,
+                o None si el extractor no permite deducir el ID de la URL
+        """
+        global _extractor_classes
+        if _extractor_classes is None:
+            import yt_dlp
+            _extractor_classes = list(yt_dlp.extractor.gen_extractor_classes())
+        
+        for ie in _extractor_classes:
+            if ie.suitable(url):
+                video_id = ie.get_temp_id(url)
+                if not video_id:
+                    return None
+                return f"{ie.ie_key().lower()} {video_id}"
+        return None
+    
+    @staticmethod
+    def get_video_info(url, use_cache=True):
         """
         Obtiene información del vídeo sin descargarlo
         
         Args:
             url: URL del vídeo de YouTube
+            use_cache: Si es True, consulta y alimenta la caché de metadatos
             
         Returns:
             dict: Información del vídeo
         """
+        cache = get_metadata_cache() if use_cache else None
+        if cache:
+            key = YouTubeDownloader.get_media_key(url) or cache.lookup_url(url)
+            cached = cache.get(key)
+            if cached:
+                return cached
+        
+        import yt_dlp
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
         }
         
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            return ydl.extract_info(url, download=False)
+            info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+        
+        if cache:
+            cache.put(info, url)
+        return info
     
     @staticmethod
-    def download(url, output_folder, is_audio, quality, progress_hook):
+    def iter_entries(url, is_archived=None, _depth=0):
+        """
+        Expande una URL en sus entradas de forma perezosa
+        
+        Para listas y canales se usa extracción plana: cada entrada se devuelve
+        en cuanto el extractor la conoce, sin resolverla ni guardar el árbol
+        completo en memoria. Una URL de un solo vídeo se devuelve tal cual y su
+        información queda en la caché de metadatos para que el worker no
+        vuelva a extraerla.
+        
+        Args:
+            url: URL de un vídeo, lista de reproducción o canal
+            is_archived: Función opcional que recibe una clave "<extractor> <id>"
+                y devuelve True si ya se descargó; esas entradas se omiten
+            
+        Yields:
+            str: URL de cada entrada
+        """
+        import yt_dlp
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+        }
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+        
+        result_type = info.get('_type', 'video')
+        
+        if result_type in ('url', 'url_transparent') and info.get('url') and _depth < 3:
+            # Redirección (p. ej. canal -> pestaña de vídeos)
+            yield from YouTubeDownloader.iter_entries(info['url'], is_archived, _depth + 1)
+            return
+        
+        if result_type not in ('playlist', 'multi_video'):
+            get_metadata_cache().put(yt_dlp.YoutubeDL.sanitize_info(info), url)
+            yield url
+            return
+        
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            if is_archived and is_archived(MetadataCache.make_key(entry)):
+                continue
+            entry_url = entry.get('webpage_url') or entry.get('url')
+            if entry_url:
+                yield entry_url
+    
+    @staticmethod
+    def download(url, output_folder, is_audio, quality, progress_hook, info=None):
         """
         Descarga el vídeo o audio de YouTube
         
@@ -138,26 +325,69 @@ class YouTubeDownloader:
             is_audio: True si es solo audio, False si es vídeo
             quality: Calidad del vídeo (solo si is_audio=False)
             progress_hook: Hook para reportar el progreso
+            info: Información ya extraída con get_video_info (opcional).
+                Si se pasa, se descarga directamente sin volver a extraer.
             
         Returns:
-            tuple: (éxito: bool, mensaje: str, título: str)
+            tuple: (éxito: bool, mensaje: str, título: str, rutas: list)
+                rutas contiene las rutas finales de los archivos escritos
+                (tras el post-procesado y el movimiento a su destino)
         """
         try:
+            import yt_dlp
             ydl_opts = YouTubeDownloader.get_download_options(
                 output_folder, is_audio, quality
             )
             ydl_opts['progress_hooks'] = [progress_hook.hook]
             
+            # yt-dlp llama a los post_hooks con la ruta final de cada archivo
+            final_paths = []
+            ydl_opts['post_hooks'] = [final_paths.append]
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Obtener información del vídeo
-                info = ydl.extract_info(url, download=False)
-                video_title = info.get('title', 'Video')
-                
-                # Descargar
-                ydl.download([url])
+                if info is not None:
+                    # Reutilizar la información extraída: solo se seleccionan
+                    # formatos y se descarga, sin otra pasada del extractor
+                    result = ydl.process_ie_result(info, download=True)
+                else:
+                    # Una única extracción que también descarga
+                    result = ydl.extract_info(url, download=True)
                 
-                return True, "Descarga completada", video_title
+                video_title = (result or info or {}).get('title', 'Video')
+            
+            # Tras descargar, la lista de formatos (la parte pesada) ya no sirve
+            key = MetadataCache.make_key(result or info or {})
+            if key:
+                get_metadata_cache().strip_formats(key)
+            
+            filepaths = YouTubeDownloader._collect_filepaths(result, final_paths)
+            return True, "Descarga completada", video_title, filepaths
         
         except Exception as e:
             error_msg = str(e)
-            return False, error_msg, None
+            return False, error_msg, None, []
+    
+    @staticmethod
+    def _collect_filepaths(result, hooked_paths):
+        """
+        Reúne las rutas finales de una descarga
+        
+        Args:
+            result: Diccionario devuelto por yt-dlp (vídeo o lista)
+            hooked_paths: Rutas recibidas por los post_hooks
+            
+        Returns:
+            list: Rutas sin duplicados, en el orden en que se escribieron
+        """
+        paths = list(hooked_paths)
+        
+        pending = [result] if result else []
+        while pending:
+            item = pending.pop(0)
+            for download in item.get('requested_downloads') or []:
+                if download.get('filepath'):
+                    paths.append(download['filepath'])
+            pending.extend(entry for entry in item.get('entries') or [] if entry)
+        
+        seen = set()
+        return [p for p in paths if not (p in seen or seen.add(p))]
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cola de trabajos de descarga con un pool de workers limitado
+"""
+
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import MAX_CONCURRENT_DOWNLOADS
+
+
+# Estados de un trabajo
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOB_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)
+
+_job_ids = itertools.count(1)
+
+# Segundos entre comprobaciones de la señal de parada mientras un worker espera
+STOP_POLL_INTERVAL = 0.5
+
+
+class DownloadJob:
+    """Trabajo de descarga con sus parámetros y su estado"""
+
+    def __init__(self, url: str, output_folder: str, is_audio: bool,
+                 quality: Optional[str] = None, use_ssh: bool = False,
+                 ssh_config: Optional[dict] = None, transcribe: bool = False,
+                 use_archive: bool = True, force_whisper: bool = False,
+                 transcript_only: bool = False):
+        """
+        Inicializa el trabajo
+
+        Args:
+            url: URL del contenido
+            output_folder: Carpeta de destino (local o remota)
+            is_audio: True si es solo audio
+            quality: Calidad del vídeo (solo si is_audio=False)
+            use_ssh: True si se debe subir a servidor SSH
+            ssh_config: Diccionario con configuración SSH
+            transcribe: True si se debe transcribir el audio
+            use_archive: Si es True, se omite el contenido ya registrado en el
+                archivo de descargas y se registra al terminar
+            force_whisper: Si es True, se transcribe con Whisper aunque la
+                plataforma ofrezca subtítulos
+            transcript_only: Si es True, solo se genera la transcripción (en
+                local): no se guarda el audio ni se convierte a MP3, y no se
+                usa el archivo de descargas
+        """
+        self.job_id = next(_job_ids)
+        self.url = url
+        self.output_folder = output_folder
+        self.is_audio = is_audio
+        self.quality = quality
+        self.use_ssh = use_ssh
+        self.ssh_config = ssh_config
+        self.transcript_only = transcript_only
+        self.transcribe = transcribe or transcript_only
+        # El archivo de descargas registra medios guardados; aquí no se guarda ninguno
+        self.use_archive = use_archive and not transcript_only
+        self.force_whisper = force_whisper
+
+        self.status = JOB_QUEUED
+        self.stage = None
+        self.message = ""
+        self.title = None
+
+        # Datos que pasan de una etapa a otra
+        self.info = None
+        self.media_key = None
+        self.stream_plan = None
+        self.filepaths = []
+        self.output_file = None
+        self.temp_dir = None
+
+        # Comandos remotos SSH ejecutados por el trabajo (idas y vueltas evitables)
+        self.ssh_round_trips = 0
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        """
+        Representación serializable del trabajo (sin credenciales)
+
+        Returns:
+            dict: Campos públicos del trabajo
+        """
+        return {
+            'job_id': self.job_id,
+            'url': self.url,
+            'output_folder': self.output_folder,
+            'is_audio': self.is_audio,
+            'quality': self.quality,
+            'use_ssh': self.use_ssh,
+            'transcribe': self.transcribe,
+            'use_archive': self.use_archive,
+            'force_whisper': self.force_whisper,
+            'transcript_only': self.transcript_only,
+            'status': self.status,
+            'stage': self.stage,
+            'message': self.message,
+            'title': self.title,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'ssh_round_trips': self.ssh_round_trips,
+        }
+
+
+class JobStage:
+    """
+    Etapa de procesamiento con su propia cola y su propio número de workers
+
+    El manejador recibe el trabajo y devuelve:
+    - el nombre de otra etapa, para pasarle el trabajo, o
+    - una tupla (éxito: bool, mensaje: str), para terminarlo.
+
+    Si la cola de la etapa siguiente está llena, el worker que entrega el
+    trabajo espera: así una etapa lenta frena a las anteriores
+    (contrapresión) en vez de acumular trabajos sin límite.
+    """
+
+    def __init__(self, name: str, handler: Callable[[DownloadJob], object],
+                 workers: int = 1, max_pending: int = 0):
+        """
+        Inicializa la etapa
+
+        Args:
+            name: Nombre de la etapa
+            handler: Función que procesa un trabajo en esta etapa
+            workers: Número de trabajos que la etapa procesa a la vez
+            max_pending: Trabajos máximos esperando en la cola de la etapa (0 = sin límite)
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.max_pending = max(0, int(max_pending))
+        self.queue = queue.Queue(maxsize=self.max_pending)
+        self.threads: List[threading.Thread] = []
+
+
+class DownloadQueue:
+    """
+    Cola de trabajos atendida por una o varias etapas con workers limitados
+
+    Con un solo worker (parámetro worker) se comporta como un pool de N hilos.
+    Con varias etapas, cada trabajo avanza de una a otra y los trabajos se
+    solapan: mientras uno sube, el siguiente descarga y el anterior se
+    transcribe.
+
+    El estado de todos los trabajos se guarda en un único registro que pueden
+    leer tanto la interfaz gráfica como un ejecutor sin interfaz.
+    """
+
+    def __init__(self, worker: Optional[Callable[[DownloadJob], tuple]] = None,
+                 max_workers: int = MAX_CONCURRENT_DOWNLOADS,
+                 on_change: Optional[Callable[[DownloadJob], None]] = None,
+                 stages: Optional[List[JobStage]] = None):
+        """
+        Inicializa la cola
+
+        Args:
+            worker: Función que procesa un trabajo completo y devuelve (éxito: bool, mensaje: str)
+            max_workers: Número de trabajos que se ejecutan a la vez (solo con worker)
+            on_change: Callback opcional que recibe el trabajo cada vez que cambia de estado
+                (se llama desde el hilo del worker; recibe None cuando termina una expansión)
+            stages: Etapas del procesamiento, en orden (sustituyen a worker)
+        """
+        if not stages:
+            if worker is None:
+                raise ValueError("Se necesita un worker o una lista de etapas")
+            stages = [JobStage("download", worker, max_workers)]
+
+        # La primera etapa recibe los trabajos desde la interfaz: no puede bloquear
+        stages[0].max_pending = 0
+        stages[0].queue = queue.Queue()
+
+        self.stages = stages
+        self._stages_by_name = {stage.name: stage for stage in stages}
+        self.on_change = on_change
+
+        self._jobs: Dict[int, DownloadJob] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._expanding = 0
+        self._stop = threading.Event()
+
+    def submit(self, job: DownloadJob) -> DownloadJob:
+        """
+        Encola un trabajo
+
+        Args:
+            job: Trabajo a encolar
+
+        Returns:
+            DownloadJob: El mismo trabajo, ya registrado
+        """
+        with self._lock:
+            job.status = JOB_QUEUED
+            job.stage = self.stages[0].name
+            self._jobs[job.job_id] = job
+            self._ensure_workers()
+        self._notify(job)
+        self.stages[0].queue.put(job)
+        return job
+
+    def submit_iter(self, urls: Iterable[str], make_job: Callable[[str], DownloadJob],
+                    source: Optional[str] = None) -> threading.Thread:
+        """
+        Encola trabajos a medida que un iterable (p. ej. un generador de
+        entradas de una lista de reproducción) los va produciendo
+
+        El iterable se consume en un hilo aparte, así que los primeros trabajos
+        empiezan mientras el resto de entradas todavía se están descubriendo.
+
+        Args:
+            urls: Iterable de URLs (se consume de forma perezosa)
+            make_job: Función que crea el DownloadJob de cada URL
+            source: URL original; si la expansión falla se registra como trabajo fallido
+
+        Returns:
+            threading.Thread: Hilo que consume el iterable
+        """
+        with self._lock:
+            self._expanding += 1
+
+        def expand():
+            try:
+                for url in urls:
+                    self.submit(make_job(url))
+            except Exception as e:
+                if source:
+                    job = make_job(source)
+                    with self._lock:
+                        job.status = JOB_FAILED
+                        job.message = f"Error al expandir la URL: {e}"
+                        job.finished_at = time.time()
+                        self._jobs[job.job_id] = job
+                    self._notify(job)
+            finally:
+                with self._idle:
+                    self._expanding -= 1
+                    self._idle.notify_all()
+                self._notify(None)
+
+        thread = threading.Thread(target=expand, name="download-expander", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def expanding(self) -> int:
+        """Número de URLs que todavía se están expandiendo"""
+        with self._lock:
+            return self._expanding
+
+    def requeue(self, job_id: int) -> bool:
+        """
+        Vuelve a encolar un trabajo fallido
+
+        Args:
+            job_id: Identificador del trabajo
+
+        Returns:
+            bool: True si se volvió a encolar
+        """
+        job = self.get_job(job_id)
+        if not job or job.status != JOB_FAILED:
+            return False
+        job.message = ""
+        job.started_at = None
+        job.finished_at = None
+        self.submit(job)
+        return True
+
+    def get_job(self, job_id: int) -> Optional[DownloadJob]:
+        """Obtiene un trabajo por su identificador"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_jobs(self) -> List[DownloadJob]:
+        """Obtiene todos los trabajos en orden de creación"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.job_id)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Cuenta los trabajos por estado
+
+        Returns:
+            dict: {estado: número de trabajos}
+        """
+        result = {state: 0 for state in JOB_STATES}
+        with self._lock:
+            for job in self._jobs.values():
+                result[job.status] += 1
+        return result
+
+    def is_idle(self) -> bool:
+        """True si no hay trabajos en cola, en ejecución ni expansiones pendientes"""
+        counts = self.counts()
+        return counts[JOB_QUEUED] == 0 and counts[JOB_RUNNING] == 0 and self.expanding == 0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que terminen todos los trabajos
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None = sin límite)
+
+        Returns:
+            bool: True si la cola quedó vacía
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._idle:
+            while self._expanding or any(j.status in (JOB_QUEUED, JOB_RUNNING)
+                                         for j in self._jobs.values()):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stage_counts(self) -> Dict[str, int]:
+        """
+        Cuenta los trabajos en curso por etapa
+
+        Returns:
+            dict: {nombre de etapa: trabajos en ejecución o esperando en ella}
+        """
+        result = {stage.name: 0 for stage in self.stages}
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JOB_RUNNING and job.stage in result:
+                    result[job.stage] += 1
+        return result
+
+    def shutdown(self):
+        """
+        Detiene los workers cuando terminen el trabajo en curso
+
+        No bloquea aunque alguna cola esté llena: los workers comprueban la
+        señal de parada mientras esperan trabajo o sitio en la etapa siguiente.
+        """
+        self._stop.set()
+        for stage in self.stages:
+            for _ in stage.threads:
+                try:
+                    # Despierta enseguida a los workers que esperan trabajo
+                    stage.queue.put_nowait(None)
+                except queue.Full:
+                    break
+
+    def _ensure_workers(self):
+        """Arranca los workers que falten en cada etapa (requiere el lock)"""
+        if self._stop.is_set():
+            return
+        for stage in self.stages:
+            stage.threads = [t for t in stage.threads if t.is_alive()]
+            while len(stage.threads) < stage.workers:
+                thread = threading.Thread(
+                    target=self._stage_loop,
+                    args=(stage,),
+                    name=f"{stage.name}-worker-{len(stage.threads) + 1}",
+                    daemon=True
+                )
+                stage.threads.append(thread)
+                thread.start()
+
+    def _stage_loop(self, stage: JobStage):
+        """Bucle de un worker: toma trabajos de la cola de su etapa hasta que se detiene la cola"""
+        while not self._stop.is_set():
+            try:
+                job = stage.queue.get(timeout=STOP_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+            self._run_stage(stage, job)
+
+    def _run_stage(self, stage: JobStage, job: DownloadJob):
+        """Ejecuta una etapa de un trabajo y lo entrega a la siguiente o lo termina"""
+        with self._lock:
+            job.status = JOB_RUNNING
+            job.stage = stage.name
+            if job.started_at is None:
+                job.started_at = time.time()
+        self._notify(job)
+
+        try:
+            result = stage.handler(job)
+        except Exception as e:
+            result = (False, str(e))
+
+        if isinstance(result, str):
+            next_stage = self._stages_by_name.get(result)
+            if next_stage is not None:
+                with self._lock:
+                    job.stage = next_stage.name
+                self._notify(job)
+                # Espera si la etapa siguiente está saturada (contrapresión)
+                while not self._stop.is_set():
+                    try:
+                        next_stage.queue.put(job, timeout=STOP_POLL_INTERVAL)
+                        return
+                    except queue.Full:
+                        continue
+                result = (False, "Cola detenida")
+            else:
+                result = (False, f"Etapa desconocida: {result}")
+
+        success, message = result
+        with self._idle:
+            job.status = JOB_DONE if success else JOB_FAILED
+            job.message = message
+            job.finished_at = time.time()
+            self._idle.notify_all()
+        self._notify(job)
+
+    def _notify(self, job: Optional[DownloadJob]):
+        """Avisa del cambio de estado sin dejar que un callback rompa el worker"""
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception:
+                pass
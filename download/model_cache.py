@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de modelos Whisper compartida por todo el proceso
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from config import WHISPER_MODEL_RAM_BUDGET, WHISPER_MODEL_IDLE_TIMEOUT
+
+
+class CachedModel:
+    """Modelo cargado con su tamaño estimado y sus préstamos en curso"""
+
+    def __init__(self, key: tuple, model, size: int):
+        self.key = key
+        self.model = model
+        self.size = size
+        self.leases = 0
+        self.last_used = time.time()
+
+
+class WhisperModelCache:
+    """
+    Modelos Whisper cargados, por (nombre, dispositivo)
+
+    Cargar un modelo cuesta segundos y hasta 1,5 GB por archivo transcrito;
+    con la caché, una tanda de archivos lo carga una sola vez. Si la suma de
+    los modelos supera el presupuesto de memoria se descartan los menos usados
+    recientemente (nunca uno que se está usando), y un hilo descarga los que
+    llevan WHISPER_MODEL_IDLE_TIMEOUT segundos sin uso.
+    """
+
+    def __init__(self, ram_budget: int = WHISPER_MODEL_RAM_BUDGET,
+                 idle_timeout: float = WHISPER_MODEL_IDLE_TIMEOUT):
+        """
+        Inicializa la caché
+
+        Args:
+            ram_budget: Bytes máximos de modelos cargados a la vez
+            idle_timeout: Segundos sin uso antes de descargar un modelo (0 = nunca)
+        """
+        self.ram_budget = ram_budget
+        self.idle_timeout = idle_timeout
+        self._models: "OrderedDict[tuple, CachedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._reaper = None
+
+    @staticmethod
+    def resolve_device(device: Optional[str] = None) -> str:
+        """Dispositivo efectivo (el mismo criterio que whisper.load_model)"""
+        if device:
+            return device
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    @contextmanager
+    def lease(self, model_name: str, device: Optional[str] = None):
+        """
+        Presta un modelo cargado (lo carga si hace falta) mientras dura el bloque
+
+        Ejemplo:
+            with get_model_cache().lease("base") as model:
+                model.transcribe(...)
+
+        Raises:
+            ImportError: si Whisper no está instalado
+        """
+        entry = self._acquire(model_name, self.resolve_device(device))
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.time()
+
+    def unload(self, model_name: Optional[str] = None):
+        """Descarga un modelo (todos los dispositivos) o todos si model_name es None"""
+        with self._lock:
+            keys = [k for k, e in self._models.items()
+                    if (model_name is None or k[0] == model_name) and e.leases == 0]
+            removed = [self._models.pop(k) for k in keys]
+        self._release_memory(removed)
+
+    def stats(self) -> dict:
+        """
+        Estado de la caché
+
+        Returns:
+            dict: {'models': [(nombre, dispositivo), ...], 'bytes': tamaño estimado total}
+        """
+        with self._lock:
+            return {
+                'models': list(self._models),
+                'bytes': sum(e.size for e in self._models.values()),
+            }
+
+    def _acquire(self, model_name: str, device: str) -> CachedModel:
+        """Devuelve la entrada del modelo con un préstamo más, cargándolo si no está"""
+        key = (model_name, device)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry:
+                entry.leases += 1
+                self._models.move_to_end(key)
+                return entry
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Un lock por modelo: dos trabajos que lo piden a la vez lo cargan una vez
+        with key_lock:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry:
+                    entry.leases += 1
+                    self._models.move_to_end(key)
+                    return entry
+
+            import whisper
+            model = whisper.load_model(model_name, device=device)
+            entry = CachedModel(key, model, self._model_size(model))
+            entry.leases = 1
+
+            with self._lock:
+                self._models[key] = entry
+                evicted = self._evict_locked()
+                self._start_reaper()
+        self._release_memory(evicted)
+        return entry
+
+    @staticmethod
+    def _model_size(model) -> int:
+        """Bytes que ocupan los parámetros y buffers del modelo"""
+        try:
+            tensors = list(model.parameters()) + list(model.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        except Exception:
+            return 0
+
+    def _evict_locked(self) -> list:
+        """Quita los modelos menos usados hasta cumplir el presupuesto (requiere el lock)"""
+        evicted = []
+        total = sum(e.size for e in self._models.values())
+        for key in list(self._models):
+            if total <= self.ram_budget:
+                break
+            entry = self._models[key]
+            if entry.leases:
+                continue
+            del self._models[key]
+            total -= entry.size
+            evicted.append(entry)
+        return evicted
+
+    @staticmethod
+    def _release_memory(entries: list):
+        """Libera la memoria de los modelos descartados"""
+        if not entries:
+            return
+        on_gpu = any(entry.key[1].startswith("cuda") for entry in entries)
+        for entry in entries:
+            entry.model = None
+        gc.collect()
+        if on_gpu:
+            try:
+                import torch
+                torch.cuda.empty_cache()
+            except Exception:
+                pass
+
+    def _start_reaper(self):
+        """Arranca el hilo que descarga modelos inactivos (requiere el lock)"""
+        if not self.idle_timeout or (self._reaper and self._reaper.is_alive()):
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="whisper-model-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self):
+        """Descarga los modelos sin uso durante más de idle_timeout segundos"""
+        interval = max(1.0, min(self.idle_timeout / 4, 60))
+        while True:
+            time.sleep(interval)
+            now = time.time()
+            with self._lock:
+                expired = [k for k, e in self._models.items()
+                           if e.leases == 0 and now - e.last_used > self.idle_timeout]
+                removed = [self._models.pop(k) for k in expired]
+                finished = not self._models
+                if finished:
+                    # Caché vacía: el hilo termina y se vuelve a crear si hace falta
+                    self._reaper = None
+            self._release_memory(removed)
+            if finished:
+                return
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_model_cache() -> WhisperModelCache:
+    """
+    Obtiene la caché de modelos compartida del proceso
+
+    Returns:
+        WhisperModelCache: Instancia única
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = WhisperModelCache()
+        return _default_cache
@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Procesamiento de trabajos por etapas: extraer → descargar → subir → transcribir
+"""
+
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+
+from config import (
+    PIPELINE_STAGES, STREAM_TO_SSH, SFTP_UPLOAD_RETRIES, REMOTE_MANIFEST_ENABLED, TRANSCRIBE_SOURCE
+)
+from download.audio_chunks import decode_to_pcm
+from download.downloader import YouTubeDownloader
+from download.job_queue import JobStage
+from download.progress import ProgressHook
+from download.subtitles import SubtitleTranscriber
+from download.transcription_service import get_transcription_service
+from utils.metadata_cache import MetadataCache
+
+# download.streamer y utils.ssh_client (yt-dlp, paramiko) se importan al
+# usarse por primera vez para no alargar el arranque
+
+
+# Nombres de las etapas
+STAGE_EXTRACT = "extract"
+STAGE_DOWNLOAD = "download"
+STAGE_UPLOAD = "upload"
+STAGE_TRANSCRIBE = "transcribe"
+
+STAGE_ORDER = (STAGE_EXTRACT, STAGE_DOWNLOAD, STAGE_UPLOAD, STAGE_TRANSCRIBE)
+
+STAGE_LABELS = {
+    STAGE_EXTRACT: "extrayendo",
+    STAGE_DOWNLOAD: "descargando",
+    STAGE_UPLOAD: "subiendo",
+    STAGE_TRANSCRIBE: "transcribiendo",
+}
+
+
+class PipelineReporter:
+    """
+    Interfaz para informar del avance de los trabajos
+
+    La interfaz gráfica y el ejecutor por línea de comandos la implementan
+    cada uno a su manera; el procesamiento no depende de Qt.
+    """
+
+    def message(self, text, message_type="info"):
+        """Mensaje para el registro (info, success, error, warning)"""
+
+    def progress(self, job, percent, text):
+        """Progreso de un trabajo (0-100) con un texto de estado"""
+
+    def progress_hook(self, job):
+        """
+        Hook de progreso para yt-dlp (por defecto no informa de nada)
+
+        Returns:
+            Objeto con un método hook(d) compatible con progress_hooks de yt-dlp
+        """
+        return ProgressHook()
+
+
+class JobProcessor:
+    """
+    Etapas del procesamiento de un DownloadJob
+
+    Cada etapa tiene su propia cola y su propio límite de concurrencia
+    (PIPELINE_STAGES), así que mientras un trabajo se sube al servidor el
+    siguiente ya se está descargando y el anterior se transcribe. La cola de
+    subida es limitada: si el servidor va lento, las descargas esperan en vez
+    de llenar el disco local.
+    """
+
+    def __init__(self, reporter, archive=None, stage_limits=None):
+        """
+        Inicializa el procesador
+
+        Args:
+            reporter: PipelineReporter que recibe mensajes y progreso
+            archive: DownloadArchive opcional para omitir/registrar descargas
+            stage_limits: Límites por etapa {nombre: {'workers', 'max_pending'}};
+                por defecto PIPELINE_STAGES
+        """
+        self.reporter = reporter
+        self.archive = archive
+        self.stage_limits = dict(PIPELINE_STAGES)
+        if stage_limits:
+            self.stage_limits.update(stage_limits)
+
+    def build_stages(self):
+        """
+        Crea las etapas para una DownloadQueue
+
+        Returns:
+            list: JobStage en orden de procesamiento
+        """
+        handlers = {
+            STAGE_EXTRACT: self.extract,
+            STAGE_DOWNLOAD: self.download,
+            STAGE_UPLOAD: self.upload,
+            STAGE_TRANSCRIBE: self.transcribe,
+        }
+        stages = []
+        for name in STAGE_ORDER:
+            limits = self.stage_limits.get(name, {})
+            stages.append(JobStage(
+                name,
+                self._guard(handlers[name]),
+                workers=limits.get('workers', 1),
+                max_pending=limits.get('max_pending', 0)
+            ))
+        return stages
+
+    def _guard(self, handler):
+        """Convierte las excepciones de una etapa en un fallo del trabajo"""
+        def run(job):
+            try:
+                return handler(job)
+            except Exception as e:
+                error_msg = str(e)
+                self._cleanup_temp(job)
+                self.reporter.progress(job, 0, f"Error: {error_msg}")
+                self.reporter.message(f"Error en la descarga: {error_msg}", "error")
+                return self._finish(job, False, f"Error al descargar el vídeo:\n\n{error_msg}")
+        return run
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    def extract(self, job):
+        """Etapa 1: consulta el archivo de descargas y extrae la información"""
+        # Consultar el archivo de descargas antes de extraer (clave deducida de la URL)
+        archive_key = YouTubeDownloader.get_media_key(job.url)
+        if self._is_archived(job, archive_key):
+            return self._skip_archived(job, job.url)
+
+        # Una sola extracción por trabajo; el mismo diccionario se reutiliza en la descarga
+        info = YouTubeDownloader.get_video_info(job.url)
+        job.info = info
+        job.title = info.get('title', 'Video')
+
+        # Segunda comprobación con la clave real, antes de descargar
+        job.media_key = MetadataCache.make_key(info) or archive_key
+        if self._is_archived(job, job.media_key):
+            return self._skip_archived(job, job.title)
+
+        # Solo transcripción: no se descarga ni se convierte ningún archivo
+        if job.transcript_only:
+            self.reporter.progress(job, 0, f"En cola para transcribir: {job.title}")
+            self.reporter.message(f"Solo transcripción: {job.title}", "info")
+            return STAGE_TRANSCRIBE
+
+        # Contenido que ya está en la carpeta remota (según su índice): no descargar
+        if job.use_ssh and REMOTE_MANIFEST_ENABLED:
+            existing = self._find_on_server(job)
+            if existing:
+                return self._skip_on_server(job, existing)
+
+        self.reporter.progress(job, 0, f"Iniciando descarga: {job.title}")
+        self.reporter.message(f"Iniciando descarga: {job.title}", "info")
+
+        # Transmitir directamente al servidor si el formato lo permite
+        if job.use_ssh and STREAM_TO_SSH:
+            try:
+                from download.streamer import MediaStreamer
+                job.stream_plan = MediaStreamer.plan(info, job.is_audio, job.quality)
+            except Exception as e:
+                self.reporter.message(f"Transmisión directa no disponible: {str(e)}", "warning")
+            if job.stream_plan:
+                return STAGE_UPLOAD
+
+        return STAGE_DOWNLOAD
+
+    def download(self, job):
+        """Etapa 2: descarga y post-procesa (ffmpeg) con yt-dlp"""
+        if job.use_ssh:
+            # Descargar a una carpeta temporal propia de este trabajo
+            temp_root = os.path.join(tempfile.gettempdir(), "youtube_download")
+            os.makedirs(temp_root, exist_ok=True)
+            job.temp_dir = tempfile.mkdtemp(prefix=f"job{job.job_id}_", dir=temp_root)
+            output = os.path.join(job.temp_dir, "%(title)s.%(ext)s")
+            self.reporter.message("Descargando a carpeta temporal...", "info")
+        else:
+            output = job.output_folder
+
+        success, message, title, filepaths = YouTubeDownloader.download(
+            job.url, output, job.is_audio, job.quality, self.reporter.progress_hook(job),
+            info=job.info
+        )
+        if not success:
+            raise Exception(message)
+
+        job.title = title or job.title
+        job.filepaths = filepaths
+        # yt-dlp informa de la ruta final exacta de cada archivo
+        job.output_file = self._pick_output_file(filepaths, job.is_audio)
+
+        if job.use_ssh:
+            if not job.output_file:
+                raise Exception(f"yt-dlp no informó de ningún archivo descargado: {filepaths}")
+
+            # Verificar que el archivo tiene contenido
+            file_size = os.path.getsize(job.output_file)
+            if file_size == 0:
+                raise Exception(f"El archivo descargado está vacío: {job.output_file}")
+
+            self.reporter.message(
+                f"Archivo descargado: {os.path.basename(job.output_file)} ({file_size / 1024 / 1024:.2f} MB)",
+                "info"
+            )
+            self.reporter.progress(job, 60, "En cola para subir...")
+            return STAGE_UPLOAD
+
+        self._mark_archived(job)
+
+        if job.is_audio and job.transcribe:
+            return STAGE_TRANSCRIBE
+
+        return self._finish_local(job)
+
+    def upload(self, job):
+        """Etapa 3: sube (o transmite) el resultado al servidor SSH"""
+        ssh_config = job.ssh_config
+
+        if job.stream_plan:
+            result = self._stream_upload(job)
+            if result:
+                return result
+            # La transmisión falló: descargar a disco y subir después
+            job.stream_plan = None
+            return STAGE_DOWNLOAD
+
+        # Subir archivo - usar el nombre del archivo real
+        remote_filename = os.path.basename(job.output_file)
+        remote_path = posixpath.join(ssh_config['remote_folder'], remote_filename)
+        file_size_mb = os.path.getsize(job.output_file) / 1024 / 1024
+
+        # Mismo contenido ya subido con otro nombre o por otra vía: no subir
+        if REMOTE_MANIFEST_ENABLED:
+            existing = self._find_on_server(job, job.output_file)
+            if existing:
+                return self._skip_on_server(job, existing)
+
+        # Cada intento continúa desde el .part que dejó el anterior
+        upload_success, upload_msg = False, ""
+        for attempt in range(1, SFTP_UPLOAD_RETRIES + 1):
+            if attempt > 1:
+                self.reporter.message(
+                    f"⚠️ {upload_msg}. Reintentando ({attempt}/{SFTP_UPLOAD_RETRIES}) desde lo ya subido...",
+                    "warning"
+                )
+                time.sleep(min(2 ** attempt, 30))
+
+            self.reporter.progress(job, 60, "Conectando al servidor...")
+            try:
+                ssh_client = self._connect_ssh_destination(job, os.path.getsize(job.output_file))
+            except Exception as e:
+                upload_msg = str(e)
+                continue
+
+            try:
+                self.reporter.message("Subiendo archivo al servidor...", "info")
+                self.reporter.progress(job, 70, "Subiendo archivo...")
+                self.reporter.message(
+                    f"Subiendo {remote_filename} ({file_size_mb:.2f} MB) a {ssh_config['remote_folder']}...",
+                    "info"
+                )
+
+                started = time.time()
+                first = []
+
+                def on_progress(transferred, total):
+                    # La velocidad se mide desde el primer aviso (al continuar, no empieza en 0)
+                    if not first:
+                        first.append(transferred)
+                    speed = (transferred - first[0]) / max(time.time() - started, 0.001) / 1024 / 1024
+                    percent = 70 + int(transferred * 29 / total) if total else 70
+                    self.reporter.progress(
+                        job, percent,
+                        f"Subiendo archivo... {transferred / 1024 / 1024:.1f} de "
+                        f"{total / 1024 / 1024:.1f} MB ({speed:.2f} MB/s)"
+                    )
+
+                upload_success, upload_msg = ssh_client.upload_file(job.output_file, remote_path, on_progress)
+                if upload_success:
+                    self._record_on_server(job, ssh_client, remote_path)
+            finally:
+                self._release_ssh(job, ssh_client)
+
+            if upload_success:
+                break
+
+        if not upload_success:
+            self.reporter.message(f"❌ {upload_msg}", "error")
+            raise Exception(f"Error al subir archivo: {upload_msg}")
+
+        self.reporter.message(f"✅ {upload_msg}", "success")
+        self._mark_archived(job)
+
+        # Eliminar archivos temporales del trabajo
+        try:
+            self._cleanup_temp(job)
+        except Exception as e:
+            self.reporter.message(f"⚠️ No se pudo eliminar archivo temporal: {str(e)}", "warning")
+
+        self.reporter.progress(job, 100, "¡Descarga y subida completadas!")
+        self.reporter.message(f"¡Archivo subido exitosamente a: {remote_path}!", "success")
+        return self._finish(
+            job, True,
+            f"¡Descarga y subida completadas!\n\n{job.title}\n\nGuardado en servidor: {remote_path}"
+        )
+
+    def transcribe(self, job):
+        """Etapa 4: transcribe el audio (subtítulos de la plataforma o Whisper)"""
+        if job.transcript_only:
+            return self._transcribe_only(job)
+
+        transcription_result = ""
+
+        self.reporter.progress(job, 95, "Transcribiendo audio...")
+
+        # Archivo de audio exacto que escribió yt-dlp
+        audio_file = job.output_file
+        if audio_file:
+            # Generar nombre para el archivo de transcripción
+            txt_filename = os.path.splitext(audio_file)[0] + "_transcripcion.txt"
+
+            trans_success, trans_msg, trans_text = self._transcribe_from_subtitles(job, audio_file, txt_filename)
+
+            if not trans_success:
+                self.reporter.message("Iniciando transcripción con Whisper AI...", "info")
+                # Se transcribe en un proceso aparte; esta etapa solo espera el resultado
+                trans_success, trans_msg, trans_text = get_transcription_service().submit(
+                    audio_file,
+                    txt_filename,
+                    model_name="base",
+                    language="es"
+                ).result()
+
+            if trans_success:
+                self.reporter.message(f"Transcripción guardada: {os.path.basename(txt_filename)}", "success")
+                transcription_result = f"\nTranscripción: {txt_filename}"
+            else:
+                self.reporter.message(f"Error en transcripción: {trans_msg}", "warning")
+                transcription_result = f"\nTranscripción fallida: {trans_msg}"
+        else:
+            self.reporter.message("No se encontró archivo de audio para transcribir", "warning")
+
+        return self._finish_local(job, transcription_result)
+
+    def _transcribe_only(self, job):
+        """
+        Transcribe sin guardar el audio ni convertirlo a MP3
+
+        Si no hay subtítulos, el formato de audio más pequeño adecuado se
+        decodifica desde su URL a PCM de 16 kHz (archivo temporal en bruto que
+        los procesos de transcripción leen mapeado en memoria).
+        """
+        base_path = YouTubeDownloader.get_output_basename(job.info, job.output_folder)
+        txt_filename = base_path + "_transcripcion.txt"
+        source_name = os.path.basename(base_path)
+
+        self.reporter.progress(job, 10, "Buscando subtítulos...")
+        trans_success, trans_msg, _ = self._transcribe_from_subtitles(job, source_name, txt_filename)
+
+        if not trans_success:
+            info = job.info
+            if not info.get('formats'):
+                # La caché de metadatos no conserva los formatos de lo ya descargado
+                info = YouTubeDownloader.get_video_info(job.url, use_cache=False)
+            fmt = YouTubeDownloader.get_transcription_format(info)
+            size = fmt.get('filesize') or fmt.get('filesize_approx')
+            size_text = f", {size / 1024 / 1024:.2f} MB" if size else ""
+            self.reporter.message(
+                f"Audio para transcribir: formato {fmt.get('format_id')} ({fmt.get('ext')}{size_text})", "info"
+            )
+
+            temp_root = os.path.join(tempfile.gettempdir(), "youtube_download")
+            os.makedirs(temp_root, exist_ok=True)
+            job.temp_dir = tempfile.mkdtemp(prefix=f"job{job.job_id}_", dir=temp_root)
+            pcm_path = os.path.join(job.temp_dir, "audio.pcm")
+            try:
+                self.reporter.progress(job, 20, "Decodificando audio...")
+                duration = decode_to_pcm(fmt['url'], pcm_path, fmt.get('http_headers'))
+                if not duration:
+                    raise Exception("El audio decodificado está vacío")
+
+                self.reporter.progress(job, 50, "Transcribiendo audio...")
+                self.reporter.message("Iniciando transcripción con Whisper AI...", "info")
+                trans_success, trans_msg, _ = get_transcription_service().submit_pcm(
+                    pcm_path,
+                    txt_filename,
+                    model_name="base",
+                    language="es",
+                    source_name=source_name
+                ).result()
+            finally:
+                self._cleanup_temp(job)
+
+        if not trans_success:
+            raise Exception(f"Error en transcripción: {trans_msg}")
+
+        self.reporter.progress(job, 100, "¡Transcripción completada!")
+        self.reporter.message(f"Transcripción guardada: {os.path.basename(txt_filename)}", "success")
+        return self._finish(
+            job, True,
+            f"¡Transcripción completada!\n\n{job.title}\n\nGuardada en: {txt_filename}"
+        )
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+
+    def _transcribe_from_subtitles(self, job, audio_name, txt_filename):
+        """
+        Intenta transcribir con los subtítulos de la plataforma
+
+        Returns:
+            tuple: (éxito: bool, mensaje: str, texto: str); éxito es False si
+                hay que usar Whisper
+        """
+        if TRANSCRIBE_SOURCE == "whisper" or job.force_whisper:
+            return False, "Transcripción con Whisper", None
+
+        # Los subtítulos vienen en la información ya extraída: milisegundos frente a minutos
+        result = SubtitleTranscriber.transcribe(job.info, audio_name, txt_filename, language="es")
+        if result[0]:
+            self.reporter.message("Transcripción tomada de los subtítulos de la plataforma", "info")
+        else:
+            self.reporter.message(f"{result[1]}: se transcribe con Whisper", "info")
+        return result
+
+    def _finish_local(self, job, transcription_result=""):
+        """Termina un trabajo con destino local"""
+        self.reporter.progress(job, 100, "¡Descarga completada!")
+        self.reporter.message(
+            f"¡Descarga completada! Archivo guardado en: {job.output_folder}",
+            "success"
+        )
+        return self._finish(
+            job, True,
+            f"¡Descarga completada!\n\n{job.title}\n\nGuardado en: {job.output_folder}{transcription_result}"
+        )
+
+    def _finish(self, job, success, message):
+        """Libera los datos pesados del trabajo y devuelve el resultado final"""
+        if job.use_ssh and job.ssh_round_trips:
+            self.reporter.message(f"Comandos remotos SSH de este trabajo: {job.ssh_round_trips}", "info")
+        job.info = None
+        job.stream_plan = None
+        return success, message
+
+    def _is_archived(self, job, key):
+        """True si el trabajo usa el archivo de descargas y la clave ya está"""
+        return bool(job.use_archive and self.archive and self.archive.contains(key))
+
+    def _mark_archived(self, job):
+        """Registra el contenido del trabajo en el archivo de descargas"""
+        if job.use_archive and self.archive:
+            self.archive.add(job.media_key)
+
+    def _skip_archived(self, job, name):
+        """Marca como completado un trabajo cuyo contenido ya está en el archivo"""
+        self.reporter.progress(job, 100, "Ya descargado anteriormente")
+        self.reporter.message(f"Omitido (ya descargado): {name}", "info")
+        return self._finish(job, True, f"Ya descargado anteriormente (archivo de descargas):\n\n{name}")
+
+    def _find_on_server(self, job, local_path=None):
+        """
+        Busca en el índice de la carpeta remota el contenido de un trabajo
+
+        Args:
+            job: DownloadJob con destino SSH
+            local_path: Archivo ya descargado; si es None se busca por la clave del medio
+
+        Returns:
+            str: Ruta remota del archivo existente, o None
+        """
+        if not local_path and not job.media_key:
+            return None
+
+        from utils.remote_manifest import get_remote_manifest
+        from utils.ssh_client import SSHClient
+        ssh_config = job.ssh_config
+        ssh_client = SSHClient()
+        try:
+            conn_success, conn_msg = ssh_client.connect(
+                ssh_config['host'],
+                ssh_config['port'],
+                ssh_config['username'],
+                ssh_config.get('password'),
+                ssh_config.get('key_file')
+            )
+            if not conn_success:
+                return None
+            manifest = get_remote_manifest(ssh_config)
+            if local_path:
+                return manifest.find_content(ssh_client, local_path)
+            return manifest.find_media(
+                ssh_client, job.media_key, YouTubeDownloader.get_output_variant(job.is_audio, job.quality)
+            )
+        except Exception as e:
+            # El índice es una optimización: si falla, se descarga y sube como siempre
+            self.reporter.message(f"⚠️ No se pudo consultar el índice remoto: {str(e)}", "warning")
+            return None
+        finally:
+            self._release_ssh(job, ssh_client)
+
+    def _record_on_server(self, job, ssh_client, remote_path):
+        """Añade al índice de la carpeta remota un archivo recién subido"""
+        if not REMOTE_MANIFEST_ENABLED:
+            return
+        try:
+            from utils.remote_manifest import get_remote_manifest
+            get_remote_manifest(job.ssh_config).record(
+                ssh_client, remote_path, job.media_key, ssh_client.last_upload_sha256,
+                YouTubeDownloader.get_output_variant(job.is_audio, job.quality)
+            )
+        except Exception as e:
+            self.reporter.message(f"⚠️ No se pudo actualizar el índice remoto: {str(e)}", "warning")
+
+    def _skip_on_server(self, job, remote_path):
+        """Marca como completado un trabajo cuyo contenido ya está en el servidor"""
+        self._mark_archived(job)
+        try:
+            self._cleanup_temp(job)
+        except Exception as e:
+            self.reporter.message(f"⚠️ No se pudo eliminar archivo temporal: {str(e)}", "warning")
+        self.reporter.progress(job, 100, "Ya está en el servidor")
+        self.reporter.message(f"Omitido (ya está en el servidor): {remote_path}", "info")
+        return self._finish(
+            job, True,
+            f"Ya estaba en el servidor:\n\n{job.title}\n\n{remote_path}"
+        )
+
+    @staticmethod
+    def _cleanup_temp(job):
+        """Elimina los archivos y la carpeta temporal de un trabajo"""
+        if not job.temp_dir:
+            return
+        for path in job.filepaths:
+            if path.startswith(job.temp_dir) and os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(job.temp_dir, ignore_errors=True)
+        job.temp_dir = None
+
+    @staticmethod
+    def _pick_output_file(filepaths, is_audio):
+        """
+        Elige el archivo principal entre las rutas que devolvió la descarga
+
+        Args:
+            filepaths: Rutas finales informadas por yt-dlp
+            is_audio: True si se esperaba un MP3
+
+        Returns:
+            str: Ruta del archivo o None si no existe ninguno
+        """
+        existing = [path for path in filepaths if os.path.isfile(path)]
+        extension = '.mp3' if is_audio else '.mp4'
+        for path in existing:
+            if path.lower().endswith(extension):
+                return path
+        return existing[-1] if existing else None
+
+    def _connect_ssh_destination(self, job, required_bytes=None):
+        """
+        Conecta al servidor SSH y prepara la carpeta remota de destino
+
+        La carpeta se comprueba (y se crea si falta) con un único comando
+        remoto, cuyo resultado se reutiliza mientras la sesión del pool siga
+        abierta.
+
+        Args:
+            job: DownloadJob con destino SSH
+            required_bytes: Tamaño que se va a subir, para comprobar el espacio libre
+
+        Returns:
+            SSHClient: Cliente conectado (devolverlo con _release_ssh)
+        """
+        ssh_config = job.ssh_config
+        self.reporter.message("Conectando al servidor SSH...", "info")
+
+        from utils.ssh_client import SSHClient
+        ssh_client = SSHClient()
+        conn_success, conn_msg = ssh_client.connect(
+            ssh_config['host'],
+            ssh_config['port'],
+            ssh_config['username'],
+            ssh_config.get('password'),
+            ssh_config.get('key_file')
+        )
+
+        if not conn_success:
+            raise Exception(f"Error de conexión SSH: {conn_msg}")
+
+        self.reporter.message("✅ Conexión SSH establecida", "success")
+
+        # Existencia, permisos y espacio libre de la carpeta remota en una sola respuesta
+        self.reporter.message("Verificando carpeta remota...", "info")
+        remote_folder = ssh_config['remote_folder']
+        preflight = ssh_client.preflight(remote_folder)
+        if preflight is not None and required_bytes and preflight['free_bytes'] is not None \
+                and preflight['free_bytes'] < required_bytes:
+            # El dato guardado en la sesión puede ser antiguo: confirmar antes de fallar
+            preflight = ssh_client.preflight(remote_folder, refresh=True)
+
+        problem = None
+        if preflight is None:
+            problem = "no se pudo comprobar la carpeta remota"
+        elif not preflight['exists']:
+            problem = "no existe y no se pudo crear"
+        elif not preflight['writable']:
+            problem = "no tiene permisos de escritura"
+        elif required_bytes and preflight['free_bytes'] is not None \
+                and preflight['free_bytes'] < required_bytes:
+            problem = (f"espacio insuficiente ({preflight['free_bytes'] / 1024 / 1024:.1f} MB libres, "
+                       f"{required_bytes / 1024 / 1024:.1f} MB necesarios)")
+
+        if problem:
+            self._release_ssh(job, ssh_client)
+            raise Exception(f"No se puede acceder a la carpeta remota: {problem}")
+        if preflight['created']:
+            self.reporter.message(f"Carpeta remota creada: {remote_folder}", "info")
+
+        return ssh_client
+
+    @staticmethod
+    def _release_ssh(job, ssh_client):
+        """Suma los comandos remotos del cliente al trabajo y lo desconecta"""
+        job.ssh_round_trips += ssh_client.round_trips
+        ssh_client.round_trips = 0
+        ssh_client.disconnect()
+
+    def _stream_upload(self, job):
+        """
+        Transmite el contenido directamente a un archivo SFTP, sin archivo temporal
+
+        Returns:
+            tuple: (True, mensaje) si se transmitió, o None para usar la descarga normal
+        """
+        from download.streamer import MediaStreamer
+
+        ssh_config = job.ssh_config
+        plan = job.stream_plan
+
+        try:
+            ssh_client = self._connect_ssh_destination(job, plan.get('total_bytes'))
+        except Exception as e:
+            # Aún no se ha enviado nada: la descarga a disco reintenta la conexión al subir
+            self.reporter.message(f"⚠️ {str(e)}. Se usará la descarga a disco.", "warning")
+            return None
+        remote_path = posixpath.join(ssh_config['remote_folder'], os.path.basename(plan['filename']))
+        started = time.time()
+
+        def on_progress(transferred, total):
+            speed = transferred / max(time.time() - started, 0.001) / 1024 / 1024
+            percent = int(transferred * 100 / total) if total else 50
+            self.reporter.progress(
+                job, min(percent, 99),
+                f"Transmitiendo al servidor... {transferred / 1024 / 1024:.1f} MB ({speed:.2f} MB/s)"
+            )
+
+        self.reporter.message(f"Transmitiendo directamente a {remote_path}...", "info")
+        try:
+            upload_success, upload_msg = ssh_client.upload_stream(
+                MediaStreamer.iter_chunks(plan), remote_path, plan.get('total_bytes'), on_progress
+            )
+            if upload_success:
+                self._record_on_server(job, ssh_client, remote_path)
+        finally:
+            self._release_ssh(job, ssh_client)
+
+        if not upload_success:
+            self.reporter.message(f"⚠️ {upload_msg}. Se usará la descarga a disco.", "warning")
+            return None
+
+        self._mark_archived(job)
+
+        self.reporter.progress(job, 100, "¡Transmisión completada!")
+        self.reporter.message(f"✅ {upload_msg}", "success")
+        return self._finish(
+            job, True,
+            f"¡Descarga y subida completadas!\n\n{job.title}\n\nGuardado en servidor: {remote_path}"
+        )
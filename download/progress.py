@@ -1,51 +1,64 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Hook para capturar el progreso de la descarga
+Hook de progreso de yt-dlp independiente de Qt
 """
 
-from PySide6.QtCore import QObject, Signal
 
+class ProgressHook:
+    """
+    Traduce los eventos de progreso de yt-dlp a (porcentaje, mensaje)
 
-class DownloadProgressHook(QObject):
-    """Hook para capturar el progreso de la descarga"""
-    progress = Signal(int, str)  # porcentaje, mensaje
-    
-    def __init__(self):
-        super().__init__()
+    No depende de Qt: el resultado se entrega a un callback, así que lo
+    pueden usar tanto la interfaz gráfica como el modo sin interfaz.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Inicializa el hook
+
+        Args:
+            callback: Función que recibe (porcentaje: int, mensaje: str)
+        """
+        self.callback = callback
         self._last_percent = 0
-    
+
+    def emit(self, percent, message):
+        """Entrega un evento de progreso al callback"""
+        if self.callback:
+            self.callback(percent, message)
+
     def hook(self, d):
         """
         Hook que se llama durante la descarga para reportar el progreso
-        
+
         Args:
             d: Diccionario con información del estado de la descarga
         """
         if d['status'] == 'downloading':
             # Calcular porcentaje
-            if 'total_bytes' in d:
+            if d.get('total_bytes'):
                 percent = int((d['downloaded_bytes'] / d['total_bytes']) * 100)
-            elif 'total_bytes_estimate' in d:
+            elif d.get('total_bytes_estimate'):
                 percent = int((d['downloaded_bytes'] / d['total_bytes_estimate']) * 100)
             else:
                 percent = self._last_percent
-            
+
             self._last_percent = percent
-            
+
             # Calcular velocidad
             speed = d.get('speed', 0)
             if speed:
                 speed_str = f"{speed / 1024 / 1024:.2f} MB/s"
             else:
                 speed_str = "Calculando..."
-            
+
             message = f"Descargando... {speed_str}"
-            self.progress.emit(percent, message)
-        
+            self.emit(percent, message)
+
         elif d['status'] == 'finished':
-            self.progress.emit(100, "Procesando archivo...")
-        
+            self.emit(100, "Procesando archivo...")
+
         elif d['status'] == 'error':
             error_msg = d.get('error', 'Error desconocido')
-            self.progress.emit(0, f"Error: {error_msg}")
+            self.emit(0, f"Error: {error_msg}")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transmisión de medios sin archivo temporal local
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+import yt_dlp
+from config import AUDIO_QUALITY, STREAM_BLOCK_SIZE, STREAM_PIPE_BLOCKS
+from download.downloader import YouTubeDownloader
+
+try:
+    from yt_dlp.networking import Request
+except ImportError:  # yt-dlp < 2023.10
+    from urllib.request import Request
+
+
+# Protocolos que se pueden leer directamente (HTTP) o a través de ffmpeg
+DIRECT_PROTOCOLS = ('http', 'https')
+FFMPEG_PROTOCOLS = ('http', 'https', 'm3u8', 'm3u8_native')
+
+# Modos de transmisión
+MODE_DIRECT = "direct"  # bytes del formato tal cual, sin post-procesado
+MODE_FFMPEG = "ffmpeg"  # fusión o conversión con ffmpeg escribiendo en una tubería
+
+
+class MediaStreamer:
+    """
+    Produce los bytes finales de un contenido en bloques, sin tocar el disco
+
+    - Formatos que no necesitan post-procesado: se leen por HTTP y se
+      entregan tal cual.
+    - Salidas fusionadas (vídeo+audio) o convertidas (MP3): ffmpeg lee las
+      URLs de origen y escribe el resultado en una tubería.
+
+    En ambos casos los bloques pasan por una cola en memoria de tamaño
+    limitado, así que el consumo de memoria no depende del tamaño del archivo.
+    """
+
+    @staticmethod
+    def plan(info, is_audio, quality=None):
+        """
+        Decide si un contenido se puede transmitir y cómo
+
+        Args:
+            info: Información extraída (ver YouTubeDownloader.get_video_info)
+            is_audio: True si es solo audio (se convierte a MP3)
+            quality: Calidad del vídeo (solo si is_audio=False)
+
+        Returns:
+            dict: Plan con modo, formatos, nombre de archivo y tamaño estimado,
+                o None si hay que usar la descarga normal a disco
+        """
+        if info.get('_type', 'video') != 'video':
+            return None
+
+        ydl_opts = YouTubeDownloader.get_download_options("%(title)s.%(ext)s", is_audio, quality)
+        ydl_opts.pop('postprocessors', None)
+        ydl_opts.update({'quiet': True, 'no_warnings': True})
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            selected = ydl.process_ie_result(dict(info), download=False)
+            base_name = os.path.splitext(ydl.prepare_filename(selected))[0]
+
+        formats = selected.get('requested_formats') or [selected]
+        if any(not f.get('url') for f in formats):
+            return None
+
+        has_ffmpeg = shutil.which('ffmpeg') is not None
+        protocols = [f.get('protocol', 'https') for f in formats]
+        total = sum((f.get('filesize') or f.get('filesize_approx') or 0) for f in formats) or None
+
+        if not is_audio and len(formats) == 1 and protocols[0] in DIRECT_PROTOCOLS \
+                and formats[0].get('ext') == 'mp4':
+            return {
+                'mode': MODE_DIRECT,
+                'formats': formats,
+                'filename': base_name + '.mp4',
+                'total_bytes': total,
+            }
+
+        if has_ffmpeg and all(p in FFMPEG_PROTOCOLS for p in protocols):
+            return {
+                'mode': MODE_FFMPEG,
+                'formats': formats,
+                'filename': base_name + ('.mp3' if is_audio else '.mp4'),
+                'is_audio': is_audio,
+                # En conversiones el tamaño final no se conoce de antemano
+                'total_bytes': total if not is_audio else None,
+            }
+
+        return None
+
+    @staticmethod
+    def iter_chunks(plan, cancel_event=None):
+        """
+        Genera los bytes del contenido según el plan
+
+        Args:
+            plan: Plan devuelto por MediaStreamer.plan
+            cancel_event: threading.Event opcional para abortar la transmisión
+
+        Yields:
+            bytes: Bloques de hasta STREAM_BLOCK_SIZE bytes
+        """
+        if plan['mode'] == MODE_DIRECT:
+            producer = MediaStreamer._produce_http
+        else:
+            producer = MediaStreamer._produce_ffmpeg
+
+        blocks = queue.Queue(maxsize=STREAM_PIPE_BLOCKS)
+        stop = cancel_event or threading.Event()
+        errors = []
+
+        def run():
+            try:
+                producer(plan, blocks, stop)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                blocks.put(None)
+
+        thread = threading.Thread(target=run, name="media-streamer", daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                block = blocks.get()
+                if block is None:
+                    break
+                yield block
+        finally:
+            # Si el consumidor abandona, desbloquear y parar al productor
+            stop.set()
+            while thread.is_alive():
+                try:
+                    blocks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _put(blocks, stop, block):
+        """Encola un bloque esperando mientras la cola esté llena"""
+        while not stop.is_set():
+            try:
+                blocks.put(block, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _produce_http(plan, blocks, stop):
+        """Lee un formato por HTTP (por rangos si el extractor lo pide)"""
+        fmt = plan['formats'][0]
+        headers = dict(fmt.get('http_headers') or {})
+        chunk_size = (fmt.get('downloader_options') or {}).get('http_chunk_size')
+        filesize = fmt.get('filesize')
+
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+            start = 0
+            while not stop.is_set():
+                request_headers = dict(headers)
+                if chunk_size:
+                    end = start + chunk_size - 1
+                    if filesize:
+                        end = min(end, filesize - 1)
+                    request_headers['Range'] = f"bytes={start}-{end}"
+
+                response = ydl.urlopen(Request(fmt['url'], headers=request_headers))
+                received = 0
+                try:
+                    while not stop.is_set():
+                        block = response.read(STREAM_BLOCK_SIZE)
+                        if not block:
+                            break
+                        received += len(block)
+                        if not MediaStreamer._put(blocks, stop, block):
+                            return
+                finally:
+                    response.close()
+
+                start += received
+                if not chunk_size or received < chunk_size or (filesize and start >= filesize):
+                    return
+
+    @staticmethod
+    def _produce_ffmpeg(plan, blocks, stop):
+        """Fusiona o convierte con ffmpeg escribiendo en una tubería"""
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin']
+        for fmt in plan['formats']:
+            headers = fmt.get('http_headers') or {}
+            if headers:
+                cmd += ['-headers', ''.join(f"{k}: {v}\r\n" for k, v in headers.items())]
+            cmd += ['-i', fmt['url']]
+
+        if plan.get('is_audio'):
+            cmd += ['-vn', '-c:a', 'libmp3lame', '-b:a', f"{AUDIO_QUALITY}k", '-f', 'mp3']
+        else:
+            for index in range(len(plan['formats'])):
+                cmd += ['-map', f"{index}"]
+            # MP4 fragmentado: se puede escribir de forma secuencial sin volver atrás
+            cmd += ['-c', 'copy', '-f', 'mp4', '-movflags', 'frag_keyframe+empty_moov']
+        cmd.append('pipe:1')
+
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   bufsize=STREAM_BLOCK_SIZE)
+        stderr_chunks = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+        )
+        stderr_thread.start()
+
+        try:
+            while not stop.is_set():
+                block = process.stdout.read(STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                if not MediaStreamer._put(blocks, stop, block):
+                    break
+        finally:
+            if stop.is_set() and process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            return_code = process.wait()
+            stderr_thread.join(timeout=5)
+
+        if return_code != 0 and not stop.is_set():
+            error = b''.join(c for c in stderr_chunks if c).decode(errors='replace').strip()
+            raise Exception(f"ffmpeg terminó con código {return_code}: {error[-500:]}")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transcripciones a partir de los subtítulos de la plataforma
+"""
+
+import html
+import json
+import re
+from typing import List, Optional, Tuple
+
+from config import TRANSCRIBE_USE_AUTO_CAPTIONS, TRANSCRIBE_SUBTITLE_FORMATS
+from download.transcriber import AudioTranscriber
+
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+class SubtitleTranscriber:
+    """
+    Convierte los subtítulos que ofrece el extractor en una transcripción
+
+    YouTube y otras plataformas publican subtítulos manuales o automáticos;
+    descargarlos tarda milisegundos frente a los minutos de Whisper. Se usa
+    el diccionario de información ya extraído, sin volver a consultar la
+    plataforma.
+    """
+
+    @staticmethod
+    def find_track(info: dict, language: str = "es",
+                   allow_automatic: bool = TRANSCRIBE_USE_AUTO_CAPTIONS) -> Optional[Tuple[dict, bool]]:
+        """
+        Elige la pista de subtítulos para un idioma
+
+        Se prefieren los subtítulos manuales. De los automáticos solo se
+        aceptan los del idioma original del contenido, nunca traducciones
+        automáticas.
+
+        Args:
+            info: Diccionario de información de yt-dlp
+            language: Idioma pedido (es, en, etc.)
+            allow_automatic: Aceptar subtítulos automáticos
+
+        Returns:
+            tuple: (pista: dict, automática: bool), o None si no hay ninguna
+        """
+        if not info:
+            return None
+
+        track = SubtitleTranscriber._pick_format(
+            SubtitleTranscriber._matching_tracks(info.get('subtitles') or {}, language)
+        )
+        if track:
+            return track, False
+
+        if not allow_automatic:
+            return None
+        # Si se conoce el idioma del contenido y es otro, los automáticos serían traducciones
+        content_language = (info.get('language') or '').lower()
+        if content_language and content_language.split('-')[0] != language.lower():
+            return None
+
+        captions = info.get('automatic_captions') or {}
+        candidates = captions.get(f"{language}-orig") or [
+            t for t in SubtitleTranscriber._matching_tracks(captions, language)
+            if 'tlang=' not in (t.get('url') or '')
+        ]
+        track = SubtitleTranscriber._pick_format(candidates)
+        return (track, True) if track else None
+
+    @staticmethod
+    def transcribe(info: dict, audio_path: str, output_path: Optional[str] = None,
+                   language: str = "es", with_timestamps: bool = False):
+        """
+        Genera la transcripción desde los subtítulos, con el mismo formato que Whisper
+
+        Args:
+            info: Diccionario de información de yt-dlp
+            audio_path: Archivo de audio (para la cabecera)
+            output_path: Ruta donde guardar el archivo de texto (opcional)
+            language: Idioma pedido
+            with_timestamps: Incluir marcas de tiempo por segmento
+
+        Returns:
+            tuple: (éxito: bool, mensaje: str, texto: str); éxito es False si
+                no hay subtítulos utilizables
+        """
+        found = SubtitleTranscriber.find_track(info, language)
+        if not found:
+            return False, f"No hay subtítulos en '{language}'", None
+        track, automatic = found
+
+        try:
+            segments = SubtitleTranscriber.parse(
+                SubtitleTranscriber._fetch(track), track.get('ext'), automatic=automatic
+            )
+        except Exception as e:
+            return False, f"No se pudieron descargar los subtítulos: {str(e)}", None
+        if not segments:
+            return False, "Los subtítulos están vacíos", None
+
+        if with_timestamps:
+            text = AudioTranscriber.format_segments(segments)
+        else:
+            text = " ".join(segment_text for _, _, segment_text in segments)
+
+        source = "Subtítulos automáticos de la plataforma" if automatic else "Subtítulos de la plataforma"
+        try:
+            return AudioTranscriber.save_transcript(
+                text, audio_path, output_path, language=language,
+                with_timestamps=with_timestamps, source=source
+            )
+        except OSError as e:
+            return False, f"Error al guardar la transcripción: {str(e)}", None
+
+    @staticmethod
+    def parse(data: str, ext: Optional[str], automatic: bool = False) -> List[Tuple[float, float, str]]:
+        """
+        Convierte un archivo de subtítulos en segmentos
+
+        Args:
+            data: Contenido del archivo
+            ext: Formato (json3, vtt o srt)
+            automatic: Subtítulos automáticos (cada bloque repite líneas del anterior)
+
+        Returns:
+            list: [(inicio, fin, texto), ...] con tiempos en segundos
+        """
+        if ext == 'json3':
+            return SubtitleTranscriber._parse_json3(data)
+        return SubtitleTranscriber._parse_cues(data, rolling=automatic)
+
+    @staticmethod
+    def _matching_tracks(tracks: dict, language: str) -> list:
+        """Pistas del idioma pedido: primero la exacta y luego sus variantes (es-ES, es-419...)"""
+        language = language.lower()
+        exact = []
+        variants = []
+        for code, formats in tracks.items():
+            code = code.lower()
+            if code == language:
+                exact.extend(formats)
+            elif code.startswith(f"{language}-") and code != f"{language}-orig":
+                variants.extend(formats)
+        return exact + variants
+
+    @staticmethod
+    def _pick_format(tracks: list) -> Optional[dict]:
+        """Primera pista en el formato preferido que se sabe convertir"""
+        for ext in TRANSCRIBE_SUBTITLE_FORMATS:
+            for track in tracks:
+                if track.get('ext') == ext and (track.get('url') or track.get('data')):
+                    return track
+        return None
+
+    @staticmethod
+    def _fetch(track: dict) -> str:
+        """Contenido de la pista (algunos extractores lo incluyen en el diccionario)"""
+        if track.get('data'):
+            return track['data']
+
+        import yt_dlp
+        # A través de yt-dlp, con las mismas opciones que get_video_info, para usar sus cabeceras HTTP
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+            return ydl.urlopen(track['url']).read().decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _parse_json3(data: str) -> List[Tuple[float, float, str]]:
+        """Formato json3 de YouTube: eventos con fragmentos de texto"""
+        events = [e for e in json.loads(data).get('events', []) if e.get('segs')]
+        segments = []
+        for index, event in enumerate(events):
+            text = " ".join("".join(seg.get('utf8', '') for seg in event['segs']).split())
+            if not text:
+                continue
+            start = event.get('tStartMs', 0) / 1000
+            end = start + event.get('dDurationMs', 0) / 1000
+            # Los automáticos se solapan con el siguiente evento: cortar donde empieza
+            if index + 1 < len(events):
+                next_start = events[index + 1].get('tStartMs', 0) / 1000
+                if next_start > start:
+                    end = min(end, next_start)
+            segments.append((start, max(start, end), text))
+        return segments
+
+    @staticmethod
+    def _parse_cues(data: str, rolling: bool = False) -> List[Tuple[float, float, str]]:
+        """
+        Formatos vtt y srt: bloques con una línea "inicio --> fin" y el texto
+
+        Los subtítulos automáticos (rolling) repiten en cada bloque la línea
+        del anterior (texto que sube); de ellos solo se conservan las líneas
+        nuevas. En los manuales una línea repetida es diálogo real.
+        """
+        segments = []
+        previous_lines = []
+        for block in re.split(r"\r?\n\s*\r?\n", data):
+            lines = block.strip().splitlines()
+            timing = next((i for i, line in enumerate(lines) if '-->' in line), None)
+            if timing is None:
+                continue
+
+            start_text, end_text = lines[timing].split('-->', 1)
+            try:
+                start = SubtitleTranscriber._parse_time(start_text)
+                end = SubtitleTranscriber._parse_time(end_text.split()[0])
+            except (ValueError, IndexError):
+                continue
+
+            cue_lines = [" ".join(html.unescape(_TAG.sub("", line)).split()) for line in lines[timing + 1:]]
+            cue_lines = [line for line in cue_lines if line]
+            new_lines = [line for line in cue_lines if not rolling or line not in previous_lines]
+            previous_lines = cue_lines
+            if new_lines:
+                segments.append((start, end, " ".join(new_lines)))
+        return segments
+
+    @staticmethod
+    def _parse_time(value: str) -> float:
+        """Convierte "HH:MM:SS.mmm", "MM:SS.mmm" o "HH:MM:SS,mmm" a segundos"""
+        seconds = 0.0
+        for part in value.strip().replace(',', '.').split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
@@ -9,6 +9,8 @@ import subprocess
 import tempfile
 from pathlib import Path
 
+from download.model_cache import get_model_cache
+
 
 class AudioTranscriber:
     """Clase para transcribir audio a texto"""
@@ -42,46 +44,21 @@ class AudioTranscriber:
             tuple: (éxito: bool, mensaje: str, texto: str)
         """
         try:
-            import whisper
-
             if not os.path.exists(audio_path):
                 return False, f"El archivo de audio no existe: {audio_path}", None
 
-            # Cargar modelo
-            model = whisper.load_model(model_name)
-
-            # Transcribir
-            result = model.transcribe(
-                audio_path,
-                language=language,
-                verbose=False
-            )
+            # Modelo de la caché del proceso (solo se carga la primera vez)
+            with get_model_cache().lease(model_name) as model:
+                result = model.transcribe(
+                    audio_path,
+                    language=language,
+                    verbose=False
+                )
 
             transcription_text = result["text"].strip()
-
-            # Guardar transcripción si se especifica ruta
-            if output_path:
-                # Crear contenido con formato
-                content = f"""================================================================================
-TRANSCRIPCION DE AUDIO
-================================================================================
-Archivo: {os.path.basename(audio_path)}
-Modelo: Whisper {model_name}
-Idioma: {language}
-================================================================================
-
-{transcription_text}
-
-================================================================================
-Generado con Media Downloader - Whisper AI
-================================================================================
-"""
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-                return True, f"Transcripción guardada en: {output_path}", transcription_text
-            else:
-                return True, "Transcripción completada", transcription_text
+            return AudioTranscriber.save_transcript(
+                transcription_text, audio_path, output_path, model_name, language
+            )
 
         except ImportError:
             return False, "Whisper no está instalado. Ejecuta: pip install openai-whisper", None
@@ -103,63 +80,94 @@ Generado con Media Downloader - Whisper AI
             tuple: (éxito: bool, mensaje: str, texto: str)
         """
         try:
-            import whisper
-
             if not os.path.exists(audio_path):
                 return False, f"El archivo de audio no existe: {audio_path}", None
 
-            # Cargar modelo
-            model = whisper.load_model(model_name)
+            # Modelo de la caché del proceso (solo se carga la primera vez)
+            with get_model_cache().lease(model_name) as model:
+                result = model.transcribe(
+                    audio_path,
+                    language=language,
+                    verbose=False
+                )
 
-            # Transcribir
-            result = model.transcribe(
-                audio_path,
-                language=language,
-                verbose=False
+            # Formatear con timestamps
+            transcription_text = AudioTranscriber.format_segments(
+                (segment["start"], segment["end"], segment["text"]) for segment in result["segments"]
+            )
+            return AudioTranscriber.save_transcript(
+                transcription_text, audio_path, output_path, model_name, language, with_timestamps=True
             )
 
-            # Formatear con timestamps
-            lines = []
-            for segment in result["segments"]:
-                start = segment["start"]
-                end = segment["end"]
-                text = segment["text"].strip()
+        except ImportError:
+            return False, "Whisper no está instalado. Ejecuta: pip install openai-whisper", None
+        except Exception as e:
+            return False, f"Error en la transcripción: {str(e)}", None
+
+    @staticmethod
+    def format_segments(segments):
+        """
+        Formatea segmentos como líneas "[HH:MM:SS -> HH:MM:SS] texto"
+
+        Args:
+            segments: Iterable de (inicio, fin, texto) con tiempos en segundos
+
+        Returns:
+            str: Una línea por segmento
+        """
+        lines = []
+        for start, end, text in segments:
+            # Formatear tiempo
+            start_str = AudioTranscriber._format_time(start)
+            end_str = AudioTranscriber._format_time(end)
+
+            lines.append(f"[{start_str} -> {end_str}] {text.strip()}")
 
-                # Formatear tiempo
-                start_str = AudioTranscriber._format_time(start)
-                end_str = AudioTranscriber._format_time(end)
+        return "\n".join(lines)
 
-                lines.append(f"[{start_str} -> {end_str}] {text}")
+    @staticmethod
+    def save_transcript(transcription_text, audio_path, output_path=None, model_name="base",
+                        language="es", with_timestamps=False, source=None):
+        """
+        Guarda una transcripción con la cabecera habitual
 
-            transcription_text = "\n".join(lines)
+        Args:
+            transcription_text: Texto ya formateado
+            audio_path: Archivo de audio de origen (para la cabecera)
+            output_path: Ruta del archivo de texto; si es None no se guarda nada
+            model_name: Modelo de Whisper usado
+            language: Idioma del audio
+            with_timestamps: True si el texto lleva marcas de tiempo
+            source: Origen del texto si no es Whisper (p. ej. subtítulos de la plataforma)
 
-            # Guardar transcripción si se especifica ruta
-            if output_path:
-                content = f"""================================================================================
-TRANSCRIPCION DE AUDIO (CON TIMESTAMPS)
+        Returns:
+            tuple: (éxito: bool, mensaje: str, texto: str)
+        """
+        if not output_path:
+            return True, "Transcripción completada", transcription_text
+
+        # Crear contenido con formato
+        title = "TRANSCRIPCION DE AUDIO (CON TIMESTAMPS)" if with_timestamps else "TRANSCRIPCION DE AUDIO"
+        origin = f"Origen: {source}" if source else f"Modelo: Whisper {model_name}"
+        footer = "Generado con Media Downloader" if source else "Generado con Media Downloader - Whisper AI"
+        content = f"""================================================================================
+{title}
 ================================================================================
 Archivo: {os.path.basename(audio_path)}
-Modelo: Whisper {model_name}
+{origin}
 Idioma: {language}
 ================================================================================
 
 {transcription_text}
 
 ================================================================================
-Generado con Media Downloader - Whisper AI
+{footer}
 ================================================================================
 """
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-                return True, f"Transcripción guardada en: {output_path}", transcription_text
-            else:
-                return True, "Transcripción completada", transcription_text
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(content)
 
-        except ImportError:
-            return False, "Whisper no está instalado. Ejecuta: pip install openai-whisper", None
-        except Exception as e:
-            return False, f"Error en la transcripción: {str(e)}", None
+        return True, f"Transcripción guardada en: {output_path}", transcription_text
 
     @staticmethod
     def _format_time(seconds):
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servicio de transcripción en procesos aparte
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from config import (
+    TRANSCRIBE_WORKERS, TRANSCRIBE_TORCH_THREADS, TRANSCRIBE_CRASH_RETRIES,
+    TRANSCRIBE_LONG_AUDIO_SECONDS, TRANSCRIBE_MIN_CHUNK_SECONDS, TRANSCRIBE_CHUNKS_PER_WORKER
+)
+
+
+def _init_worker(torch_threads: int):
+    """Prepara un proceso de transcripción (se ejecuta una vez en cada proceso)"""
+    # Antes de importar torch, para que las bibliotecas numéricas respeten el límite
+    os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(torch_threads))
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _run_transcription(with_segments: bool, audio_path: str, output_path: Optional[str],
+                       model_name: str, language: str):
+    """Transcribe en el proceso hijo (el modelo queda en la caché de ese proceso)"""
+    from download.transcriber import AudioTranscriber
+    method = AudioTranscriber.transcribe_with_segments if with_segments else AudioTranscriber.transcribe
+    return method(audio_path, output_path, model_name=model_name, language=language)
+
+
+def _run_chunk(audio_path: str, start: float, end: float, model_name: str, language: str,
+               raw_pcm: bool = False):
+    """
+    Transcribe un tramo en el proceso hijo
+
+    Args:
+        raw_pcm: True si audio_path es un archivo PCM de decode_to_pcm (se
+            lee mapeado en memoria en lugar de decodificarlo con ffmpeg)
+
+    Returns:
+        tuple: (éxito: bool, mensaje: str, segmentos: [(inicio, fin, texto), ...])
+            con tiempos absolutos dentro del archivo
+    """
+    try:
+        from download.audio_chunks import load_audio_range, load_pcm_range
+        from download.model_cache import get_model_cache
+
+        if raw_pcm:
+            audio = load_pcm_range(audio_path, start, end)
+        else:
+            audio = load_audio_range(audio_path, start, end - start)
+        with get_model_cache().lease(model_name) as model:
+            result = model.transcribe(audio, language=language, verbose=False)
+
+        segments = [
+            (start + segment["start"], min(end, start + segment["end"]), segment["text"].strip())
+            for segment in result["segments"]
+        ]
+        return True, "Tramo transcrito", segments
+    except ImportError:
+        return False, "Whisper no está instalado. Ejecuta: pip install openai-whisper", None
+    except Exception as e:
+        return False, f"Error en la transcripción: {str(e)}", None
+
+
+class TranscriptionService:
+    """
+    Cola de transcripciones atendida por un pool de procesos
+
+    La transcripción no comparte el GIL ni la memoria con Qt y yt-dlp, y
+    varios archivos se transcriben a la vez. Cada proceso conserva sus
+    modelos cargados (WhisperModelCache). Si un proceso muere (falta de
+    memoria, fallo de una biblioteca nativa), el pool se vuelve a crear y el
+    trabajo se reintenta; la aplicación sigue funcionando. Los procesos no
+    son daemon: al cerrar la aplicación hay que llamar a shutdown(wait=False)
+    para no esperar a que terminen las transcripciones pendientes.
+
+    Los audios largos (TRANSCRIBE_LONG_AUDIO_SECONDS) se dividen en tramos
+    cortando en silencios; los tramos se transcriben en paralelo y los
+    segmentos se unen con sus tiempos absolutos.
+    """
+
+    def __init__(self, workers: int = TRANSCRIBE_WORKERS,
+                 torch_threads: int = TRANSCRIBE_TORCH_THREADS,
+                 crash_retries: int = TRANSCRIBE_CRASH_RETRIES):
+        """
+        Inicializa el servicio (los procesos se crean con la primera petición)
+
+        Args:
+            workers: Número de procesos
+            torch_threads: Hilos de cálculo de torch en cada proceso
+            crash_retries: Reintentos de un trabajo cuyo proceso se cayó
+        """
+        self.workers = max(1, int(workers))
+        self.torch_threads = max(1, int(torch_threads))
+        self.crash_retries = max(0, int(crash_retries))
+        self.restarts = 0
+        self._executor = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, audio_path: str, output_path: Optional[str] = None,
+               model_name: str = "base", language: str = "es",
+               with_segments: bool = False) -> Future:
+        """
+        Encola una transcripción
+
+        Args:
+            audio_path: Ruta al archivo de audio
+            output_path: Ruta donde guardar el archivo de texto (opcional)
+            model_name: Modelo de Whisper a usar
+            language: Idioma del audio
+            with_segments: Incluir marcas de tiempo por segmento
+
+        Returns:
+            Future: Se resuelve con (éxito: bool, mensaje: str, texto: str)
+        """
+        result = Future()
+        args = (with_segments, audio_path, output_path, model_name, language)
+
+        # Medir la duración y buscar silencios lleva un momento: fuera del hilo que llama
+        def plan():
+            try:
+                chunks = self._plan_long_audio(audio_path)
+                if chunks:
+                    self._dispatch_chunks(result, chunks, *args)
+                else:
+                    self._dispatch(result, _run_transcription, args, self.crash_retries)
+            except Exception as e:
+                result.set_result((False, f"Error en la transcripción: {str(e)}", None))
+
+        threading.Thread(target=plan, name="transcription-planner", daemon=True).start()
+        return result
+
+    def submit_pcm(self, pcm_path: str, output_path: Optional[str] = None,
+                   model_name: str = "base", language: str = "es",
+                   with_segments: bool = False, source_name: Optional[str] = None) -> Future:
+        """
+        Encola la transcripción de un archivo PCM de decode_to_pcm
+
+        Los procesos leen las muestras mapeadas en memoria y se las pasan
+        directamente al modelo, sin que Whisper vuelva a decodificar un
+        archivo comprimido. Los audios largos se dividen igual que en submit.
+
+        Args:
+            pcm_path: Archivo PCM mono de 16 kHz
+            output_path: Ruta donde guardar el archivo de texto (opcional)
+            model_name: Modelo de Whisper a usar
+            language: Idioma del audio
+            with_segments: Incluir marcas de tiempo por segmento
+            source_name: Nombre del contenido para la cabecera de la transcripción
+
+        Returns:
+            Future: Se resuelve con (éxito: bool, mensaje: str, texto: str)
+        """
+        result = Future()
+
+        def plan():
+            try:
+                from download.audio_chunks import pcm_duration
+                duration = pcm_duration(pcm_path)
+                chunks = self._plan_long_audio(pcm_path, duration=duration, raw_pcm=True) or [(0.0, duration)]
+                self._dispatch_chunks(result, chunks, with_segments, pcm_path, output_path,
+                                      model_name, language, raw_pcm=True, source_name=source_name)
+            except Exception as e:
+                result.set_result((False, f"Error en la transcripción: {str(e)}", None))
+
+        threading.Thread(target=plan, name="transcription-planner", daemon=True).start()
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """
+        Detiene el servicio; las peticiones posteriores fallan
+
+        Args:
+            wait: True para esperar a las transcripciones en curso; False
+                para terminar los procesos en el acto (al cerrar la aplicación)
+        """
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if not executor:
+            return
+
+        # Tras shutdown() el pool ya no conserva la lista de procesos
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=wait, cancel_futures=True)
+        if not wait:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join(timeout=5)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos actual, creándolo si no existe (requiere el lock)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: los hijos no heredan el estado de Qt ni los hilos del proceso principal
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.torch_threads,)
+            )
+        return self._executor
+
+    def _plan_long_audio(self, audio_path: str, duration: Optional[float] = None,
+                         raw_pcm: bool = False) -> Optional[list]:
+        """
+        Tramos en los que dividir un audio largo
+
+        Args:
+            audio_path: Archivo de audio (o PCM si raw_pcm)
+            duration: Duración ya conocida (si no, se mide con ffprobe)
+            raw_pcm: True si audio_path es un archivo PCM de decode_to_pcm
+
+        Returns:
+            list: [(inicio, fin), ...], o None si se transcribe de una vez
+                (audio corto, un solo proceso o sin ffmpeg)
+        """
+        if self.workers < 2 or not os.path.exists(audio_path):
+            return None
+
+        from download.audio_chunks import probe_duration, detect_silences, detect_silences_pcm, plan_chunks
+        if duration is None:
+            duration = probe_duration(audio_path)
+        if not duration or duration < TRANSCRIBE_LONG_AUDIO_SECONDS:
+            return None
+
+        parts = min(int(duration // TRANSCRIBE_MIN_CHUNK_SECONDS), self.workers * TRANSCRIBE_CHUNKS_PER_WORKER)
+        if parts < 2:
+            return None
+        silences = detect_silences_pcm(audio_path) if raw_pcm else detect_silences(audio_path)
+        chunks = plan_chunks(duration, silences, parts)
+        return chunks if len(chunks) > 1 else None
+
+    def _dispatch_chunks(self, result: Future, chunks: list, with_segments: bool, audio_path: str,
+                         output_path: Optional[str], model_name: str, language: str,
+                         raw_pcm: bool = False, source_name: Optional[str] = None):
+        """Transcribe los tramos en paralelo y une los segmentos con sus tiempos absolutos"""
+        from download.transcriber import AudioTranscriber
+
+        parts = [Future() for _ in chunks]
+        remaining = [len(parts)]
+        lock = threading.Lock()
+
+        def on_part_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                segments = []
+                for part in parts:
+                    success, message, part_segments = part.result()
+                    if not success:
+                        result.set_result((False, message, None))
+                        return
+                    segments.extend(part_segments)
+
+                if with_segments:
+                    text = AudioTranscriber.format_segments(segments)
+                else:
+                    text = " ".join(segment_text for _, _, segment_text in segments if segment_text)
+                result.set_result(AudioTranscriber.save_transcript(
+                    text, source_name or audio_path, output_path, model_name, language,
+                    with_timestamps=with_segments
+                ))
+            except Exception as e:
+                result.set_result((False, f"Error al unir la transcripción: {str(e)}", None))
+
+        for part, (start, end) in zip(parts, chunks):
+            part.add_done_callback(on_part_done)
+            self._dispatch(part, _run_chunk, (audio_path, start, end, model_name, language, raw_pcm),
+                           self.crash_retries)
+
+    def _dispatch(self, result: Future, function, args: tuple, retries_left: int):
+        """Envía un trabajo al pool y enlaza su resultado con el Future devuelto"""
+        with self._lock:
+            if self._closed:
+                result.set_result((False, "El servicio de transcripción está detenido", None))
+                return
+            try:
+                executor = self._get_executor()
+                inner = executor.submit(function, *args)
+            except BrokenProcessPool:
+                # El pool se rompió justo ahora: se crea otro
+                self._restart_locked(self._executor)
+                executor = self._get_executor()
+                inner = executor.submit(function, *args)
+
+        def on_done(future):
+            try:
+                result.set_result(future.result())
+            except CancelledError:
+                result.set_result((False, "Transcripción cancelada", None))
+            except BrokenProcessPool:
+                with self._lock:
+                    self._restart_locked(executor)
+                    closed = self._closed
+                if closed:
+                    # Procesos terminados por shutdown(): no se reintenta
+                    result.set_result((False, "Transcripción cancelada", None))
+                elif retries_left > 0:
+                    self._dispatch(result, function, args, retries_left - 1)
+                else:
+                    result.set_result((
+                        False,
+                        "El proceso de transcripción terminó inesperadamente (¿falta de memoria?)",
+                        None
+                    ))
+            except Exception as e:
+                result.set_result((False, f"Error en la transcripción: {str(e)}", None))
+
+        inner.add_done_callback(on_done)
+
+    def _restart_locked(self, broken: Optional[ProcessPoolExecutor]):
+        """Descarta un pool roto si sigue siendo el actual (requiere el lock)"""
+        if broken is None or self._executor is not broken:
+            return  # Otro trabajo ya lo reemplazó
+        self._executor = None
+        self.restarts += 1
+        try:
+            broken.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_transcription_service() -> TranscriptionService:
+    """
+    Obtiene el servicio de transcripción compartido del proceso
+
+    Returns:
+        TranscriptionService: Instancia única
+    """
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = TranscriptionService()
+        return _default_service
@@ -6,14 +6,17 @@ Descargador de YouTube - Aplicación de escritorio
 """
 
 import sys
-from PySide6.QtWidgets import QApplication
 
-from ui.main_window import YouTubeDownloaderApp
 from config import APP_NAME
 
 
 def main():
     """Función principal"""
+    # Qt y la interfaz se importan aquí y no al cargar el módulo: los procesos
+    # de transcripción (spawn) vuelven a importar este archivo como __mp_main__
+    from PySide6.QtWidgets import QApplication
+    from ui.main_window import YouTubeDownloaderApp
+
     app = QApplication(sys.argv)
     
     # Establecer estilo de la aplicación
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mide el tiempo de arranque de la aplicación
+
+Cada medición se hace en un proceso nuevo (arranque en frío de Python):
+- import: tiempo de importar ui.main_window
+- first_paint: desde el inicio del proceso hasta el primer pintado de la ventana
+- ready: hasta que termina la construcción diferida (estilos y pestaña SSH)
+
+También comprueba que los módulos pesados no se cargan al arrancar.
+Sale con código 1 si se supera algún presupuesto.
+
+Uso:
+    python3 scripts/benchmark_startup.py
+    python3 scripts/benchmark_startup.py --runs 5 --record startup.jsonl
+    QT_QPA_PLATFORM=offscreen python3 scripts/benchmark_startup.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos que no deben importarse hasta que se usan
+LAZY_MODULES = ('yt_dlp', 'paramiko', 'whisper', 'ui.ssh_browser', 'download.streamer')
+
+# Presupuestos por defecto (milisegundos, mediana de las ejecuciones)
+DEFAULT_IMPORT_BUDGET_MS = 800
+DEFAULT_FIRST_PAINT_BUDGET_MS = 1500
+
+# Código que se ejecuta en el proceso hijo
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+app = QApplication(sys.argv[:1])
+app.setStyle('Fusion')
+qt_loaded = time.perf_counter()
+
+from ui.main_window import YouTubeDownloaderApp
+imported = time.perf_counter()
+
+window = YouTubeDownloaderApp()
+window.show()
+
+def check():
+    if 'ready' in window.startup_times:
+        app.quit()
+    else:
+        QTimer.singleShot(5, check)
+
+QTimer.singleShot(0, check)
+QTimer.singleShot(30000, app.quit)
+app.exec()
+
+times = window.startup_times
+result = {
+    'qt_ms': (qt_loaded - start) * 1000,
+    'import_ms': (imported - qt_loaded) * 1000,
+    'ui_built_ms': (times['ui_built'] - start) * 1000,
+    'first_paint_ms': (times['first_paint'] - start) * 1000 if 'first_paint' in times else None,
+    'ready_ms': (times['ready'] - start) * 1000 if 'ready' in times else None,
+    'loaded_lazy_modules': [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+}
+print(json.dumps(result))
+"""
+
+
+def run_once():
+    """
+    Ejecuta una medición en un proceso nuevo
+
+    Returns:
+        dict: Tiempos en milisegundos y módulos pesados cargados
+    """
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE, str(PROJECT_DIR), json.dumps(LAZY_MODULES)],
+        capture_output=True, text=True, env=env, cwd=str(PROJECT_DIR), timeout=120
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"código {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def median(results, key):
+    """Mediana de un campo ignorando las ejecuciones sin valor"""
+    values = [r[key] for r in results if r.get(key) is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de la aplicación")
+    parser.add_argument('--runs', type=int, default=3, help="Número de arranques a medir")
+    parser.add_argument('--import-budget', type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="Máximo de milisegundos para importar la ventana principal")
+    parser.add_argument('--first-paint-budget', type=float, default=DEFAULT_FIRST_PAINT_BUDGET_MS,
+                        help="Máximo de milisegundos hasta el primer pintado")
+    parser.add_argument('--record', metavar='FILE',
+                        help="Añade el resultado como una línea JSON a este archivo")
+    args = parser.parse_args()
+
+    results = []
+    for index in range(max(1, args.runs)):
+        try:
+            results.append(run_once())
+        except Exception as e:
+            print(f"Error en la ejecución {index + 1}: {e}", file=sys.stderr)
+            return 2
+
+    summary = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'runs': len(results),
+        'qt_ms': median(results, 'qt_ms'),
+        'import_ms': median(results, 'import_ms'),
+        'ui_built_ms': median(results, 'ui_built_ms'),
+        'first_paint_ms': median(results, 'first_paint_ms'),
+        'ready_ms': median(results, 'ready_ms'),
+        'loaded_lazy_modules': sorted({m for r in results for m in r['loaded_lazy_modules']}),
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    if args.record:
+        with open(args.record, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+    problems = []
+    if summary['import_ms'] is not None and summary['import_ms'] > args.import_budget:
+        problems.append(f"import {summary['import_ms']} ms > {args.import_budget} ms")
+    if summary['first_paint_ms'] is None:
+        problems.append("la ventana no llegó a pintarse")
+    elif summary['first_paint_ms'] > args.first_paint_budget:
+        problems.append(f"primer pintado {summary['first_paint_ms']} ms > {args.first_paint_budget} ms")
+    if summary['loaded_lazy_modules']:
+        problems.append("módulos pesados cargados al arrancar: " + ", ".join(summary['loaded_lazy_modules']))
+
+    for problem in problems:
+        print(f"❌ {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+# Pruebas
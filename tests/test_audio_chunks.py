@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la división del audio en tramos
+"""
+
+import os
+import tempfile
+import unittest
+from array import array
+
+from download.audio_chunks import (
+    SAMPLE_RATE, plan_chunks, pcm_duration, load_pcm_range, detect_silences_pcm
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class PlanChunksTest(unittest.TestCase):
+    """Cortes en silencios cercanos a la posición ideal"""
+
+    def assert_contiguous(self, chunks, duration):
+        self.assertEqual(chunks[0][0], 0.0)
+        self.assertEqual(chunks[-1][1], duration)
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+
+    def test_single_part(self):
+        self.assertEqual(plan_chunks(100.0, [(40.0, 42.0)], 1), [(0.0, 100.0)])
+        self.assertEqual(plan_chunks(100.0, [], 0), [(0.0, 100.0)])
+
+    def test_cuts_at_nearest_silence_midpoint(self):
+        silences = [(280.0, 282.0), (310.0, 320.0), (590.0, 596.0)]
+        chunks = plan_chunks(900.0, silences, 3, search_window=60)
+        self.assertEqual(chunks, [(0.0, 315.0), (315.0, 593.0), (593.0, 900.0)])
+
+    def test_ideal_cut_without_nearby_silence(self):
+        chunks = plan_chunks(900.0, [(100.0, 102.0)], 3, search_window=60)
+        self.assertEqual(chunks, [(0.0, 300.0), (300.0, 600.0), (600.0, 900.0)])
+
+    def test_silences_in_any_order(self):
+        silences = [(590.0, 596.0), (280.0, 282.0)]
+        chunks = plan_chunks(900.0, silences, 3, search_window=60)
+        self.assertEqual(chunks, [(0.0, 281.0), (281.0, 593.0), (593.0, 900.0)])
+
+    def test_silence_is_not_reused(self):
+        # Un único silencio cerca de los dos cortes: el segundo va a su posición ideal
+        chunks = plan_chunks(30.0, [(14.0, 16.0)], 3, search_window=10)
+        self.assertEqual(chunks, [(0.0, 15.0), (15.0, 20.0), (20.0, 30.0)])
+        self.assert_contiguous(chunks, 30.0)
+
+    def test_chunks_cover_duration(self):
+        silences = [(i * 37.0, i * 37.0 + 1.5) for i in range(1, 100)]
+        for parts in range(1, 12):
+            chunks = plan_chunks(3600.0, silences, parts)
+            self.assertEqual(len(chunks), parts)
+            self.assert_contiguous(chunks, 3600.0)
+
+
+class PcmTest(unittest.TestCase):
+    """Archivos PCM mono de 16 kHz (s16le) de decode_to_pcm"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.pcm_path = os.path.join(temp_dir.name, 'audio.pcm')
+
+    def write_pcm(self, *sections):
+        """Escribe tramos (segundos, amplitud) de valor constante"""
+        samples = array('h')
+        for seconds, amplitude in sections:
+            samples.extend([amplitude] * int(seconds * SAMPLE_RATE))
+        with open(self.pcm_path, 'wb') as f:
+            f.write(samples.tobytes())
+
+    def test_duration(self):
+        self.write_pcm((2.5, 0))
+        self.assertEqual(pcm_duration(self.pcm_path), 2.5)
+
+    @unittest.skipIf(numpy is None, "numpy no está instalado")
+    def test_load_range(self):
+        self.write_pcm((1.0, 16384), (1.0, -8192))
+        self.assertEqual(len(load_pcm_range(self.pcm_path)), 2 * SAMPLE_RATE)
+
+        samples = load_pcm_range(self.pcm_path, 0.5, 1.25)
+        self.assertEqual(len(samples), int(0.75 * SAMPLE_RATE))
+        self.assertEqual(samples[0], 0.5)
+        self.assertEqual(samples[-1], -0.25)
+
+        # Un final más allá del archivo se recorta
+        self.assertEqual(len(load_pcm_range(self.pcm_path, 1.5, 10.0)), SAMPLE_RATE // 2)
+
+    @unittest.skipIf(numpy is None, "numpy no está instalado")
+    def test_detect_silences(self):
+        # La pausa corta no llega a min_silence
+        self.write_pcm((1.0, 10000), (0.2, 0), (0.8, -10000), (1.0, 0), (0.5, 10000))
+        self.assertEqual(detect_silences_pcm(self.pcm_path, noise_db=-35, min_silence=0.5),
+                         [(2.0, 3.0)])
+        self.assertEqual(detect_silences_pcm(self.pcm_path, noise_db=-35, min_silence=0.1),
+                         [(1.0, 1.2), (2.0, 3.0)])
+
+    @unittest.skipIf(numpy is None, "numpy no está instalado")
+    def test_quiet_noise_counts_as_silence(self):
+        # Amplitud 100 (unos -50 dB) queda por debajo del umbral de -35 dB
+        self.write_pcm((1.0, 100), (1.0, 10000))
+        self.assertEqual(detect_silences_pcm(self.pcm_path, noise_db=-35, min_silence=0.5),
+                         [(0.0, 1.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del modo sin interfaz gráfica
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import cli
+import download.downloader as downloader
+import utils.metadata_cache as metadata_cache
+from download.downloader import YouTubeDownloader
+from utils.metadata_cache import MetadataCache
+
+
+def _fake_yt_dlp():
+    """
+    Módulo yt_dlp mínimo que, como el real, escribe en stdout salvo con quiet
+    """
+    info = {
+        '_type': 'video',
+        'id': 'abc123',
+        'extractor_key': 'Generic',
+        'title': 'Prueba',
+        'formats': [{'format_id': '0', 'url': 'https://example.com/a.m4a'}],
+    }
+
+    class YoutubeDL:
+        def __init__(self, params=None):
+            self.params = params or {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def to_screen(self, text):
+            if not self.params.get('quiet'):
+                print(text)
+
+        @staticmethod
+        def sanitize_info(value):
+            return json.loads(json.dumps(value))
+
+        def extract_info(self, url, download=False, process=True):
+            self.to_screen(f"[generic] Extracting URL: {url}")
+            return dict(info)
+
+        def process_ie_result(self, result, download=True):
+            self.to_screen("[download] 100% of 1.00KiB")
+            path = self.params['outtmpl'].replace('%(title)s', result['title']).replace('%(ext)s', 'mp3')
+            with open(path, 'wb') as f:
+                f.write(b'audio')
+            for hook in self.params.get('post_hooks', []):
+                hook(path)
+            return dict(result, requested_downloads=[{'filepath': path}])
+
+    module = types.ModuleType('yt_dlp')
+    module.YoutubeDL = YoutubeDL
+    module.extractor = types.SimpleNamespace(gen_extractor_classes=lambda: [])
+    return module
+
+
+class HeadlessOutputTest(unittest.TestCase):
+    """stdout del modo sin interfaz solo contiene líneas JSON"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(YouTubeDownloader.set_console_output, True)
+
+        patches = [
+            mock.patch.dict(sys.modules, {'yt_dlp': _fake_yt_dlp()}),
+            mock.patch.object(downloader, '_extractor_classes', None),
+            mock.patch.object(metadata_cache, '_default_cache',
+                              MetadataCache(os.path.join(self.temp_dir.name, 'cache.db'))),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_every_stdout_line_is_json(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = cli.main(['https://example.com/video', '-o', self.temp_dir.name,
+                             '--no-archive', '-j', '1'])
+
+        self.assertEqual(code, 0)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines)
+        events = [json.loads(line) for line in lines]
+        self.assertEqual(events[-1]['event'], 'summary')
+        self.assertEqual(events[-1]['done'], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, 'Prueba.mp3')))
+
+
+if __name__ == '__main__':
+    unittest.main()
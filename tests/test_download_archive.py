@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del archivo de descargas
+"""
+
+import os
+import tempfile
+import unittest
+
+from utils.download_archive import DownloadArchive
+
+
+class DownloadArchiveTest(unittest.TestCase):
+    """Claves normalizadas, persistencia e intercambio con yt-dlp"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = temp_dir.name
+        self.archive = DownloadArchive(os.path.join(self.dir, 'archive.db'))
+
+    def test_keys_are_normalized(self):
+        self.assertTrue(self.archive.add('Youtube  abc'))
+        self.assertTrue(self.archive.contains('youtube abc'))
+        self.assertFalse(self.archive.add('YOUTUBE abc'))
+        self.assertFalse(self.archive.add('sin-id'))
+        self.assertFalse(self.archive.contains(None))
+        self.assertEqual(len(self.archive), 1)
+
+    def test_entries_persist(self):
+        self.archive.add_many(['youtube a', 'vimeo b'])
+        self.archive.remove('vimeo b')
+        reopened = DownloadArchive(os.path.join(self.dir, 'archive.db'))
+        self.assertTrue(reopened.contains('youtube a'))
+        self.assertFalse(reopened.contains('vimeo b'))
+
+    def test_import_and_export_yt_dlp_format(self):
+        source = os.path.join(self.dir, 'yt-dlp.txt')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write("youtube b\n\nYoutube a\nyoutube b\n")
+        self.assertEqual(self.archive.import_file(source), 2)
+
+        target = os.path.join(self.dir, 'export.txt')
+        self.assertEqual(self.archive.export_file(target), 2)
+        with open(target, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "youtube a\nyoutube b\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
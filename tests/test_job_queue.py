@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la cola de trabajos por etapas
+"""
+
+import threading
+import time
+import unittest
+
+from download.job_queue import DownloadJob, DownloadQueue, JobStage, JOB_DONE, JOB_FAILED
+from download.pipeline import PipelineReporter
+
+
+def make_job(url="https://example.com/video"):
+    return DownloadJob(url, "/tmp", is_audio=True)
+
+
+class DownloadQueueTest(unittest.TestCase):
+    """Etapas, contrapresión y parada de la cola"""
+
+    def test_jobs_move_through_stages(self):
+        visited = []
+
+        def first(job):
+            visited.append(('first', job.job_id))
+            return "second"
+
+        def second(job):
+            visited.append(('second', job.job_id))
+            return True, "ok"
+
+        download_queue = DownloadQueue(stages=[JobStage("first", first), JobStage("second", second)])
+        jobs = [download_queue.submit(make_job()) for _ in range(3)]
+        self.assertTrue(download_queue.wait(timeout=5))
+        download_queue.shutdown()
+
+        self.assertTrue(all(job.status == JOB_DONE for job in jobs))
+        self.assertEqual(len(visited), 6)
+
+    def test_unknown_stage_fails_the_job(self):
+        download_queue = DownloadQueue(stages=[JobStage("only", lambda job: "missing")])
+        job = download_queue.submit(make_job())
+        self.assertTrue(download_queue.wait(timeout=5))
+        download_queue.shutdown()
+        self.assertEqual(job.status, JOB_FAILED)
+
+    def test_shutdown_does_not_block_on_full_queue(self):
+        release = threading.Event()
+
+        def slow(job):
+            release.wait(5)
+            return True, "ok"
+
+        # La segunda etapa solo admite un trabajo en espera: la primera se queda bloqueada entregando
+        download_queue = DownloadQueue(stages=[
+            JobStage("first", lambda job: "second", workers=2),
+            JobStage("second", slow, workers=1, max_pending=1),
+        ])
+        for _ in range(6):
+            download_queue.submit(make_job())
+        time.sleep(0.3)
+
+        done = threading.Event()
+        threading.Thread(target=lambda: (download_queue.shutdown(), done.set()), daemon=True).start()
+        self.assertTrue(done.wait(2), "shutdown() se bloqueó con una cola llena")
+
+        release.set()
+        for stage in download_queue.stages:
+            for thread in stage.threads:
+                thread.join(5)
+                self.assertFalse(thread.is_alive())
+
+
+class PipelineReporterTest(unittest.TestCase):
+    """El reporter base no hace nada, pero sus hooks son válidos"""
+
+    def test_default_progress_hook_is_a_no_op(self):
+        hook = PipelineReporter().progress_hook(make_job())
+        hook.hook({'status': 'downloading', 'downloaded_bytes': 10, 'total_bytes': 100})
+        hook.hook({'status': 'finished'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la caché de metadatos
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.metadata_cache import MetadataCache
+
+
+def make_info(video_id, size=0):
+    return {
+        'extractor_key': 'Youtube',
+        'id': video_id,
+        'title': video_id,
+        'formats': [{'format_id': '0', 'url': 'https://example.com/' + 'x' * size}],
+    }
+
+
+class FakeClock:
+    """Reloj controlado para time.time()"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class MetadataCacheTest(unittest.TestCase):
+    """Claves, caducidad y expulsión LRU"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.db_file = os.path.join(temp_dir.name, 'cache.db')
+        self.clock = FakeClock()
+        patch = mock.patch('utils.metadata_cache.time.time', self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_make_key(self):
+        self.assertEqual(MetadataCache.make_key(make_info('abc')), 'youtube abc')
+        self.assertIsNone(MetadataCache.make_key({'id': 'abc'}))
+
+    def test_put_get_and_lookup_url(self):
+        cache = MetadataCache(self.db_file)
+        key = cache.put(make_info('abc'), 'https://youtu.be/abc')
+        self.assertEqual(key, 'youtube abc')
+        self.assertEqual(cache.lookup_url('https://youtu.be/abc'), key)
+        self.assertEqual(cache.get(key)['title'], 'abc')
+
+    def test_expired_entries_are_dropped(self):
+        cache = MetadataCache(self.db_file, ttl=60)
+        key = cache.put(make_info('abc'))
+        self.clock.now += 61
+        self.assertIsNone(cache.get(key))
+
+    def test_stripped_entries_require_formats_flag(self):
+        cache = MetadataCache(self.db_file)
+        key = cache.put(make_info('abc'))
+        self.assertTrue(cache.strip_formats(key))
+        self.assertIsNone(cache.get(key))
+        self.assertNotIn('formats', cache.get(key, require_formats=False))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = MetadataCache(self.db_file, max_bytes=10 ** 9)
+        keys = []
+        for video_id in ('a', 'b', 'c'):
+            self.clock.now += 1
+            keys.append(cache.put(make_info(video_id, 2000)))
+
+        # "a" se usa ahora: la menos usada pasa a ser "b"
+        self.clock.now += 1
+        self.assertIsNotNone(cache.get(keys[0]))
+
+        # Límite de tres entradas: la cuarta obliga a expulsar la menos usada ("b")
+        with cache._connect() as conn:
+            cache.max_bytes = conn.execute("SELECT SUM(size) FROM media").fetchone()[0]
+        self.clock.now += 1
+        new_key = cache.put(make_info('d', 2000))
+
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertIsNotNone(cache.get(new_key))
+
+if __name__ == '__main__':
+    unittest.main()
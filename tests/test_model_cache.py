@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la caché de modelos Whisper
+"""
+
+import sys
+import types
+import unittest
+from unittest import mock
+
+from download.model_cache import WhisperModelCache
+
+
+SIZES = {'tiny': 100, 'base': 200, 'small': 500}
+
+
+class FakeTensor:
+    """Tensor con el tamaño en bytes que se le indique"""
+
+    def __init__(self, size):
+        self.size = size
+
+    def numel(self):
+        return self.size
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    """Modelo con parámetros del tamaño de SIZES"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def parameters(self):
+        return [FakeTensor(SIZES[self.name])]
+
+    def buffers(self):
+        return []
+
+
+class WhisperModelCacheTest(unittest.TestCase):
+    """Carga única, presupuesto de memoria y descarga de modelos"""
+
+    def setUp(self):
+        self.loads = []
+        fake_whisper = types.ModuleType('whisper')
+
+        def load_model(name, device=None):
+            self.loads.append((name, device))
+            return FakeModel(name)
+
+        fake_whisper.load_model = load_model
+        patch = mock.patch.dict(sys.modules, {'whisper': fake_whisper})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def make_cache(self, ram_budget=1000):
+        # idle_timeout=0: sin hilo de descarga por inactividad
+        return WhisperModelCache(ram_budget=ram_budget, idle_timeout=0)
+
+    def test_model_loaded_once(self):
+        cache = self.make_cache()
+        with cache.lease('base', device='cpu') as first:
+            pass
+        with cache.lease('base', device='cpu') as second:
+            self.assertIs(first, second)
+        self.assertEqual(self.loads, [('base', 'cpu')])
+        self.assertEqual(cache.stats(), {'models': [('base', 'cpu')], 'bytes': 200})
+
+    def test_evicts_least_recently_used(self):
+        cache = self.make_cache(ram_budget=700)
+        with cache.lease('tiny', device='cpu'):
+            pass
+        with cache.lease('base', device='cpu'):
+            pass
+        with cache.lease('tiny', device='cpu'):
+            pass
+        # tiny se usó después que base: al pasarse del presupuesto solo sale base
+        with cache.lease('small', device='cpu'):
+            pass
+        self.assertEqual(cache.stats(), {'models': [('tiny', 'cpu'), ('small', 'cpu')], 'bytes': 600})
+
+    def test_leased_model_is_never_evicted(self):
+        cache = self.make_cache(ram_budget=300)
+        with cache.lease('base', device='cpu') as model:
+            with cache.lease('small', device='cpu'):
+                self.assertEqual(cache.stats()['bytes'], 700)
+            self.assertEqual(model.name, 'base')
+            self.assertIn(('base', 'cpu'), cache.stats()['models'])
+
+        # Sin préstamos, la siguiente carga vuelve a ajustar el presupuesto
+        with cache.lease('tiny', device='cpu'):
+            pass
+        self.assertEqual(cache.stats()['models'], [('tiny', 'cpu')])
+
+    def test_unload(self):
+        cache = self.make_cache()
+        with cache.lease('tiny', device='cpu'):
+            pass
+        with cache.lease('tiny', device='cuda'):
+            pass
+        with cache.lease('base', device='cpu'):
+            cache.unload('base')
+            self.assertIn(('base', 'cpu'), cache.stats()['models'])
+
+            cache.unload('tiny')
+            self.assertEqual(cache.stats()['models'], [('base', 'cpu')])
+
+        cache.unload()
+        self.assertEqual(cache.stats(), {'models': [], 'bytes': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las cachés del explorador SSH
+"""
+
+import unittest
+from unittest import mock
+
+from utils.remote_listing import RemoteListingCache, RemoteSearchCache
+
+
+SERVER = ('example.com', 22, 'user')
+OTHER_SERVER = ('example.org', 22, 'user')
+
+
+class RemoteListingCacheTest(unittest.TestCase):
+    """Listados por servidor y ruta con caducidad"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patch = mock.patch('utils.remote_listing.time.time', lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_server_key(self):
+        config = {'host': 'example.com', 'port': '22', 'username': 'user', 'password': 'x'}
+        self.assertEqual(RemoteListingCache.server_key(config), SERVER)
+
+    def test_entries_expire(self):
+        cache = RemoteListingCache(ttl=30)
+        cache.put(SERVER, '/srv', [{'name': 'a'}])
+        self.assertEqual(cache.get(SERVER, '/srv'), [{'name': 'a'}])
+        self.assertIsNone(cache.get(OTHER_SERVER, '/srv'))
+        self.now += 31
+        self.assertIsNone(cache.get(SERVER, '/srv'))
+
+    def test_invalidate(self):
+        cache = RemoteListingCache()
+        cache.put(SERVER, '/srv', [])
+        cache.put(SERVER, '/home', [])
+        cache.put(OTHER_SERVER, '/srv', [])
+
+        cache.invalidate(SERVER, '/srv')
+        self.assertIsNone(cache.get(SERVER, '/srv'))
+        self.assertEqual(cache.get(SERVER, '/home'), [])
+
+        cache.invalidate(SERVER)
+        self.assertIsNone(cache.get(SERVER, '/home'))
+        self.assertEqual(cache.get(OTHER_SERVER, '/srv'), [])
+
+
+class RemoteSearchCacheTest(unittest.TestCase):
+    """Resultados de búsqueda y refinamiento en local"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patch = mock.patch('utils.remote_listing.time.time', lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.cache = RemoteSearchCache(ttl=60)
+        self.results = ['/srv/Series/Serie A.mp4', '/srv/Series/Seriales.mkv', '/srv/Cine/Peli.mp4']
+        self.cache.put(SERVER, '/srv', 'Seri', self.results)
+
+    def test_exact_match_ignores_case(self):
+        self.assertEqual(self.cache.get(SERVER, '/srv', 'SERI'), self.results)
+
+    def test_empty_result_is_cached(self):
+        self.cache.put(SERVER, '/srv', 'nada', [])
+        self.assertEqual(self.cache.get(SERVER, '/srv', 'nada'), [])
+
+    def test_narrower_search_filters_locally(self):
+        self.assertEqual(self.cache.get(SERVER, '/srv', 'serie a'), ['/srv/Series/Serie A.mp4'])
+        self.assertEqual(self.cache.get(SERVER, '/srv', 'serial'), ['/srv/Series/Seriales.mkv'])
+
+    def test_misses(self):
+        # Más amplia, otra carpeta u otro servidor: hay que ir al servidor
+        self.assertIsNone(self.cache.get(SERVER, '/srv', 'ser'))
+        self.assertIsNone(self.cache.get(SERVER, '/home', 'seri'))
+        self.assertIsNone(self.cache.get(OTHER_SERVER, '/srv', 'seri'))
+
+    def test_results_expire(self):
+        self.now += 61
+        self.assertIsNone(self.cache.get(SERVER, '/srv', 'seri'))
+        self.assertIsNone(self.cache.get(SERVER, '/srv', 'serie'))
+
+    def test_invalidate_server(self):
+        self.cache.put(OTHER_SERVER, '/srv', 'seri', [])
+        self.cache.invalidate(SERVER)
+        self.assertIsNone(self.cache.get(SERVER, '/srv', 'seri'))
+        self.assertEqual(self.cache.get(OTHER_SERVER, '/srv', 'seri'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice de carpetas remotas
+"""
+
+import os
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+try:
+    from utils.remote_manifest import RemoteManifest
+except ImportError as e:  # paramiko no instalado
+    raise unittest.SkipTest(str(e))
+
+from download.downloader import YouTubeDownloader
+
+
+class LocalSFTP:
+    """SFTP sobre una carpeta local (solo lo que usa RemoteManifest)"""
+
+    def listdir_attr(self, path):
+        entries = []
+        for name in os.listdir(path):
+            st = os.stat(os.path.join(path, name))
+            entries.append(types.SimpleNamespace(
+                filename=name, st_size=st.st_size, st_mtime=st.st_mtime, st_mode=st.st_mode
+            ))
+        return entries
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def open(self, path, mode='r'):
+        return open(path, mode if 'b' in mode else mode + 'b')
+
+    def remove(self, path):
+        os.remove(path)
+
+
+class LocalClient:
+    """SSHClient sobre una carpeta local"""
+
+    def __init__(self):
+        self.sftp = LocalSFTP()
+
+    def rename(self, source, target):
+        os.replace(source, target)
+
+    def remote_sha256(self, path):
+        return None
+
+
+class RemoteManifestTest(unittest.TestCase):
+    """find_media solo reconoce la misma variante del medio"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.folder = os.path.join(temp_dir.name, 'remote')
+        os.mkdir(self.folder)
+        self.client = LocalClient()
+        self.manifest = RemoteManifest(self.folder, Path(temp_dir.name) / 'cache.json')
+
+    def upload(self, name, variant):
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100)
+        self.manifest.record(self.client, path, 'youtube abc', 'f' * 64, variant)
+        return path
+
+    def test_same_variant_is_found(self):
+        audio = YouTubeDownloader.get_output_variant(True)
+        path = self.upload('Prueba.mp3', audio)
+        self.assertEqual(self.manifest.find_media(self.client, 'youtube abc', audio), path)
+
+    def test_other_kind_is_not_found(self):
+        self.upload('Prueba.mp4', YouTubeDownloader.get_output_variant(False, '1080p'))
+        audio = YouTubeDownloader.get_output_variant(True)
+        self.assertIsNone(self.manifest.find_media(self.client, 'youtube abc', audio))
+
+    def test_other_quality_is_not_found(self):
+        self.upload('Prueba.mp4', YouTubeDownloader.get_output_variant(False, '360p'))
+        video = YouTubeDownloader.get_output_variant(False, '1080p')
+        self.assertIsNone(self.manifest.find_media(self.client, 'youtube abc', video))
+
+    def test_entry_without_variant_is_not_found(self):
+        self.upload('Prueba.mp3', None)
+        audio = YouTubeDownloader.get_output_variant(True)
+        self.assertIsNone(self.manifest.find_media(self.client, 'youtube abc', audio))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las utilidades de subida SFTP
+"""
+
+import hashlib
+import os
+import tempfile
+import unittest
+
+try:
+    from utils.sftp_transfer import BlockHasher, file_sha256, split_ranges
+except ImportError as e:  # paramiko no instalado
+    raise unittest.SkipTest(str(e))
+
+
+class SplitRangesTest(unittest.TestCase):
+    """División de un archivo en rangos para la subida segmentada"""
+
+    def assertCovers(self, ranges, total):
+        offset = 0
+        for start, length in ranges:
+            self.assertEqual(start, offset)
+            self.assertGreater(length, 0)
+            offset += length
+        self.assertEqual(offset, total)
+
+    def test_even_split(self):
+        self.assertEqual(split_ranges(100, 4), [(0, 25), (25, 25), (50, 25), (75, 25)])
+
+    def test_remainder_goes_to_first_ranges(self):
+        ranges = split_ranges(10, 3)
+        self.assertEqual([length for _, length in ranges], [4, 3, 3])
+        self.assertCovers(ranges, 10)
+
+    def test_boundaries_are_aligned(self):
+        ranges = split_ranges(10 * 1024 + 5, 3, align=1024)
+        self.assertCovers(ranges, 10 * 1024 + 5)
+        for start, _ in ranges:
+            self.assertEqual(start % 1024, 0)
+
+    def test_never_more_ranges_than_units(self):
+        self.assertEqual(split_ranges(3, 8), [(0, 1), (1, 1), (2, 1)])
+        self.assertEqual(split_ranges(1000, 4, align=4096), [(0, 1000)])
+
+    def test_empty_file(self):
+        self.assertEqual(split_ranges(0, 4), [])
+
+
+class BlockHasherTest(unittest.TestCase):
+    """SHA-256 por bloques y del archivo completo durante la subida"""
+
+    def setUp(self):
+        self.data = os.urandom(10 * 1000 + 123)
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as f:
+            f.write(self.data)
+        self.addCleanup(os.remove, self.path)
+
+    def feed(self, hasher, offset, length, packet=700):
+        for position in range(offset, offset + length, packet):
+            end = min(offset + length, position + packet)
+            hasher.update(position, self.data[position:end])
+
+    def expected_blocks(self, block_size):
+        return [hashlib.sha256(self.data[i:i + block_size]).hexdigest()
+                for i in range(0, len(self.data), block_size)]
+
+    def test_in_order_upload(self):
+        hasher = BlockHasher(len(self.data), block_size=1000)
+        self.feed(hasher, 0, len(self.data))
+        self.assertEqual(hasher.count, 11)
+        self.assertEqual(hasher.file_digest(), hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(hasher.block_digests(self.path), self.expected_blocks(1000))
+
+    def test_out_of_order_ranges(self):
+        hasher = BlockHasher(len(self.data), block_size=1000)
+        for offset, length in reversed(split_ranges(len(self.data), 3, align=1000)):
+            self.feed(hasher, offset, length)
+        self.assertIsNone(hasher.file_digest())
+        self.assertEqual(hasher.block_digests(self.path), self.expected_blocks(1000))
+
+    def test_resumed_upload_reads_missing_blocks_from_disk(self):
+        hasher = BlockHasher(len(self.data), block_size=1000)
+        self.feed(hasher, 2500, len(self.data) - 2500)
+        self.assertIsNone(hasher.file_digest())
+        self.assertEqual(hasher.block_digests(self.path), self.expected_blocks(1000))
+
+    def test_file_sha256_range(self):
+        self.assertEqual(file_sha256(self.path), hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(file_sha256(self.path, 100, 50, block_size=16),
+                         hashlib.sha256(self.data[100:150]).hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la transcripción desde subtítulos
+"""
+
+import json
+import unittest
+
+from download.subtitles import SubtitleTranscriber
+
+
+VTT = """WEBVTT
+Kind: captions
+Language: es
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+hola<00:00:01.000><c> mundo</c>
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+hola mundo
+qué tal &amp; bien
+"""
+
+SRT = """1
+00:00:01,500 --> 00:00:03,000
+Primera línea
+
+2
+01:00:00,000 --> 01:00:02,250
+<i>Segunda</i>
+línea
+"""
+
+
+class ParseCuesTest(unittest.TestCase):
+    """Formatos vtt y srt"""
+
+    def test_vtt_drops_rolling_lines_and_markup(self):
+        self.assertEqual(SubtitleTranscriber.parse(VTT, 'vtt', automatic=True), [
+            (0.0, 2.0, 'hola mundo'),
+            (2.01, 4.0, 'qué tal & bien'),
+        ])
+
+    def test_manual_keeps_repeated_lines(self):
+        data = ("1\n00:00:01,000 --> 00:00:02,000\n¿Vienes?\n\n"
+                "2\n00:00:02,000 --> 00:00:03,000\nNo.\n\n"
+                "3\n00:00:03,000 --> 00:00:04,000\nNo.\n")
+        self.assertEqual(SubtitleTranscriber.parse(data, 'srt'), [
+            (1.0, 2.0, '¿Vienes?'),
+            (2.0, 3.0, 'No.'),
+            (3.0, 4.0, 'No.'),
+        ])
+        self.assertEqual(SubtitleTranscriber.parse(VTT, 'vtt')[1], (2.01, 4.0, 'hola mundo qué tal & bien'))
+
+    def test_srt_times_with_comma(self):
+        self.assertEqual(SubtitleTranscriber.parse(SRT, 'srt'), [
+            (1.5, 3.0, 'Primera línea'),
+            (3600.0, 3602.25, 'Segunda línea'),
+        ])
+
+    def test_invalid_and_empty_cues_are_skipped(self):
+        data = "00:00:xx --> 00:00:01.000\nroto\n\n00:00:01.000 --> 00:00:02.000\n\n"
+        self.assertEqual(SubtitleTranscriber.parse(data, 'vtt'), [])
+
+
+class ParseJson3Test(unittest.TestCase):
+    """Formato json3 de YouTube"""
+
+    def test_events(self):
+        data = json.dumps({'events': [
+            {'tStartMs': 0, 'dDurationMs': 4000, 'segs': [{'utf8': 'uno'}, {'utf8': ' dos'}]},
+            {'tStartMs': 2000, 'dDurationMs': 500, 'segs': [{'utf8': '\n'}]},
+            {'tStartMs': 2500, 'dDurationMs': 1000, 'segs': [{'utf8': 'tres'}]},
+            {'tStartMs': 3000},
+        ]})
+        # El primero se corta donde empieza el siguiente evento, aunque este no tenga texto
+        self.assertEqual(SubtitleTranscriber.parse(data, 'json3'), [
+            (0.0, 2.0, 'uno dos'),
+            (2.5, 3.5, 'tres'),
+        ])
+
+
+class FindTrackTest(unittest.TestCase):
+    """Elección de la pista de subtítulos"""
+
+    def test_prefers_manual_subtitles(self):
+        manual = {'ext': 'vtt', 'url': 'https://example.com/manual.vtt'}
+        info = {
+            'subtitles': {'es-ES': [manual]},
+            'automatic_captions': {'es': [{'ext': 'json3', 'url': 'https://example.com/auto'}]},
+        }
+        self.assertEqual(SubtitleTranscriber.find_track(info, 'es'), (manual, False))
+
+    def test_preferred_format(self):
+        json3 = {'ext': 'json3', 'url': 'https://example.com/a.json3'}
+        info = {'subtitles': {'es': [{'ext': 'srv1', 'url': 'x'}, {'ext': 'vtt', 'url': 'y'}, json3]}}
+        self.assertEqual(SubtitleTranscriber.find_track(info, 'es'), (json3, False))
+
+    def test_automatic_original_language_only(self):
+        original = {'ext': 'vtt', 'url': 'https://example.com/orig.vtt'}
+        info = {'automatic_captions': {
+            'es': [{'ext': 'vtt', 'url': 'https://example.com/auto.vtt?tlang=es'}],
+            'es-orig': [original],
+        }}
+        self.assertEqual(SubtitleTranscriber.find_track(info, 'es'), (original, True))
+        self.assertIsNone(SubtitleTranscriber.find_track(info, 'es', allow_automatic=False))
+
+    def test_rejects_automatic_translations(self):
+        translated = {'automatic_captions': {
+            'es': [{'ext': 'vtt', 'url': 'https://example.com/auto.vtt?tlang=es'}],
+        }}
+        self.assertIsNone(SubtitleTranscriber.find_track(translated, 'es'))
+
+        other_language = {
+            'language': 'en',
+            'automatic_captions': {'es': [{'ext': 'vtt', 'url': 'https://example.com/auto.vtt'}]},
+        }
+        self.assertIsNone(SubtitleTranscriber.find_track(other_language, 'es'))
+        self.assertIsNone(SubtitleTranscriber.find_track({}, 'es'))
+
+
+if __name__ == '__main__':
+    unittest.main()
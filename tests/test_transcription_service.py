@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del servicio de transcripción en procesos aparte
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+from concurrent.futures import Future
+
+from download.transcription_service import TranscriptionService
+
+
+class ShutdownTest(unittest.TestCase):
+    """Cierre del pool sin esperar a las transcripciones pendientes"""
+
+    def test_shutdown_without_wait_terminates_workers(self):
+        service = TranscriptionService(workers=1)
+        results = [Future(), Future()]
+        for result in results:
+            # Trabajos largos: uno en curso y otro en cola
+            service._dispatch(result, time.sleep, (30,), 0)
+        processes = list(service._executor._processes.values())
+
+        started = time.monotonic()
+        service.shutdown(wait=False)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertFalse(any(process.is_alive() for process in processes))
+
+        for result in results:
+            success, message, text = result.result(timeout=10)
+            self.assertFalse(success)
+            self.assertIsNone(text)
+
+    def test_requests_after_shutdown_fail(self):
+        service = TranscriptionService(workers=1)
+        service.shutdown(wait=False)
+        success, message, _ = service.submit("no_existe.mp3").result(timeout=10)
+        self.assertFalse(success)
+        self.assertIsNone(service._executor)
+
+
+# Proceso principal con main.py como __main__ (sin ejecutar main()) que
+# arranca un proceso spawn y devuelve los módulos que este tiene cargados
+SPAWN_CHECK = """
+import json, multiprocessing, sys
+from concurrent.futures import ProcessPoolExecutor
+sys.modules['__main__'].__file__ = sys.argv[1]
+expression = "[m for m in __import__('sys').modules if m.split('.')[0] in ('__mp_main__', 'PySide6', 'ui')]"
+with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+    print(json.dumps(executor.submit(eval, expression).result()))
+"""
+
+
+class SpawnMainTest(unittest.TestCase):
+    """Los procesos de transcripción no cargan Qt ni la interfaz"""
+
+    def test_worker_does_not_import_qt(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run(
+            [sys.executable, '-c', SPAWN_CHECK, os.path.join(root, 'main.py')],
+            cwd=root, capture_output=True, text=True, timeout=120
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(json.loads(completed.stdout), ['__mp_main__'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,17 +5,16 @@ Ventana principal de la aplicación
 """
 
 import sys
-import os
-import tempfile
+import threading
+import time
 from pathlib import Path
-from threading import Thread
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QProgressBar, QComboBox,
     QFileDialog, QMessageBox, QTextEdit, QGroupBox, QRadioButton,
     QTabWidget, QFormLayout, QCheckBox, QDialog, QScrollArea
 )
-from PySide6.QtCore import Qt, QObject, Signal
+from PySide6.QtCore import Qt, QObject, Signal, QEvent, QTimer
 from PySide6.QtGui import QFont, QIcon
 
 from config import (
@@ -23,14 +22,15 @@ from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_X, WINDOW_Y,
     SUPPORTED_PLATFORMS, MATRIX_COLORS
 )
-from download.progress_hook import DownloadProgressHook
+from download.progress import ProgressHook
 from download.downloader import YouTubeDownloader
-from download.transcriber import AudioTranscriber
+from download.job_queue import DownloadJob, DownloadQueue, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from download.pipeline import JobProcessor, PipelineReporter, STAGE_DOWNLOAD, STAGE_LABELS
+from download.transcription_service import get_transcription_service
 from utils.validators import InputValidator
-from utils.ssh_client import SSHClient
 from utils.config_manager import SSHConfigManager
 from utils.app_settings import AppSettings
-from ui.ssh_browser import SSHBrowserDialog
+from utils.download_archive import get_download_archive
 
 
 class DownloadSignals(QObject):
@@ -38,7 +38,55 @@ class DownloadSignals(QObject):
     message = Signal(str, str)  # mensaje, tipo
     progress_update = Signal(int, str)  # porcentaje, mensaje
     show_dialog = Signal(str, str, str)  # título, mensaje, tipo (info/error/warning)
-    download_finished = Signal(bool, str, str)  # éxito, mensaje, título
+    queue_changed = Signal()  # algún trabajo de la cola cambió de estado
+
+
+class FirstPaintWatcher(QObject):
+    """Llama a un callback (una sola vez) después del primer pintado de un widget"""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Dejar que termine el pintado antes de seguir
+            QTimer.singleShot(0, self.callback)
+        return False
+
+
+class WindowReporter(PipelineReporter):
+    """
+    Envía el avance de los trabajos a la ventana mediante señales
+
+    Se llama desde los hilos de las etapas: no crea objetos Qt, solo emite
+    señales de DownloadSignals (que vive en el hilo de la interfaz).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._hooks = {}
+        self._lock = threading.Lock()
+
+    def message(self, text, message_type="info"):
+        self.window.download_signals.message.emit(text, message_type)
+
+    def progress(self, job, percent, text):
+        self.window.download_signals.progress_update.emit(percent, text)
+
+    def progress_hook(self, job):
+        with self._lock:
+            if job.job_id not in self._hooks:
+                self._hooks[job.job_id] = ProgressHook(self.window.download_signals.progress_update.emit)
+            return self._hooks[job.job_id]
+
+    def discard_hooks(self, job_ids):
+        """Olvida los hooks de trabajos terminados"""
+        with self._lock:
+            for job_id in job_ids:
+                self._hooks.pop(job_id, None)
 
 
 class YouTubeDownloaderApp(QMainWindow):
@@ -46,20 +94,48 @@ class YouTubeDownloaderApp(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.download_thread = None
-        self.progress_hook = None
+        # Tiempos de arranque (time.perf_counter) para scripts/benchmark_startup.py
+        self.startup_times = {'init': time.perf_counter()}
+        # Trabajos del lote en curso; make_job los añade desde los hilos de expansión
+        self.batch_job_ids = []
+        self.batch_lock = threading.Lock()
         self.ssh_client = None
         self.config_manager = SSHConfigManager()
         self.app_settings = AppSettings()
+        self.download_archive = get_download_archive()
         self.download_signals = DownloadSignals()
         self.download_signals.message.connect(self.add_message)
         self.download_signals.progress_update.connect(self.update_progress)
         self.download_signals.show_dialog.connect(self.show_dialog_safe)
-        self.download_signals.download_finished.connect(self.on_download_finished)
+        self.download_signals.queue_changed.connect(self.on_queue_changed)
+        self.reporter = WindowReporter(self)
+        self.job_processor = JobProcessor(
+            self.reporter,
+            archive=self.download_archive,
+            stage_limits={STAGE_DOWNLOAD: {
+                'workers': self.app_settings.get_max_concurrent_downloads(),
+                'max_pending': 0
+            }}
+        )
+        self.download_queue = DownloadQueue(
+            stages=self.job_processor.build_stages(),
+            on_change=lambda job: self.download_signals.queue_changed.emit()
+        )
         self.init_ui()
+        self.startup_times['ui_built'] = time.perf_counter()
+        # Lo que no hace falta para mostrar la ventana se hace tras el primer pintado
+        self.first_paint_watcher = FirstPaintWatcher(self.title_label, self.finish_startup)
+        # Por si la ventana arranca minimizada y no se pinta
+        QTimer.singleShot(2000, self.finish_startup)
+    
+    def finish_startup(self):
+        """Completa la interfaz después del primer pintado (estilos y pestaña SSH)"""
+        if 'ready' in self.startup_times:
+            return
+        self.startup_times['first_paint'] = time.perf_counter()
         self.apply_styles()
-        self.load_saved_ssh_configs()
-        self.initialize_default_ssh_config()
+        self.build_ssh_tab()
+        self.startup_times['ready'] = time.perf_counter()
     
     def show_dialog_safe(self, title, message, dialog_type):
         """Muestra un diálogo de forma segura desde cualquier hilo"""
@@ -70,15 +146,55 @@ class YouTubeDownloaderApp(QMainWindow):
         elif dialog_type == "warning":
             QMessageBox.warning(self, title, message)
     
-    def on_download_finished(self, success, message, title):
-        """Maneja la finalización de la descarga"""
-        self.download_button.setEnabled(True)
-        self.status_label.setText(">> SISTEMA LISTO")
+    def closeEvent(self, event):
+        """Al cerrar la ventana termina los procesos de transcripción pendientes"""
+        # No son daemon: si siguieran vivos el proceso no terminaría hasta acabar la cola
+        get_transcription_service().shutdown(wait=False)
+        super().closeEvent(event)
+    
+    def on_queue_changed(self):
+        """Actualiza el estado de la cola y avisa cuando termina el lote"""
+        counts = self.download_queue.counts()
+        expanding = self.download_queue.expanding
+        active = counts[JOB_QUEUED] + counts[JOB_RUNNING] + expanding
+        
+        if active:
+            stages = self.download_queue.stage_counts()
+            status = (
+                f">> DESCARGANDO... [en cola: {counts[JOB_QUEUED]} | "
+                + " | ".join(f"{STAGE_LABELS.get(name, name)}: {n}" for name, n in stages.items())
+                + f" | ok: {counts[JOB_DONE]} | fallidos: {counts[JOB_FAILED]}]"
+            )
+            if expanding:
+                status += " [expandiendo listas...]"
+            self.status_label.setText(status)
+            return
         
-        if success:
-            self.download_signals.show_dialog.emit("Éxito", message, "info")
-        else:
-            self.download_signals.show_dialog.emit("Error", message, "error")
+        with self.batch_lock:
+            batch_ids = list(self.batch_job_ids)
+            self.batch_job_ids.clear()
+        if not batch_ids:
+            return
+        
+        self.status_label.setText(">> SISTEMA LISTO")
+        self.reporter.discard_hooks(batch_ids)
+        jobs = [self.download_queue.get_job(job_id) for job_id in batch_ids]
+        jobs = [job for job in jobs if job]
+        
+        if len(jobs) == 1:
+            job = jobs[0]
+            if job.status == JOB_DONE:
+                self.download_signals.show_dialog.emit("Éxito", job.message, "info")
+            else:
+                self.download_signals.show_dialog.emit("Error", job.message, "error")
+        elif jobs:
+            failed = [job for job in jobs if job.status == JOB_FAILED]
+            summary = f"Trabajos completados: {len(jobs) - len(failed)} de {len(jobs)}"
+            if failed:
+                summary += "\n\nFallidos:\n" + "\n".join(f"- {job.url}" for job in failed)
+                self.download_signals.show_dialog.emit("Cola terminada con errores", summary, "warning")
+            else:
+                self.download_signals.show_dialog.emit("Éxito", summary, "info")
     
     def apply_styles(self):
         """Aplica estilos Matrix en modo oscuro a la aplicación"""
@@ -340,6 +456,7 @@ class YouTubeDownloaderApp(QMainWindow):
         
         # Título mejorado estilo Matrix
         title = QLabel(">> " + APP_NAME + " <<")
+        self.title_label = title
         title_font = QFont("Consolas", 24)
         title_font.setBold(True)
         title.setFont(title_font)
@@ -379,7 +496,7 @@ class YouTubeDownloaderApp(QMainWindow):
         url_label = QLabel("URL:")
         url_label.setMinimumWidth(90)
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("Pega aquí la URL del contenido...")
+        self.url_input.setPlaceholderText("Pega aquí la URL del contenido (varias separadas por espacios)...")
         self.url_input.textChanged.connect(self.on_url_changed)
         url_layout.addWidget(url_label)
         url_layout.addWidget(self.url_input, 1)
@@ -437,9 +554,36 @@ class YouTubeDownloaderApp(QMainWindow):
         self.transcription_checkbox.setEnabled(self.format_audio.isChecked())
         transcription_layout.addWidget(transcription_label)
         transcription_layout.addWidget(self.transcription_checkbox)
+        self.force_whisper_checkbox = QCheckBox("Forzar Whisper")
+        self.force_whisper_checkbox.setToolTip(
+            "Transcribe siempre con Whisper aunque la plataforma ofrezca subtítulos en el idioma del audio"
+        )
+        self.force_whisper_checkbox.setEnabled(False)
+        self.transcription_checkbox.toggled.connect(self.force_whisper_checkbox.setEnabled)
+        transcription_layout.addWidget(self.force_whisper_checkbox)
+        self.transcript_only_checkbox = QCheckBox("Solo transcripción")
+        self.transcript_only_checkbox.setToolTip(
+            "No guarda el audio: decodifica el audio más ligero directamente para Whisper (solo destino local)"
+        )
+        self.transcript_only_checkbox.setEnabled(False)
+        self.transcription_checkbox.toggled.connect(self.transcript_only_checkbox.setEnabled)
+        transcription_layout.addWidget(self.transcript_only_checkbox)
         transcription_layout.addStretch()
         options_layout.addLayout(transcription_layout)
 
+        # Archivo de descargas: omitir lo ya descargado
+        archive_layout = QHBoxLayout()
+        archive_label = QLabel("")
+        archive_label.setMinimumWidth(90)
+        self.archive_checkbox = QCheckBox("Omitir contenido ya descargado")
+        self.archive_checkbox.setToolTip("Consulta el archivo de descargas antes de extraer y descargar cada elemento")
+        self.archive_checkbox.setChecked(self.app_settings.get_use_download_archive())
+        self.archive_checkbox.toggled.connect(self.app_settings.set_use_download_archive)
+        archive_layout.addWidget(archive_label)
+        archive_layout.addWidget(self.archive_checkbox)
+        archive_layout.addStretch()
+        options_layout.addLayout(archive_layout)
+
         # Mensaje de capacidades de plataforma
         self.platform_capabilities_label = QLabel("")
         self.platform_capabilities_label.setStyleSheet(f"color: {MATRIX_COLORS['warning']}; font-size: 9pt; padding-left: 95px;")
@@ -485,8 +629,109 @@ class YouTubeDownloaderApp(QMainWindow):
         local_layout.addStretch()
         local_tab.setLayout(local_layout)
         
-        # Pestaña: Destino SSH
+        # Pestaña: Destino SSH (el contenido se construye tras el primer pintado)
         ssh_tab = QWidget()
+        self.ssh_tab_built = False
+        
+        # Añadir pestañas
+        destination_tabs.addTab(local_tab, "LOCAL")
+        destination_tabs.addTab(ssh_tab, "SSH")
+
+        # Conectar cambio de pestaña
+        destination_tabs.currentChanged.connect(self.on_tab_changed)
+
+        self.destination_tabs = destination_tabs
+        self.local_tab = local_tab
+        self.ssh_tab = ssh_tab
+
+        main_layout.addWidget(destination_tabs)
+        
+        # Barra de progreso
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMinimum(0)
+        self.progress_bar.setMaximum(100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("%p% - %v")
+        main_layout.addWidget(self.progress_bar)
+        
+        # Mensaje de estado
+        self.status_label = QLabel(">> SISTEMA LISTO")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet(f"font-size: 12pt; font-weight: bold; color: {MATRIX_COLORS['accent']}; padding: 8px; font-family: 'Consolas', monospace;")
+        main_layout.addWidget(self.status_label)
+        
+        # Área de mensajes
+        messages_group = QGroupBox(">> LOG")
+        messages_layout = QVBoxLayout()
+        
+        self.messages_text = QTextEdit()
+        self.messages_text.setReadOnly(True)
+        self.messages_text.setMaximumHeight(120)
+        messages_layout.addWidget(self.messages_text)
+        
+        messages_group.setLayout(messages_layout)
+        main_layout.addWidget(messages_group)
+        
+        # Botones de acción
+        buttons_layout = QHBoxLayout()
+        
+        self.download_button = QPushButton(">> DESCARGAR")
+        self.download_button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {MATRIX_COLORS['accent_dark']};
+                color: {MATRIX_COLORS['text_bright']};
+                font-weight: bold;
+                padding: 14px 40px;
+                font-size: 13pt;
+                border: 2px solid {MATRIX_COLORS['accent']};
+                font-family: 'Consolas', monospace;
+            }}
+            QPushButton:hover {{
+                background-color: {MATRIX_COLORS['accent']};
+                color: {MATRIX_COLORS['background']};
+            }}
+            QPushButton:disabled {{
+                background-color: {MATRIX_COLORS['background_tertiary']};
+                color: {MATRIX_COLORS['border_dim']};
+                border: 2px solid {MATRIX_COLORS['border_dim']};
+            }}
+        """)
+        self.download_button.clicked.connect(self.start_download)
+        
+        self.clear_button = QPushButton("LIMPIAR LOG")
+        self.clear_button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {MATRIX_COLORS['background_tertiary']};
+                color: {MATRIX_COLORS['error']};
+                border: 1px solid {MATRIX_COLORS['error']};
+            }}
+            QPushButton:hover {{
+                background-color: #330011;
+                color: #FF3366;
+            }}
+        """)
+        self.clear_button.clicked.connect(self.clear_messages)
+        
+        buttons_layout.addWidget(self.download_button)
+        buttons_layout.addWidget(self.clear_button)
+        buttons_layout.addStretch()
+        
+        main_layout.addLayout(buttons_layout)
+        
+        # Asegurar que el texto del botón sea correcto según la pestaña inicial
+        self.on_tab_changed(0)  # Inicializar con pestaña Local
+        
+        # Conectar cambio de formato para habilitar/deshabilitar calidad
+        self.format_video.toggled.connect(self.on_format_changed)
+        self.format_audio.toggled.connect(self.on_format_changed)
+    
+    def build_ssh_tab(self):
+        """Construye el contenido de la pestaña SSH (solo la primera vez)"""
+        if self.ssh_tab_built:
+            return
+        self.ssh_tab_built = True
+        ssh_tab = self.ssh_tab
+        
         ssh_layout = QVBoxLayout()
         ssh_layout.setContentsMargins(10, 10, 10, 10)
         ssh_layout.setSpacing(10)
@@ -634,97 +879,8 @@ class YouTubeDownloaderApp(QMainWindow):
         ssh_layout.addStretch()  # Añadir stretch para que no ocupe más espacio del necesario
         ssh_tab.setLayout(ssh_layout)
         
-        # Añadir pestañas
-        destination_tabs.addTab(local_tab, "LOCAL")
-        destination_tabs.addTab(ssh_tab, "SSH")
-
-        # Conectar cambio de pestaña
-        destination_tabs.currentChanged.connect(self.on_tab_changed)
-
-        self.destination_tabs = destination_tabs
-        self.local_tab = local_tab
-        self.ssh_tab = ssh_tab
-
-        main_layout.addWidget(destination_tabs)
-        
-        # Barra de progreso
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setMinimum(0)
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setFormat("%p% - %v")
-        main_layout.addWidget(self.progress_bar)
-        
-        # Mensaje de estado
-        self.status_label = QLabel(">> SISTEMA LISTO")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet(f"font-size: 12pt; font-weight: bold; color: {MATRIX_COLORS['accent']}; padding: 8px; font-family: 'Consolas', monospace;")
-        main_layout.addWidget(self.status_label)
-        
-        # Área de mensajes
-        messages_group = QGroupBox(">> LOG")
-        messages_layout = QVBoxLayout()
-        
-        self.messages_text = QTextEdit()
-        self.messages_text.setReadOnly(True)
-        self.messages_text.setMaximumHeight(120)
-        messages_layout.addWidget(self.messages_text)
-        
-        messages_group.setLayout(messages_layout)
-        main_layout.addWidget(messages_group)
-        
-        # Botones de acción
-        buttons_layout = QHBoxLayout()
-        
-        self.download_button = QPushButton(">> DESCARGAR")
-        self.download_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {MATRIX_COLORS['accent_dark']};
-                color: {MATRIX_COLORS['text_bright']};
-                font-weight: bold;
-                padding: 14px 40px;
-                font-size: 13pt;
-                border: 2px solid {MATRIX_COLORS['accent']};
-                font-family: 'Consolas', monospace;
-            }}
-            QPushButton:hover {{
-                background-color: {MATRIX_COLORS['accent']};
-                color: {MATRIX_COLORS['background']};
-            }}
-            QPushButton:disabled {{
-                background-color: {MATRIX_COLORS['background_tertiary']};
-                color: {MATRIX_COLORS['border_dim']};
-                border: 2px solid {MATRIX_COLORS['border_dim']};
-            }}
-        """)
-        self.download_button.clicked.connect(self.start_download)
-        
-        self.clear_button = QPushButton("LIMPIAR LOG")
-        self.clear_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {MATRIX_COLORS['background_tertiary']};
-                color: {MATRIX_COLORS['error']};
-                border: 1px solid {MATRIX_COLORS['error']};
-            }}
-            QPushButton:hover {{
-                background-color: #330011;
-                color: #FF3366;
-            }}
-        """)
-        self.clear_button.clicked.connect(self.clear_messages)
-        
-        buttons_layout.addWidget(self.download_button)
-        buttons_layout.addWidget(self.clear_button)
-        buttons_layout.addStretch()
-        
-        main_layout.addLayout(buttons_layout)
-        
-        # Asegurar que el texto del botón sea correcto según la pestaña inicial
-        self.on_tab_changed(0)  # Inicializar con pestaña Local
-        
-        # Conectar cambio de formato para habilitar/deshabilitar calidad
-        self.format_video.toggled.connect(self.on_format_changed)
-        self.format_audio.toggled.connect(self.on_format_changed)
+        self.load_saved_ssh_configs()
+        self.initialize_default_ssh_config()
     
     def on_format_changed(self):
         """Habilita o deshabilita el selector de calidad y transcripción según el formato"""
@@ -738,12 +894,15 @@ class YouTubeDownloaderApp(QMainWindow):
             self.transcription_checkbox.setChecked(False)
             self.transcription_info_label.setText("")
         else:
-            self.transcription_info_label.setText("La transcripción usa Whisper AI (puede tardar)")
+            self.transcription_info_label.setText(
+                "La transcripción usa los subtítulos de la plataforma si los hay; si no, Whisper AI (puede tardar)"
+            )
     
     def on_tab_changed(self, index):
         """Se ejecuta cuando se cambia de pestaña"""
         # Actualizar texto del botón de descargar según la pestaña activa
         if index == 1:  # Pestaña SSH
+            self.build_ssh_tab()
             self.download_button.setText(">> DESCARGAR + SSH")
         else:  # Pestaña Local (índice 0)
             self.download_button.setText(">> DESCARGAR")
@@ -947,6 +1106,7 @@ class YouTubeDownloaderApp(QMainWindow):
             return
         
         # Abrir diálogo de explorador
+        from ui.ssh_browser import SSHBrowserDialog
         browser = SSHBrowserDialog(self, ssh_config)
         
         if browser.exec() == QDialog.Accepted:
@@ -971,6 +1131,7 @@ class YouTubeDownloaderApp(QMainWindow):
         self.add_message("Probando conexión SSH...", "info")
         
         try:
+            from utils.ssh_client import SSHClient
             ssh_client = SSHClient()
             host = self.ssh_host_input.text().strip()
             port = int(self.ssh_port_input.text().strip() or "22")
@@ -1048,18 +1209,19 @@ class YouTubeDownloaderApp(QMainWindow):
         Returns:
             bool: True si los campos son válidos
         """
-        url = self.url_input.text().strip()
+        urls = self.url_input.text().split()
         platform = self.platform_combo.currentData()
 
-        if not url:
+        if not urls:
             QMessageBox.warning(self, "Error", "Por favor, introduce una URL")
             return False
 
-        # Validar URL según la plataforma seleccionada
-        is_valid, error_msg = InputValidator.validate_url(url, platform)
-        if not is_valid:
-            QMessageBox.warning(self, "Error de Validación", error_msg)
-            return False
+        # Validar cada URL según la plataforma seleccionada
+        for url in urls:
+            is_valid, error_msg = InputValidator.validate_url(url, platform)
+            if not is_valid:
+                QMessageBox.warning(self, "Error de Validación", f"{error_msg}\n\n{url}")
+                return False
         
         # Validar destino según la pestaña seleccionada
         if self.destination_tabs.currentIndex() == 0:  # Local
@@ -1077,311 +1239,20 @@ class YouTubeDownloaderApp(QMainWindow):
         
         return True
     
-    def download_video(self, url, output_folder, is_audio, quality, use_ssh=False, ssh_config=None, transcribe=False):
-        """
-        Descarga el vídeo en un hilo separado
-
-        Args:
-            url: URL del vídeo
-            output_folder: Carpeta de destino
-            is_audio: True si es solo audio
-            quality: Calidad del vídeo
-            use_ssh: True si se debe subir a servidor SSH
-            ssh_config: Diccionario con configuración SSH
-            transcribe: True si se debe transcribir el audio
-        """
-        temp_file = None
-        try:
-            # Obtener información del vídeo
-            info = YouTubeDownloader.get_video_info(url)
-            video_title = info.get('title', 'Video')
-            
-            self.progress_hook.progress.emit(0, f"Iniciando descarga: {video_title}")
-            self.download_signals.message.emit(f"Iniciando descarga: {video_title}", "info")
-            
-            if use_ssh:
-                # Descargar a carpeta temporal primero
-                temp_dir = tempfile.gettempdir()
-                temp_output_dir = os.path.join(temp_dir, "youtube_download")
-                os.makedirs(temp_output_dir, exist_ok=True)
-                
-                # Obtener lista de archivos antes de descargar
-                files_before = set()
-                if os.path.exists(temp_output_dir):
-                    files_before = set(os.listdir(temp_output_dir))
-                
-                # Para audio, usar solo el directorio (yt-dlp generará el nombre)
-                if is_audio:
-                    # Usar template de yt-dlp para que genere el nombre correcto
-                    temp_output = os.path.join(temp_output_dir, "%(title)s.%(ext)s")
-                else:
-                    temp_output = os.path.join(temp_output_dir, f"{video_title}.mp4")
-                
-                self.download_signals.message.emit("Descargando a carpeta temporal...", "info")
-                success, message, title = YouTubeDownloader.download(
-                    url, temp_output, is_audio, quality, self.progress_hook
-                )
-                
-                if success:
-                    # Esperar un momento para que se complete la escritura del archivo
-                    import time
-                    time.sleep(1)
-                    
-                    # Buscar el archivo real (yt-dlp puede cambiar el nombre y extensión)
-                    actual_file = None
-                    
-                    if os.path.exists(temp_output_dir):
-                        # Obtener lista de archivos después de la descarga
-                        files_after = set(os.listdir(temp_output_dir))
-                        new_files = files_after - files_before
-                        
-                        if new_files:
-                            # Filtrar por extensión correcta
-                            if is_audio:
-                                mp3_files = [f for f in new_files if f.endswith('.mp3')]
-                                if mp3_files:
-                                    # Tomar el archivo más reciente que sea .mp3
-                                    actual_file = max(
-                                        [os.path.join(temp_output_dir, f) for f in mp3_files],
-                                        key=os.path.getmtime
-                                    )
-                            else:
-                                mp4_files = [f for f in new_files if f.endswith('.mp4')]
-                                if mp4_files:
-                                    actual_file = max(
-                                        [os.path.join(temp_output_dir, f) for f in mp4_files],
-                                        key=os.path.getmtime
-                                    )
-                            
-                            # Si no se encontró con la extensión correcta, tomar el más reciente
-                            if not actual_file:
-                                actual_file = max(
-                                    [os.path.join(temp_output_dir, f) for f in new_files],
-                                    key=os.path.getmtime
-                                )
-                    
-                    # Si aún no se encuentra, buscar cualquier archivo que contenga el título
-                    if not actual_file or not os.path.exists(actual_file):
-                        if os.path.exists(temp_output_dir):
-                            # Buscar archivos que contengan parte del título
-                            title_words = video_title.split()[:3]  # Primeras 3 palabras
-                            for file in os.listdir(temp_output_dir):
-                                file_path = os.path.join(temp_output_dir, file)
-                                if os.path.isfile(file_path):
-                                    # Verificar si el archivo contiene palabras del título
-                                    if any(word.lower() in file.lower() for word in title_words if len(word) > 3):
-                                        if is_audio and file.endswith('.mp3'):
-                                            actual_file = file_path
-                                            break
-                                        elif not is_audio and file.endswith('.mp4'):
-                                            actual_file = file_path
-                                            break
-                    
-                    # Último recurso: tomar el archivo más reciente del directorio
-                    if not actual_file or not os.path.exists(actual_file):
-                        if os.path.exists(temp_output_dir):
-                            all_files = [
-                                os.path.join(temp_output_dir, f) 
-                                for f in os.listdir(temp_output_dir) 
-                                if os.path.isfile(os.path.join(temp_output_dir, f))
-                            ]
-                            if all_files:
-                                actual_file = max(all_files, key=os.path.getmtime)
-                    
-                    if not actual_file or not os.path.exists(actual_file):
-                        # Listar archivos para debug
-                        debug_files = os.listdir(temp_output_dir) if os.path.exists(temp_output_dir) else []
-                        raise Exception(f"No se pudo encontrar el archivo descargado. Archivos en directorio: {debug_files}")
-                    
-                    # Verificar que el archivo tiene contenido
-                    file_size = os.path.getsize(actual_file)
-                    if file_size == 0:
-                        raise Exception(f"El archivo descargado está vacío: {actual_file}")
-                    
-                    file_size = os.path.getsize(actual_file)
-                    self.download_signals.message.emit(
-                        f"Archivo descargado: {os.path.basename(actual_file)} ({file_size / 1024 / 1024:.2f} MB)", 
-                        "info"
-                    )
-                    
-                    self.download_signals.message.emit("Conectando al servidor SSH...", "info")
-                    self.progress_hook.progress.emit(60, "Conectando al servidor...")
-                    
-                    # Conectar SSH
-                    ssh_client = SSHClient()
-                    conn_success, conn_msg = ssh_client.connect(
-                        ssh_config['host'],
-                        ssh_config['port'],
-                        ssh_config['username'],
-                        ssh_config.get('password'),
-                        ssh_config.get('key_file')
-                    )
-                    
-                    if not conn_success:
-                        raise Exception(f"Error de conexión SSH: {conn_msg}")
-                    
-                    self.download_signals.message.emit("✅ Conexión SSH establecida", "success")
-                    
-                    # Verificar que la carpeta remota existe y tiene permisos
-                    self.download_signals.message.emit("Verificando carpeta remota...", "info")
-                    stdin, stdout, stderr = ssh_client.client.exec_command(
-                        f'test -d "{ssh_config["remote_folder"]}" && test -w "{ssh_config["remote_folder"]}" && echo "OK" || echo "ERROR"'
-                    )
-                    folder_check = stdout.read().decode().strip()
-                    
-                    if folder_check != "OK":
-                        # Intentar crear la carpeta
-                        create_success, create_msg = ssh_client.create_directory(ssh_config['remote_folder'])
-                        if not create_success:
-                            raise Exception(f"No se puede acceder a la carpeta remota: {create_msg}")
-                    
-                    self.download_signals.message.emit("Subiendo archivo al servidor...", "info")
-                    self.progress_hook.progress.emit(70, "Subiendo archivo...")
-                    
-                    # Subir archivo - usar el nombre del archivo real
-                    remote_filename = os.path.basename(actual_file)
-                    remote_path = os.path.join(ssh_config['remote_folder'], remote_filename)
-                    
-                    file_size_mb = os.path.getsize(actual_file) / 1024 / 1024
-                    self.download_signals.message.emit(
-                        f"Subiendo {remote_filename} ({file_size_mb:.2f} MB) a {ssh_config['remote_folder']}...", 
-                        "info"
-                    )
-                    
-                    # Subir archivo con timeout
-                    upload_success, upload_msg = ssh_client.upload_file(actual_file, remote_path)
-                    
-                    if upload_success:
-                        self.download_signals.message.emit(f"✅ {upload_msg}", "success")
-                    else:
-                        self.download_signals.message.emit(f"❌ {upload_msg}", "error")
-                    
-                    ssh_client.disconnect()
-                    
-                    if upload_success:
-                        # Guardar carpeta remota usada después de descarga exitosa
-                        if ssh_config and ssh_config.get('remote_folder'):
-                            self.app_settings.set_last_remote_folder(ssh_config['remote_folder'])
-                        
-                        # Eliminar archivo temporal
-                        try:
-                            os.remove(actual_file)
-                            # Limpiar directorio temporal si está vacío
-                            try:
-                                if not os.listdir(temp_output_dir):
-                                    os.rmdir(temp_output_dir)
-                            except:
-                                pass
-                        except Exception as e:
-                            self.download_signals.message.emit(
-                                f"⚠️ No se pudo eliminar archivo temporal: {str(e)}", 
-                                "warning"
-                            )
-                        
-                        self.progress_hook.progress.emit(100, "¡Descarga y subida completadas!")
-                        self.download_signals.message.emit(f"¡Archivo subido exitosamente a: {remote_path}!", "success")
-                        self.download_signals.download_finished.emit(
-                            True,
-                            f"¡Descarga y subida completadas!\n\n{title}\n\nGuardado en servidor: {remote_path}",
-                            title
-                        )
-                    else:
-                        raise Exception(f"Error al subir archivo: {upload_msg}")
-                else:
-                    raise Exception(message)
-            else:
-                # Descarga local normal
-                success, message, title = YouTubeDownloader.download(
-                    url, output_folder, is_audio, quality, self.progress_hook
-                )
-
-                if success:
-                    # Guardar carpeta local usada después de descarga exitosa
-                    if output_folder:
-                        self.app_settings.set_last_local_folder(output_folder)
-
-                    transcription_result = ""
-
-                    # Transcribir si está habilitado y es audio
-                    if is_audio and transcribe:
-                        self.progress_hook.progress.emit(95, "Transcribiendo audio...")
-                        self.download_signals.message.emit("Iniciando transcripción con Whisper AI...", "info")
-
-                        # Buscar el archivo de audio descargado
-                        import glob
-                        import time
-                        time.sleep(1)  # Esperar a que se complete la escritura
-
-                        # Buscar archivos MP3 recientes en la carpeta
-                        mp3_files = glob.glob(os.path.join(output_folder, "*.mp3"))
-                        if mp3_files:
-                            audio_file = max(mp3_files, key=os.path.getmtime)
-
-                            # Generar nombre para el archivo de transcripción
-                            txt_filename = os.path.splitext(audio_file)[0] + "_transcripcion.txt"
-
-                            # Transcribir
-                            trans_success, trans_msg, trans_text = AudioTranscriber.transcribe(
-                                audio_file,
-                                txt_filename,
-                                model_name="base",
-                                language="es"
-                            )
-
-                            if trans_success:
-                                self.download_signals.message.emit(f"Transcripción guardada: {os.path.basename(txt_filename)}", "success")
-                                transcription_result = f"\nTranscripción: {txt_filename}"
-                            else:
-                                self.download_signals.message.emit(f"Error en transcripción: {trans_msg}", "warning")
-                                transcription_result = f"\nTranscripción fallida: {trans_msg}"
-                        else:
-                            self.download_signals.message.emit("No se encontró archivo de audio para transcribir", "warning")
-
-                    self.progress_hook.progress.emit(100, "¡Descarga completada!")
-                    self.download_signals.message.emit(
-                        f"¡Descarga completada! Archivo guardado en: {output_folder}",
-                        "success"
-                    )
-                    self.download_signals.download_finished.emit(
-                        True,
-                        f"¡Descarga completada!\n\n{title}\n\nGuardado en: {output_folder}{transcription_result}",
-                        title
-                    )
-                else:
-                    raise Exception(message)
-        
-        except Exception as e:
-            error_msg = str(e)
-            self.progress_hook.progress.emit(0, f"Error: {error_msg}")
-            self.download_signals.message.emit(f"Error en la descarga: {error_msg}", "error")
-            self.download_signals.download_finished.emit(False, f"Error al descargar el vídeo:\n\n{error_msg}", "")
-        
-        finally:
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-    
     def start_download(self):
-        """Inicia el proceso de descarga"""
+        """Encola una descarga por cada URL introducida"""
         if not self.validate_inputs():
             return
         
-        # Deshabilitar botón durante la descarga
-        self.download_button.setEnabled(False)
-        self.status_label.setText(">> DESCARGANDO...")
         self.progress_bar.setValue(0)
         
-        # Crear hook de progreso
-        self.progress_hook = DownloadProgressHook()
-        self.progress_hook.progress.connect(self.update_progress)
-        
-        # Obtener parámetros
-        url = self.url_input.text().strip()
+        # Obtener parámetros (se admiten varias URLs separadas por espacios)
+        urls = self.url_input.text().split()
         is_audio = self.format_audio.isChecked()
         quality = self.quality_combo.currentText() if not is_audio else None
         transcribe = self.transcription_checkbox.isChecked() and is_audio
+        force_whisper = self.force_whisper_checkbox.isChecked()
+        use_archive = self.archive_checkbox.isChecked()
 
         # Guardar formato por defecto
         format_type = 'audio' if is_audio else 'video'
@@ -1410,13 +1281,27 @@ class YouTubeDownloaderApp(QMainWindow):
                 self.app_settings.set_last_local_folder(output_folder)
             ssh_config = None
 
-        # Iniciar descarga en hilo separado
-        self.download_thread = Thread(
-            target=self.download_video,
-            args=(url, output_folder, is_audio, quality, use_ssh, ssh_config, transcribe)
-        )
-        self.download_thread.daemon = True
-        self.download_thread.start()
+        # Solo transcripción: el texto se guarda en la carpeta local
+        transcript_only = transcribe and not use_ssh and self.transcript_only_checkbox.isChecked()
+
+        # Se llama desde el hilo de expansión de submit_iter: nada de objetos Qt aquí
+        def make_job(entry_url):
+            job = DownloadJob(entry_url, output_folder, is_audio, quality, use_ssh, ssh_config,
+                              transcribe, use_archive, force_whisper, transcript_only)
+            with self.batch_lock:
+                self.batch_job_ids.append(job.job_id)
+            return job
+        
+        # Cada URL se expande en segundo plano (listas y canales entrada a
+        # entrada) y cada entrada se encola en cuanto se conoce; el pool
+        # resuelve y descarga varias a la vez
+        for url in urls:
+            entries = YouTubeDownloader.iter_entries(
+                url, self.download_archive.contains if use_archive else None
+            )
+            self.download_queue.submit_iter(entries, make_job, source=url)
+        
+        self.add_message(f"{len(urls)} URL(s) añadidas a la cola", "info")
     
     def update_progress(self, percent, message):
         """
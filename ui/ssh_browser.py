@@ -2,16 +2,38 @@
 # -*- coding: utf-8 -*-
 """
 Explorador de archivos remoto SSH
+
+Toda la E/S remota se hace en hilos; la interfaz solo recibe señales.
 """
 
+import queue
+import threading
+import time
+
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
     QPushButton, QLineEdit, QLabel, QMessageBox
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
 from PySide6.QtGui import QIcon
 from utils.ssh_client import SSHClient
-from config import MATRIX_COLORS
+from utils.remote_listing import RemoteListingCache, get_listing_cache, get_search_cache
+from config import (
+    MATRIX_COLORS, SSH_BROWSER_BATCH_SIZE, SSH_BROWSER_PREFETCH_LIMIT, SSH_SEARCH_MAX_RESULTS
+)
+
+
+# Rol de datos que marca una carpeta cuyas subcarpetas ya se cargaron
+LOADED_ROLE = Qt.UserRole + 1
+
+
+class BrowserSignals(QObject):
+    """Señales de los hilos del explorador hacia la interfaz"""
+    connected = Signal(bool, str, str)  # éxito, mensaje, directorio home
+    listed = Signal(int, str, bool, object, str)  # generación, ruta, éxito, entradas, mensaje
+    prefetched = Signal(int, str, bool)  # generación, ruta, tiene subcarpetas
+    search_results = Signal(int, object)  # generación, rutas encontradas (un lote)
+    search_finished = Signal(int, bool, str)  # generación, completa, mensaje
 
 
 class SSHBrowserDialog(QDialog):
@@ -30,6 +52,27 @@ class SSHBrowserDialog(QDialog):
         self.ssh_client = None
         self.selected_path = None
         self.current_path = "/"
+        self.listing_cache = get_listing_cache()
+        self.search_cache = get_search_cache()
+        self.search_cancel = None
+        self.search_count = 0
+        self.server_key = RemoteListingCache.server_key(ssh_config) if ssh_config else None
+        # Se incrementa en cada navegación; peticiones y lotes de otra carpeta se descartan
+        self.load_generation = 0
+        self.pending_root = None
+        self.home_dir = ""
+        self.items_by_path = {}
+        self.navigation_queue = queue.Queue()
+        self.prefetch_queue = queue.Queue()
+        self.navigation_thread = None
+        self.prefetch_thread = None
+        
+        self.signals = BrowserSignals()
+        self.signals.connected.connect(self.on_connected)
+        self.signals.listed.connect(self.on_listed)
+        self.signals.prefetched.connect(self.on_prefetched)
+        self.signals.search_results.connect(self.on_search_results)
+        self.signals.search_finished.connect(self.on_search_finished)
 
         self.setWindowTitle(">> SSH FILE BROWSER")
         self.setMinimumSize(650, 550)
@@ -156,12 +199,32 @@ class SSHBrowserDialog(QDialog):
 
         layout.addLayout(nav_layout)
 
+        # Búsqueda de carpetas bajo la ruta actual
+        search_layout = QHBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Buscar carpetas bajo la ruta actual...")
+        self.search_input.returnPressed.connect(self.toggle_search)
+
+        self.search_button = QPushButton("BUSCAR")
+        self.search_button.clicked.connect(self.toggle_search)
+
+        search_layout.addWidget(QLabel("Buscar:"))
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_button)
+
+        layout.addLayout(search_layout)
+
         # Árbol de directorios
         self.tree = QTreeWidget()
         self.tree.setHeaderLabel(">> DIRECTORIOS")
         self.tree.itemDoubleClicked.connect(self.on_item_double_clicked)
         self.tree.itemClicked.connect(self.on_item_clicked)
+        self.tree.itemExpanded.connect(self.on_item_expanded)
         layout.addWidget(self.tree)
+        
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
 
         # Botones
         buttons_layout = QHBoxLayout()
@@ -224,78 +287,380 @@ class SSHBrowserDialog(QDialog):
         layout.addLayout(buttons_layout)
     
     def connect_and_load(self):
-        """Conecta al servidor SSH y carga el directorio raíz"""
+        """Conecta al servidor SSH (en segundo plano) y carga el directorio home"""
         if not self.ssh_config:
             QMessageBox.warning(self, "Error", "No hay configuración SSH disponible")
             return
         
+        self.set_status("Conectando...")
+        self.navigation_thread = threading.Thread(
+            target=self.navigation_worker, name="ssh-browser", daemon=True
+        )
+        self.navigation_thread.start()
+    
+    # ------------------------------------------------------------------
+    # Hilos de trabajo (sin acceso a widgets: solo emiten señales)
+    # ------------------------------------------------------------------
+    
+    def open_client(self):
+        """Abre un SSHClient (la sesión la comparte el pool)"""
+        client = SSHClient()
+        success, message = client.connect(
+            self.ssh_config['host'],
+            self.ssh_config['port'],
+            self.ssh_config['username'],
+            self.ssh_config.get('password'),
+            self.ssh_config.get('key_file')
+        )
+        return client if success else None, message
+    
+    def navigation_worker(self):
+        """Conecta y atiende los listados que pide la interfaz, en orden"""
         try:
-            self.ssh_client = SSHClient()
-            success, message = self.ssh_client.connect(
-                self.ssh_config['host'],
-                self.ssh_config['port'],
-                self.ssh_config['username'],
-                self.ssh_config.get('password'),
-                self.ssh_config.get('key_file')
-            )
-            
-            if not success:
-                QMessageBox.critical(self, "Error de Conexión", message)
+            self.ssh_client, message = self.open_client()
+            if not self.ssh_client:
+                self.signals.connected.emit(False, message, "")
                 return
             
-            # Obtener el directorio home del usuario
-            stdin, stdout, stderr = self.ssh_client.client.exec_command('echo $HOME')
-            home_dir = stdout.read().decode().strip()
-            if home_dir:
-                self.current_path = home_dir
-                self.path_input.setText(self.current_path)
+            # Directorio home del usuario (se reutiliza mientras dure la sesión del pool)
+            preflight = self.ssh_client.preflight(".", create=False)
+            home_dir = preflight['home'] if preflight else ""
+            self.signals.connected.emit(True, message, home_dir)
             
-            self.load_directory(self.current_path)
-        
+            while True:
+                task = self.navigation_queue.get()
+                if task is None:
+                    break
+                generation, path, force = task
+                if generation != self.load_generation:
+                    continue  # Petición de una carpeta que el usuario ya dejó
+                entries = None if force else self.listing_cache.get(self.server_key, path)
+                success, message = True, ""
+                if entries is None:
+                    success, entries, message = self.ssh_client.list_directory_attr(path)
+                    if success:
+                        self.listing_cache.put(self.server_key, path, entries)
+                self.signals.listed.emit(generation, path, success, entries, message)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al conectar: {str(e)}")
+            self.signals.connected.emit(False, f"Error al conectar: {str(e)}", "")
+        finally:
+            if self.ssh_client:
+                self.ssh_client.disconnect()
     
-    def load_directory(self, path):
-        """Carga el contenido de un directorio"""
-        if not self.ssh_client:
+    def prefetch_worker(self):
+        """Lista por adelantado las subcarpetas visibles (solo llena la caché)"""
+        client = None
+        try:
+            while True:
+                task = self.prefetch_queue.get()
+                if task is None:
+                    break
+                generation, path = task
+                if generation != self.load_generation:
+                    continue
+                entries = self.listing_cache.get(self.server_key, path)
+                if entries is None:
+                    if client is None:
+                        # Canal SFTP propio para no retrasar la navegación
+                        client, _ = self.open_client()
+                        if client is None:
+                            break
+                    success, entries, _ = client.list_directory_attr(path)
+                    if not success:
+                        continue
+                    self.listing_cache.put(self.server_key, path, entries)
+                self.signals.prefetched.emit(
+                    generation, path, any(entry['is_dir'] for entry in entries)
+                )
+        except Exception:
+            pass
+        finally:
+            if client:
+                client.disconnect()
+    
+    # ------------------------------------------------------------------
+    # Respuestas de los hilos (hilo de la interfaz)
+    # ------------------------------------------------------------------
+    
+    def on_connected(self, success, message, home_dir):
+        """Resultado de la conexión"""
+        if not success:
+            self.set_status("Sin conexión")
+            QMessageBox.critical(self, "Error de Conexión", message)
             return
         
-        try:
-            # Limpiar árbol
-            self.tree.clear()
-            
-            # Listar directorio
-            success, items, message = self.ssh_client.list_directory(path)
-            
+        self.home_dir = home_dir
+        self.prefetch_thread = threading.Thread(
+            target=self.prefetch_worker, name="ssh-browser-prefetch", daemon=True
+        )
+        self.prefetch_thread.start()
+        self.load_directory(home_dir or self.current_path)
+    
+    def on_listed(self, generation, path, success, entries, message):
+        """Llega el listado de una carpeta (raíz del árbol o carpeta expandida)"""
+        if generation != self.load_generation:
+            return
+        
+        if path == self.pending_root:
+            self.pending_root = None
             if not success:
+                self.set_status("")
                 QMessageBox.warning(self, "Error", message)
                 return
-            
-            # Añadir item para subir un nivel
-            if path != "/":
-                parent_item = QTreeWidgetItem(self.tree)
-                parent_item.setText(0, "[..] Parent Directory")
-                parent_item.setData(0, Qt.UserRole, "..")
-            
-            # Añadir carpetas
-            for item in sorted(items):
-                item_path = f"{path.rstrip('/')}/{item}" if path != "/" else f"/{item}"
-                
-                # Verificar si es directorio
-                try:
-                    stat = self.ssh_client.sftp.stat(item_path)
-                    if stat.st_mode & 0o040000:  # Es un directorio
-                        tree_item = QTreeWidgetItem(self.tree)
-                        tree_item.setText(0, f"[DIR] {item}")
-                        tree_item.setData(0, Qt.UserRole, item_path)
-                except:
-                    pass
-            
-            self.current_path = path
-            self.path_input.setText(path)
+            self.show_root(path, entries)
+            return
+        
+        item = self.items_by_path.get(path)
+        if item is None or item.data(0, LOADED_ROLE):
+            return
+        if not success:
+            item.takeChildren()
+            item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicator)
+            item.setToolTip(0, message)
+            return
+        self.fill_item(item, path, entries)
+    
+    def on_prefetched(self, generation, path, has_subdirs):
+        """Una subcarpeta ya está en caché: se sabe si tiene carpetas dentro"""
+        if generation != self.load_generation:
+            return
+        item = self.items_by_path.get(path)
+        if item is not None and not has_subdirs and not item.data(0, LOADED_ROLE):
+            item.takeChildren()
+            item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicator)
+    
+    # ------------------------------------------------------------------
+    # Árbol
+    # ------------------------------------------------------------------
+    
+    def load_directory(self, path, force=False):
+        """
+        Muestra un directorio como raíz del árbol
+
+        Args:
+            path: Ruta remota
+            force: Ignorar el listado guardado en caché y volver a pedirlo
+        """
+        if not self.ssh_client:
+            return
         
+        # Cualquier petición, lote o búsqueda pendiente de la carpeta anterior queda obsoleto
+        self.cancel_search()
+        self.load_generation += 1
+        self.path_input.setText(path)
+        
+        entries = None if force else self.listing_cache.get(self.server_key, path)
+        if entries is not None:
+            self.pending_root = None
+            self.show_root(path, entries)
+            return
+        
+        self.pending_root = path
+        self.set_status(f"Cargando {path}...")
+        self.navigation_queue.put((self.load_generation, path, force))
+    
+    def show_root(self, path, entries):
+        """Sustituye el contenido del árbol por las carpetas de path"""
+        self.tree.clear()
+        self.items_by_path = {}
+        
+        # Añadir item para subir un nivel
+        if path != "/":
+            parent_item = QTreeWidgetItem(self.tree)
+            parent_item.setText(0, "[..] Parent Directory")
+            parent_item.setData(0, Qt.UserRole, "..")
+        
+        self.current_path = path
+        self.path_input.setText(path)
+        self.fill_item(None, path, entries)
+    
+    def fill_item(self, parent_item, path, entries):
+        """Añade las subcarpetas de path bajo parent_item (o en la raíz si es None)"""
+        directories = sorted(entry['name'] for entry in entries if entry['is_dir'])
+        if parent_item is not None:
+            parent_item.takeChildren()
+            parent_item.setData(0, LOADED_ROLE, True)
+            if not directories:
+                parent_item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicator)
+        self.set_status(f"{len(directories)} carpeta(s)")
+        
+        # El primer lote se pinta ya; el resto, en las siguientes vueltas del bucle de eventos
+        self.add_directory_batch(parent_item, path, directories, 0, self.load_generation)
+        
+        # Listar por adelantado las primeras subcarpetas para que abrirlas sea inmediato
+        for name in directories[:SSH_BROWSER_PREFETCH_LIMIT]:
+            self.prefetch_queue.put((self.load_generation, self.join_path(path, name)))
+    
+    def add_directory_batch(self, parent_item, path, directories, start, generation):
+        """Añade al árbol un lote de carpetas y programa el siguiente"""
+        if generation != self.load_generation:
+            return  # El usuario ya navegó a otra carpeta
+        
+        batch = directories[start:start + SSH_BROWSER_BATCH_SIZE]
+        items = []
+        for name in batch:
+            item_path = self.join_path(path, name)
+            tree_item = QTreeWidgetItem()
+            tree_item.setText(0, f"[DIR] {name}")
+            tree_item.setData(0, Qt.UserRole, item_path)
+            # Se expande bajo demanda: el listado se pide al abrir la carpeta
+            tree_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            self.items_by_path[item_path] = tree_item
+            items.append(tree_item)
+        if parent_item is None:
+            self.tree.addTopLevelItems(items)
+        else:
+            parent_item.addChildren(items)
+        
+        next_start = start + len(batch)
+        if next_start < len(directories):
+            QTimer.singleShot(
+                0, lambda: self.add_directory_batch(parent_item, path, directories, next_start, generation)
+            )
+    
+    def on_item_expanded(self, item):
+        """Carga las subcarpetas de un elemento la primera vez que se expande"""
+        path = item.data(0, Qt.UserRole)
+        if not path or path == ".." or item.data(0, LOADED_ROLE):
+            return
+        
+        entries = self.listing_cache.get(self.server_key, path)
+        if entries is not None:
+            self.fill_item(item, path, entries)
+            return
+        
+        if item.childCount() == 0:
+            loading = QTreeWidgetItem(item)
+            loading.setText(0, "Cargando...")
+            loading.setFlags(Qt.NoItemFlags)
+        self.navigation_queue.put((self.load_generation, path, False))
+    
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+    
+    def toggle_search(self):
+        """Inicia una búsqueda, o detiene la que está en curso"""
+        if self.search_cancel is not None and not self.search_cancel.is_set():
+            self.cancel_search()
+            self.set_status(f"Búsqueda detenida: {self.search_count} resultado(s)")
+            return
+        self.start_search()
+    
+    def start_search(self):
+        """Busca carpetas bajo la carpeta actual y muestra los resultados a medida que llegan"""
+        pattern = self.search_input.text().strip()
+        if not pattern or not self.ssh_client:
+            return
+        
+        self.cancel_search()
+        self.load_generation += 1
+        self.pending_root = None
+        self.tree.clear()
+        self.items_by_path = {}
+        self.search_count = 0
+        root = self.current_path
+        
+        cached = self.search_cache.get(self.server_key, root, pattern)
+        if cached is not None:
+            self.on_search_results(self.load_generation, cached)
+            self.set_status(f"{len(cached)} resultado(s) (caché)")
+            return
+        
+        self.search_cancel = threading.Event()
+        self.search_button.setText("DETENER")
+        self.set_status(f"Buscando '{pattern}' en {root}...")
+        threading.Thread(
+            target=self.search_worker,
+            args=(self.load_generation, root, pattern, self.search_cancel),
+            name="ssh-browser-search", daemon=True
+        ).start()
+    
+    def cancel_search(self):
+        """Detiene la búsqueda en curso (si la hay)"""
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+            self.search_cancel = None
+        self.search_button.setText("BUSCAR")
+    
+    def search_worker(self, generation, root, pattern, cancel_event):
+        """Ejecuta la búsqueda remota y envía los resultados por lotes"""
+        client = None
+        results = []
+        batch = []
+        last_emit = time.time()
+        complete = False
+        message = ""
+        try:
+            client, message = self.open_client()
+            if client is None:
+                return
+            message = ""
+            matches = client.find_directories(root, pattern, cancel_event=cancel_event)
+            try:
+                for path in matches:
+                    results.append(path)
+                    batch.append(path)
+                    # Lotes por número o por tiempo para no saturar la interfaz de señales
+                    if len(batch) >= 100 or time.time() - last_emit > 0.25:
+                        self.signals.search_results.emit(generation, batch)
+                        batch = []
+                        last_emit = time.time()
+                    if len(results) >= SSH_SEARCH_MAX_RESULTS:
+                        message = f"se muestran los primeros {SSH_SEARCH_MAX_RESULTS}"
+                        break
+                else:
+                    complete = not cancel_event.is_set()
+            finally:
+                # Cierra el canal de find (o detiene el recorrido SFTP)
+                matches.close()
+            
+            if complete:
+                self.search_cache.put(self.server_key, root, pattern, results)
         except Exception as e:
-            QMessageBox.warning(self, "Error", f"Error al cargar directorio: {str(e)}")
+            message = f"Error en la búsqueda: {str(e)}"
+        finally:
+            if batch:
+                self.signals.search_results.emit(generation, batch)
+            self.signals.search_finished.emit(generation, complete, message)
+            if client:
+                client.disconnect()
+    
+    def on_search_results(self, generation, paths):
+        """Añade al árbol un lote de carpetas encontradas"""
+        if generation != self.load_generation:
+            return
+        items = []
+        for path in paths:
+            tree_item = QTreeWidgetItem()
+            tree_item.setText(0, f"[DIR] {path}")
+            tree_item.setData(0, Qt.UserRole, path)
+            tree_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            self.items_by_path[path] = tree_item
+            items.append(tree_item)
+        self.tree.addTopLevelItems(items)
+        self.search_count += len(items)
+        self.set_status(f"Buscando... {self.search_count} resultado(s)")
+    
+    def on_search_finished(self, generation, complete, message):
+        """La búsqueda terminó, se canceló o falló"""
+        if generation != self.load_generation:
+            return
+        self.search_cancel = None
+        self.search_button.setText("BUSCAR")
+        status = f"{self.search_count} resultado(s)"
+        if message:
+            status += f" ({message})"
+        self.set_status(status)
+    
+    @staticmethod
+    def join_path(path, name):
+        """Une una carpeta remota y un nombre"""
+        return f"{path.rstrip('/')}/{name}" if path != "/" else f"/{name}"
+    
+    def set_status(self, text):
+        """Texto de estado bajo el árbol"""
+        self.status_label.setText(text)
     
     def on_item_double_clicked(self, item, column):
         """Se ejecuta al hacer doble clic en un item"""
@@ -306,9 +671,9 @@ class SSHBrowserDialog(QDialog):
             if not parent_path:
                 parent_path = "/"
             self.load_directory(parent_path)
-        else:
-            # Entrar en el directorio
-            self.load_directory(path)
+        elif path:
+            # Expandir en el sitio (QTreeWidget ya alterna la expansión con el doble clic)
+            self.path_input.setText(path)
     
     def on_item_clicked(self, item, column):
         """Se ejecuta al hacer clic en un item"""
@@ -327,21 +692,14 @@ class SSHBrowserDialog(QDialog):
             self.load_directory(path)
     
     def go_home(self):
-        """Va al directorio home del usuario"""
-        if self.ssh_client:
-            try:
-                stdin, stdout, stderr = self.ssh_client.client.exec_command('echo $HOME')
-                home_dir = stdout.read().decode().strip()
-                if home_dir:
-                    self.load_directory(home_dir)
-            except:
-                self.load_directory("/home")
-        else:
-            self.load_directory("/home")
+        """Va al directorio home del usuario (obtenido al conectar)"""
+        self.load_directory(self.home_dir or "/home")
     
     def refresh_current_directory(self):
-        """Actualiza el directorio actual"""
-        self.load_directory(self.current_path)
+        """Actualiza el directorio actual (vuelve a pedir el listado al servidor)"""
+        self.listing_cache.invalidate(self.server_key)
+        self.search_cache.invalidate(self.server_key)
+        self.load_directory(self.current_path, force=True)
     
     def accept_selection(self):
         """Acepta la selección y cierra el diálogo"""
@@ -356,8 +714,19 @@ class SSHBrowserDialog(QDialog):
         """Retorna la ruta seleccionada"""
         return self.selected_path
     
+    def stop_workers(self):
+        """Detiene los hilos; cada uno cierra su conexión al terminar"""
+        self.cancel_search()
+        self.load_generation += 1
+        self.navigation_queue.put(None)
+        self.prefetch_queue.put(None)
+    
+    def done(self, result):
+        """Cierra el diálogo (aceptar o cancelar) deteniendo los hilos"""
+        self.stop_workers()
+        super().done(result)
+    
     def closeEvent(self, event):
         """Cierra la conexión SSH al cerrar el diálogo"""
-        if self.ssh_client:
-            self.ssh_client.disconnect()
+        self.stop_workers()
         event.accept()
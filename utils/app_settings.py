@@ -8,6 +8,8 @@ import json
 from pathlib import Path
 from typing import Optional
 
+from config import MAX_CONCURRENT_DOWNLOADS
+
 
 class AppSettings:
     """Gestor para guardar y cargar configuraciones de la aplicación"""
@@ -93,3 +95,28 @@ class AppSettings:
         settings = self.load_settings()
         settings['default_format'] = format_type
         return self.save_settings(settings)
+    
+    def get_max_concurrent_downloads(self) -> int:
+        """Obtiene el número de descargas simultáneas"""
+        settings = self.load_settings()
+        try:
+            return max(1, int(settings.get('max_concurrent_downloads', MAX_CONCURRENT_DOWNLOADS)))
+        except (TypeError, ValueError):
+            return MAX_CONCURRENT_DOWNLOADS
+    
+    def set_max_concurrent_downloads(self, value: int) -> bool:
+        """Guarda el número de descargas simultáneas"""
+        settings = self.load_settings()
+        settings['max_concurrent_downloads'] = int(value)
+        return self.save_settings(settings)
+    
+    def get_use_download_archive(self) -> bool:
+        """Obtiene si se deben omitir los contenidos ya descargados"""
+        settings = self.load_settings()
+        return bool(settings.get('use_download_archive', True))
+    
+    def set_use_download_archive(self, enabled: bool) -> bool:
+        """Guarda si se deben omitir los contenidos ya descargados"""
+        settings = self.load_settings()
+        settings['use_download_archive'] = bool(enabled)
+        return self.save_settings(settings)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivo de descargas: registro de lo que ya se ha descargado
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class DownloadArchive:
+    """
+    Registro persistente de contenidos descargados
+
+    Cada contenido se identifica con la clave "<extractor> <id>", la misma que
+    usa yt-dlp en su opción --download-archive, así que se puede importar y
+    exportar ese formato de texto. Es seguro usarlo desde varios workers.
+    """
+
+    def __init__(self, db_file: Optional[str] = None):
+        """
+        Inicializa el archivo
+
+        Args:
+            db_file: Ruta a la base de datos. Si es None, usa la predeterminada.
+        """
+        if db_file is None:
+            config_dir = Path.home() / ".youtube_downloader"
+            config_dir.mkdir(exist_ok=True)
+            self.db_file = config_dir / "download_archive.db"
+        else:
+            self.db_file = Path(db_file)
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._keys = set()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión (una por operación, para poder usarla desde varios hilos)"""
+        return sqlite3.connect(str(self.db_file), timeout=10)
+
+    def _init_db(self):
+        """Crea la tabla si no existe y carga las claves en memoria"""
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    key TEXT PRIMARY KEY,
+                    added_at REAL NOT NULL
+                )
+            """)
+            self._keys = {row[0] for row in conn.execute("SELECT key FROM archive")}
+
+    @staticmethod
+    def _normalize(key: Optional[str]) -> Optional[str]:
+        """Normaliza una clave ("Youtube  abc" -> "youtube abc")"""
+        if not key:
+            return None
+        parts = key.strip().split(None, 1)
+        if len(parts) != 2:
+            return None
+        return f"{parts[0].lower()} {parts[1].strip()}"
+
+    def contains(self, key: Optional[str]) -> bool:
+        """
+        Comprueba si un contenido ya se descargó
+
+        Args:
+            key: Clave "<extractor> <id>" (None devuelve False)
+
+        Returns:
+            bool: True si está en el archivo
+        """
+        key = self._normalize(key)
+        if not key:
+            return False
+        with self._lock:
+            return key in self._keys
+
+    def add(self, key: Optional[str]) -> bool:
+        """
+        Registra un contenido como descargado
+
+        Args:
+            key: Clave "<extractor> <id>"
+
+        Returns:
+            bool: True si se añadió (False si ya estaba o la clave no es válida)
+        """
+        return self.add_many([key]) > 0
+
+    def add_many(self, keys: Iterable[Optional[str]]) -> int:
+        """
+        Registra varios contenidos en una sola transacción
+
+        Args:
+            keys: Claves "<extractor> <id>"
+
+        Returns:
+            int: Número de claves nuevas
+        """
+        now = time.time()
+        with self._lock:
+            new_keys = []
+            for key in keys:
+                key = self._normalize(key)
+                if key and key not in self._keys:
+                    self._keys.add(key)
+                    new_keys.append(key)
+            if new_keys:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO archive (key, added_at) VALUES (?, ?)",
+                        [(key, now) for key in new_keys]
+                    )
+        return len(new_keys)
+
+    def remove(self, key: Optional[str]) -> bool:
+        """Elimina un contenido del archivo para poder descargarlo de nuevo"""
+        key = self._normalize(key)
+        if not key:
+            return False
+        with self._lock:
+            if key not in self._keys:
+                return False
+            self._keys.discard(key)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM archive WHERE key = ?", (key,))
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+    def import_file(self, archive_file: str) -> int:
+        """
+        Importa un archivo en el formato de texto de yt-dlp (--download-archive)
+
+        Args:
+            archive_file: Ruta al archivo (una línea "<extractor> <id>" por contenido)
+
+        Returns:
+            int: Número de claves nuevas importadas
+        """
+        with open(archive_file, 'r', encoding='utf-8') as f:
+            return self.add_many(line for line in f if line.strip())
+
+    def export_file(self, archive_file: str) -> int:
+        """
+        Exporta el archivo en el formato de texto de yt-dlp (--download-archive)
+
+        Args:
+            archive_file: Ruta de destino
+
+        Returns:
+            int: Número de claves exportadas
+        """
+        with self._lock:
+            keys = sorted(self._keys)
+        with open(archive_file, 'w', encoding='utf-8') as f:
+            for key in keys:
+                f.write(f"{key}\n")
+        return len(keys)
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_download_archive() -> DownloadArchive:
+    """
+    Obtiene el archivo de descargas compartido del proceso
+
+    Returns:
+        DownloadArchive: Instancia única con la ruta predeterminada
+    """
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = DownloadArchive()
+        return _default_archive
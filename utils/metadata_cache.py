@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de metadatos de yt-dlp
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from config import METADATA_CACHE_TTL, METADATA_CACHE_MAX_BYTES
+
+
+# Campos pesados que solo hacen falta para descargar
+HEAVY_FIELDS = ('formats', 'requested_formats', 'requested_downloads', 'http_headers')
+
+
+class MetadataCache:
+    """
+    Caché SQLite de diccionarios de información de yt-dlp
+
+    Las entradas se indexan por "<extractor> <id>" (el mismo formato que el
+    archivo de descargas de yt-dlp) y además se guarda qué URLs apuntan a cada
+    entrada para poder resolver una URL sin ir a la red.
+    """
+
+    def __init__(self, db_file: Optional[str] = None,
+                 ttl: int = METADATA_CACHE_TTL,
+                 max_bytes: int = METADATA_CACHE_MAX_BYTES):
+        """
+        Inicializa la caché
+
+        Args:
+            db_file: Ruta a la base de datos. Si es None, usa la predeterminada.
+            ttl: Segundos que una entrada se considera válida
+            max_bytes: Tamaño máximo de los datos guardados antes de expulsar entradas
+        """
+        if db_file is None:
+            config_dir = Path.home() / ".youtube_downloader"
+            config_dir.mkdir(exist_ok=True)
+            self.db_file = config_dir / "metadata_cache.db"
+        else:
+            self.db_file = Path(db_file)
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión (una por operación, para poder usarla desde varios hilos)"""
+        return sqlite3.connect(str(self.db_file), timeout=10)
+
+    def _init_db(self):
+        """Crea las tablas si no existen"""
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS media (
+                    key TEXT PRIMARY KEY,
+                    info BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    has_formats INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    key TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_media_accessed ON media(accessed_at)")
+
+    @staticmethod
+    def make_key(info: dict) -> Optional[str]:
+        """
+        Calcula la clave de un diccionario de información
+
+        Args:
+            info: Información devuelta por yt-dlp
+
+        Returns:
+            str: "<extractor> <id>" o None si falta alguno de los dos
+        """
+        extractor = info.get('extractor_key') or info.get('ie_key') or info.get('extractor')
+        video_id = info.get('id')
+        if not extractor or not video_id:
+            return None
+        return f"{str(extractor).lower()} {video_id}"
+
+    def get(self, key: str, require_formats: bool = True) -> Optional[dict]:
+        """
+        Obtiene una entrada válida
+
+        Args:
+            key: Clave "<extractor> <id>"
+            require_formats: Si es True, ignora entradas sin la lista de formatos
+
+        Returns:
+            dict: Información guardada o None si no hay entrada válida
+        """
+        if not key:
+            return None
+
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT info, has_formats, created_at FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            data, has_formats, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM media WHERE key = ?", (key,))
+                return None
+            if require_formats and not has_formats:
+                return None
+
+            conn.execute("UPDATE media SET accessed_at = ? WHERE key = ?", (now, key))
+
+        try:
+            return json.loads(zlib.decompress(data).decode('utf-8'))
+        except Exception:
+            return None
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        """
+        Obtiene la clave asociada a una URL ya resuelta
+
+        Args:
+            url: URL original
+
+        Returns:
+            str: Clave o None si la URL no se ha visto
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT key FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, info: dict, url: Optional[str] = None) -> Optional[str]:
+        """
+        Guarda una entrada
+
+        Args:
+            info: Información serializable (ver YoutubeDL.sanitize_info)
+            url: URL original que produjo esta información (opcional)
+
+        Returns:
+            str: Clave usada o None si la información no tiene extractor/id
+        """
+        key = self.make_key(info)
+        if not key:
+            return None
+
+        try:
+            data = zlib.compress(json.dumps(info, ensure_ascii=False).encode('utf-8'))
+        except (TypeError, ValueError):
+            return None
+
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO media (key, info, size, has_formats, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), 1 if info.get('formats') else 0, now, now)
+            )
+            if url:
+                conn.execute("INSERT OR REPLACE INTO urls (url, key) VALUES (?, ?)", (url, key))
+            self._enforce_limits(conn)
+        return key
+
+    def strip_formats(self, key: str) -> bool:
+        """
+        Elimina los campos pesados (formatos) de una entrada que ya no los necesita
+
+        Args:
+            key: Clave "<extractor> <id>"
+
+        Returns:
+            bool: True si la entrada existía y se reescribió
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT info FROM media WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return False
+            try:
+                info = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+            except Exception:
+                conn.execute("DELETE FROM media WHERE key = ?", (key,))
+                return False
+
+            for field in HEAVY_FIELDS:
+                info.pop(field, None)
+            data = zlib.compress(json.dumps(info, ensure_ascii=False).encode('utf-8'))
+            conn.execute(
+                "UPDATE media SET info = ?, size = ?, has_formats = 0 WHERE key = ?",
+                (data, len(data), key)
+            )
+        return True
+
+    def delete(self, key: str):
+        """Elimina una entrada y sus URLs asociadas"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM media WHERE key = ?", (key,))
+            conn.execute("DELETE FROM urls WHERE key = ?", (key,))
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM media")
+            conn.execute("DELETE FROM urls")
+
+    def _enforce_limits(self, conn: sqlite3.Connection):
+        """Expulsa entradas caducadas y, si hace falta, las menos usadas (LRU)"""
+        conn.execute("DELETE FROM media WHERE created_at < ?", (time.time() - self.ttl,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM media").fetchone()[0]
+        if total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM media ORDER BY accessed_at ASC").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM media WHERE key = ?", (key,))
+                total -= size
+
+        conn.execute("DELETE FROM urls WHERE key NOT IN (SELECT key FROM media)")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """
+    Obtiene la caché compartida del proceso
+
+    Returns:
+        MetadataCache: Instancia única con la ruta predeterminada
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache()
+        return _default_cache
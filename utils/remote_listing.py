@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de listados y búsquedas de carpetas remotas para el explorador SSH
+"""
+
+import posixpath
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import SSH_BROWSER_CACHE_TTL, SSH_SEARCH_CACHE_TTL
+
+
+class RemoteListingCache:
+    """
+    Listados de carpetas remotas por servidor y ruta, con caducidad
+
+    La caché es del proceso: al volver a abrir el explorador, las carpetas
+    visitadas hace poco se muestran sin ir al servidor. El botón de
+    actualizar invalida la entrada de la carpeta actual.
+    """
+
+    def __init__(self, ttl: float = SSH_BROWSER_CACHE_TTL):
+        """
+        Inicializa la caché
+
+        Args:
+            ttl: Segundos que un listado se considera válido
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[tuple, str], Tuple[float, list]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def server_key(ssh_config: dict) -> tuple:
+        """Identifica el servidor y el usuario de una configuración SSH"""
+        return (ssh_config.get('host'), int(ssh_config.get('port', 22)), ssh_config.get('username'))
+
+    def get(self, server: tuple, path: str) -> Optional[list]:
+        """
+        Obtiene un listado si no ha caducado
+
+        Returns:
+            list: Entradas (dicts de SSHClient.list_directory_attr) o None
+        """
+        with self._lock:
+            cached = self._entries.get((server, path))
+            if not cached:
+                return None
+            stored_at, entries = cached
+            if time.time() - stored_at > self.ttl:
+                del self._entries[(server, path)]
+                return None
+            return entries
+
+    def put(self, server: tuple, path: str, entries: list):
+        """Guarda el listado de una carpeta"""
+        with self._lock:
+            self._entries[(server, path)] = (time.time(), entries)
+
+    def invalidate(self, server: tuple, path: Optional[str] = None):
+        """Descarta el listado de una carpeta, o todos los del servidor si path es None"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == server and (path is None or key[1] == path):
+                    del self._entries[key]
+
+
+class RemoteSearchCache:
+    """
+    Resultados completos de búsquedas por servidor, carpeta y texto
+
+    Una búsqueda que contiene el texto de otra ya guardada (p. ej. "seri"
+    y luego "series") se resuelve filtrando en local, sin ir al servidor.
+    """
+
+    def __init__(self, ttl: float = SSH_SEARCH_CACHE_TTL):
+        """
+        Inicializa la caché
+
+        Args:
+            ttl: Segundos que un resultado se considera válido
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[tuple, str, str], Tuple[float, list]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, server: tuple, root: str, pattern: str) -> Optional[list]:
+        """
+        Obtiene los resultados de una búsqueda (o los deduce de otra más amplia)
+
+        Returns:
+            list: Rutas encontradas, o None si hay que buscar en el servidor
+        """
+        needle = pattern.lower()
+        now = time.time()
+        with self._lock:
+            for key in list(self._entries):
+                if now - self._entries[key][0] > self.ttl:
+                    del self._entries[key]
+
+            exact = self._entries.get((server, root, needle))
+            if exact is not None:
+                return list(exact[1])
+
+            for (cached_server, cached_root, cached_pattern), (_, results) in self._entries.items():
+                if cached_server == server and cached_root == root and cached_pattern in needle:
+                    return [path for path in results if needle in posixpath.basename(path).lower()]
+        return None
+
+    def put(self, server: tuple, root: str, pattern: str, results: list):
+        """Guarda los resultados de una búsqueda que terminó sin cancelarse ni cortarse"""
+        with self._lock:
+            self._entries[(server, root, pattern.lower())] = (time.time(), list(results))
+
+    def invalidate(self, server: tuple):
+        """Descarta las búsquedas guardadas de un servidor"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == server:
+                    del self._entries[key]
+
+
+_default_cache = None
+_default_search_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_listing_cache() -> RemoteListingCache:
+    """
+    Obtiene la caché de listados compartida del proceso
+
+    Returns:
+        RemoteListingCache: Instancia única
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RemoteListingCache()
+        return _default_cache
+
+
+def get_search_cache() -> RemoteSearchCache:
+    """
+    Obtiene la caché de búsquedas compartida del proceso
+
+    Returns:
+        RemoteSearchCache: Instancia única
+    """
+    global _default_search_cache
+    with _default_cache_lock:
+        if _default_search_cache is None:
+            _default_search_cache = RemoteSearchCache()
+        return _default_search_cache
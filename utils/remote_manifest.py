@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice del contenido que ya está en una carpeta remota
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import (
+    REMOTE_MANIFEST_NAME, REMOTE_MANIFEST_TTL, SFTP_PART_SUFFIX
+)
+from utils.sftp_transfer import file_sha256
+
+
+MANIFEST_VERSION = 1
+
+
+class RemoteManifest:
+    """
+    Índice de una carpeta remota: nombre de archivo → tamaño, fecha,
+    clave del medio ("<extractor> <id>"), variante (extensión y selector de
+    formato con que se generó) y SHA-256
+
+    El índice se guarda como JSON en la propia carpeta remota (así lo
+    comparten todos los equipos que suben a ella) y se copia en local. Al
+    sincronizar se lista la carpeta con una sola petición: los archivos
+    nuevos o modificados por otros medios se añaden sin clave ni hash, y los
+    que ya no existen se quitan. El SHA-256 de un archivo sin hash solo se
+    calcula en el servidor cuando hace falta compararlo con otro del mismo
+    tamaño.
+
+    Los métodos reciben el SSHClient conectado que se esté usando, porque la
+    instancia se comparte entre trabajos que tienen cada uno su conexión.
+    """
+
+    def __init__(self, remote_folder: str, cache_file: Path):
+        """
+        Inicializa el índice
+
+        Args:
+            remote_folder: Carpeta remota que describe
+            cache_file: Copia local del índice
+        """
+        self.remote_folder = remote_folder
+        self.manifest_path = posixpath.join(remote_folder, REMOTE_MANIFEST_NAME)
+        self.cache_file = cache_file
+        self.entries: Dict[str, dict] = {}
+        self._remote_stamp = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def find_media(self, ssh_client, media_key: str, variant: dict) -> Optional[str]:
+        """
+        Busca un archivo con el contenido de un medio en la misma variante
+
+        Un MP3 no sirve para una petición de vídeo, ni un 360p para una de
+        1080p: la extensión y el selector de formato también deben coincidir.
+
+        Args:
+            ssh_client: SSHClient conectado al servidor
+            media_key: Clave "<extractor> <id>"
+            variant: {'ext', 'format'} (ver YouTubeDownloader.get_output_variant)
+
+        Returns:
+            str: Ruta remota del archivo, o None si no está
+        """
+        if not media_key or not variant:
+            return None
+        with self._lock:
+            self._sync_locked(ssh_client)
+            for name, entry in list(self.entries.items()):
+                if entry.get('media_key') != media_key:
+                    continue
+                if any(entry.get(field) != value for field, value in variant.items()):
+                    continue
+                path = posixpath.join(self.remote_folder, name)
+                # El listado puede tener hasta REMOTE_MANIFEST_TTL segundos
+                try:
+                    if ssh_client.sftp.stat(path).st_size == entry.get('size'):
+                        return path
+                except IOError:
+                    pass
+                del self.entries[name]
+                self._synced_at = 0.0
+        return None
+
+    def find_content(self, ssh_client, local_path: str) -> Optional[str]:
+        """
+        Busca un archivo remoto con el mismo contenido que uno local
+
+        Solo se calcula el SHA-256 (local y, si falta, remoto) cuando hay
+        algún archivo remoto del mismo tamaño.
+
+        Args:
+            ssh_client: SSHClient conectado al servidor
+            local_path: Ruta del archivo local
+
+        Returns:
+            str: Ruta remota del archivo idéntico, o None si no hay
+        """
+        size = os.path.getsize(local_path)
+        with self._lock:
+            self._sync_locked(ssh_client)
+            candidates = [name for name, entry in self.entries.items() if entry.get('size') == size]
+            if not candidates:
+                return None
+
+            local_digest = file_sha256(local_path)
+            found = None
+            changed = False
+            for name in candidates:
+                entry = self.entries[name]
+                if not entry.get('sha256'):
+                    remote_digest = ssh_client.remote_sha256(posixpath.join(self.remote_folder, name))
+                    if not remote_digest:
+                        continue
+                    entry['sha256'] = remote_digest
+                    changed = True
+                if entry['sha256'] == local_digest:
+                    found = posixpath.join(self.remote_folder, name)
+                    break
+
+            if changed:
+                self._write_locked(ssh_client)
+            return found
+
+    # ------------------------------------------------------------------
+    # Cambios
+    # ------------------------------------------------------------------
+
+    def record(self, ssh_client, remote_path: str, media_key: Optional[str] = None,
+               sha256: Optional[str] = None, variant: Optional[dict] = None):
+        """
+        Registra un archivo recién subido
+
+        Args:
+            ssh_client: SSHClient conectado al servidor
+            remote_path: Ruta remota del archivo (dentro de la carpeta del índice)
+            media_key: Clave "<extractor> <id>" del contenido
+            sha256: SHA-256 del archivo si se conoce
+            variant: {'ext', 'format'} con que se generó el archivo
+        """
+        name = posixpath.basename(remote_path)
+        attr = ssh_client.sftp.stat(remote_path)
+        with self._lock:
+            self._sync_locked(ssh_client)
+            self.entries[name] = {
+                'size': attr.st_size,
+                'mtime': int(attr.st_mtime or 0),
+                'media_key': media_key,
+                'sha256': sha256,
+            }
+            self.entries[name].update(variant or {})
+            self._write_locked(ssh_client)
+
+    def sync(self, ssh_client, force: bool = False):
+        """
+        Reconcilia el índice con el contenido actual de la carpeta remota
+
+        Args:
+            ssh_client: SSHClient conectado al servidor
+            force: Listar la carpeta aunque la última sincronización sea reciente
+        """
+        with self._lock:
+            self._sync_locked(ssh_client, force)
+
+    # ------------------------------------------------------------------
+    # Internos (requieren el lock)
+    # ------------------------------------------------------------------
+
+    def _sync_locked(self, ssh_client, force: bool = False):
+        """Lista la carpeta y actualiza el índice (reutiliza el resultado durante REMOTE_MANIFEST_TTL)"""
+        if not force and time.time() - self._synced_at < REMOTE_MANIFEST_TTL:
+            return
+
+        sftp = ssh_client.sftp
+        try:
+            listing = sftp.listdir_attr(self.remote_folder)
+        except IOError:
+            # La carpeta aún no existe: no hay nada subido
+            listing = []
+
+        files = {}
+        stamp = None
+        for attr in listing:
+            if attr.filename == REMOTE_MANIFEST_NAME:
+                stamp = [attr.st_size, int(attr.st_mtime or 0)]
+            elif attr.filename.startswith(REMOTE_MANIFEST_NAME) or attr.filename.endswith(SFTP_PART_SUFFIX):
+                # Temporal del índice o subida a medias
+                continue
+            elif attr.st_mode is not None and stat.S_ISREG(attr.st_mode):
+                files[attr.filename] = attr
+
+        # Otro equipo (u otro proceso) modificó el índice: partir de su versión
+        if stamp is not None and stamp != self._remote_stamp:
+            remote_entries = self._read_remote(sftp)
+            if remote_entries is not None:
+                self.entries = remote_entries
+            self._remote_stamp = stamp
+
+        changed = stamp is None and bool(files)
+        for name in list(self.entries):
+            if name not in files:
+                del self.entries[name]
+                changed = True
+
+        for name, attr in files.items():
+            entry = self.entries.get(name)
+            size, mtime = attr.st_size, int(attr.st_mtime or 0)
+            if entry and entry.get('size') == size and entry.get('mtime') == mtime:
+                continue
+            # Nuevo o modificado fuera de la aplicación: el hash ya no vale.
+            # La clave y la variante se conservan si el nombre y el tamaño no cambiaron.
+            kept = entry if entry and entry.get('size') == size else {}
+            self.entries[name] = {'size': size, 'mtime': mtime, 'media_key': kept.get('media_key'), 'sha256': None}
+            self.entries[name].update({k: kept[k] for k in ('ext', 'format') if k in kept})
+            changed = True
+
+        self._synced_at = time.time()
+        if changed:
+            self._write_locked(ssh_client)
+        else:
+            self._save_cache()
+
+    def _read_remote(self, sftp) -> Optional[Dict[str, dict]]:
+        """Lee el índice remoto; None si no existe o está dañado"""
+        try:
+            with sftp.open(self.manifest_path, 'r') as f:
+                data = json.loads(f.read().decode('utf-8'))
+            if data.get('version') != MANIFEST_VERSION:
+                return None
+            return dict(data.get('files', {}))
+        except (IOError, ValueError, AttributeError):
+            return None
+
+    def _write_locked(self, ssh_client):
+        """Escribe el índice remoto (en un temporal que luego se renombra) y la copia local"""
+        sftp = ssh_client.sftp
+        data = json.dumps(
+            {'version': MANIFEST_VERSION, 'files': self.entries},
+            ensure_ascii=False, indent=1, sort_keys=True
+        ).encode('utf-8')
+
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with sftp.open(temp_path, 'wb') as f:
+                f.write(data)
+            ssh_client.rename(temp_path, self.manifest_path)
+            attr = sftp.stat(self.manifest_path)
+            self._remote_stamp = [attr.st_size, int(attr.st_mtime or 0)]
+        except (IOError, OSError):
+            # Carpeta sin permisos de escritura: el índice queda solo en local
+            try:
+                sftp.remove(temp_path)
+            except Exception:
+                pass
+        self._save_cache()
+
+    def _load_cache(self):
+        """Carga la copia local del índice"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = dict(data.get('files', {}))
+                self._remote_stamp = data.get('remote_stamp')
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _save_cache(self):
+        """Guarda la copia local del índice"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cache_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': MANIFEST_VERSION,
+                    'remote_folder': self.remote_folder,
+                    'remote_stamp': self._remote_stamp,
+                    'files': self.entries,
+                }, f, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+_manifests: Dict[tuple, RemoteManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_remote_manifest(ssh_config: dict, remote_folder: Optional[str] = None) -> RemoteManifest:
+    """
+    Obtiene el índice compartido de una carpeta remota
+
+    Args:
+        ssh_config: Configuración SSH (host, port, username, remote_folder)
+        remote_folder: Carpeta a indexar (por defecto la de ssh_config)
+
+    Returns:
+        RemoteManifest: Instancia única por servidor, usuario y carpeta
+    """
+    folder = (remote_folder or ssh_config['remote_folder']).rstrip('/') or '/'
+    key = (ssh_config['host'], int(ssh_config.get('port', 22)), ssh_config['username'], folder)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            name = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+            cache_file = Path.home() / ".youtube_downloader" / "remote_manifests" / f"{name}.json"
+            manifest = RemoteManifest(folder, cache_file)
+            _manifests[key] = manifest
+        return manifest
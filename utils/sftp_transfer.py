@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de subida SFTP en tubería (varias escrituras en vuelo a la vez)
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, Optional, Tuple
+
+from paramiko.sftp import CMD_STATUS, CMD_WRITE, SFTPError, int64
+
+from config import (
+    SFTP_PACKET_SIZE, SFTP_MAX_IN_FLIGHT, SFTP_READ_BLOCK_SIZE, SFTP_VERIFY_BLOCK_SIZE
+)
+
+
+# Segundos mínimos entre dos llamadas al callback de progreso
+PROGRESS_INTERVAL = 0.25
+
+
+class UploadVerificationError(Exception):
+    """El contenido subido no coincide con el local (o no se pudo comprobar)"""
+
+
+class _WriteTracker:
+    """
+    Recibe las respuestas de escritura que llegan mientras se espera otra
+
+    paramiko entrega a este objeto las respuestas que no son la que se está
+    esperando; se guardan para no volver a esperarlas y para no perder errores.
+    """
+
+    def __init__(self, sftp):
+        self.sftp = sftp
+        self.done = set()
+        self.error = None
+
+    def _async_response(self, t, msg, num):
+        self.done.add(num)
+        if self.error is not None:
+            return
+        if t != CMD_STATUS:
+            self.error = SFTPError(f"Respuesta inesperada del servidor ({t})")
+            return
+        try:
+            self.sftp._convert_status(msg)
+        except Exception as e:
+            self.error = e
+
+
+class PipelinedUploader:
+    """
+    Sube archivos con escrituras SFTP en tubería
+
+    En vez de esperar la confirmación de cada escritura, mantiene hasta
+    max_in_flight peticiones sin confirmar, así que el rendimiento depende del
+    ancho de banda y no de la latencia. El archivo local se lee mediante mmap
+    (o por bloques grandes si no se puede mapear).
+    """
+
+    def __init__(self, sftp, packet_size: int = SFTP_PACKET_SIZE,
+                 max_in_flight: int = SFTP_MAX_IN_FLIGHT,
+                 read_block_size: int = SFTP_READ_BLOCK_SIZE):
+        """
+        Inicializa el motor
+
+        Args:
+            sftp: paramiko.SFTPClient (un canal; no compartirlo entre hilos durante la subida)
+            packet_size: Bytes por petición de escritura
+            max_in_flight: Peticiones sin confirmar como máximo
+            read_block_size: Bytes leídos del disco a la vez si no se puede usar mmap
+        """
+        self.sftp = sftp
+        self.packet_size = max(1024, int(packet_size))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.read_block_size = max(self.packet_size, int(read_block_size))
+
+    def upload(self, local_path: str, remote_path: str,
+               progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Sube un archivo completo
+
+        Args:
+            local_path: Ruta local del archivo
+            remote_path: Ruta remota donde guardar (se sobrescribe)
+            progress_callback: Función callback para progreso (bytes_transferred, total_bytes)
+
+        Returns:
+            int: Bytes escritos
+        """
+        total = os.path.getsize(local_path)
+        with self.sftp.open(remote_path, 'wb') as remote_file:
+            written = self.write_range(local_path, remote_file, 0, total, progress_callback)
+        return written
+
+    def write_range(self, local_path: str, remote_file, offset: int, length: int,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    hasher: Optional['BlockHasher'] = None) -> int:
+        """
+        Escribe un rango del archivo local en la misma posición del archivo remoto
+
+        Args:
+            local_path: Ruta local del archivo
+            remote_file: paramiko.SFTPFile abierto para escritura
+            offset: Posición inicial del rango
+            length: Bytes del rango
+            progress_callback: Función callback (bytes escritos del rango, length)
+            hasher: BlockHasher opcional que recibe los mismos bytes que se envían
+
+        Returns:
+            int: Bytes escritos
+
+        Raises:
+            IOError, SFTPError: si el servidor rechaza alguna escritura
+        """
+        sftp = self.sftp
+        handle = remote_file.handle
+        tracker = _WriteTracker(sftp)
+        outstanding = deque()
+        confirmed = 0
+        last_report = 0.0
+
+        def wait_oldest():
+            num, size = outstanding.popleft()
+            if num in tracker.done:
+                tracker.done.discard(num)
+            else:
+                # Lanza una excepción si el servidor devolvió un error
+                sftp._read_response(num)
+            if tracker.error is not None:
+                raise tracker.error
+            return size
+
+        try:
+            for position, data in self._iter_packets(local_path, offset, length):
+                if hasher is not None:
+                    hasher.update(position, data)
+                num = sftp._async_request(tracker, CMD_WRITE, handle, int64(position), data)
+                outstanding.append((num, len(data)))
+
+                while len(outstanding) >= self.max_in_flight:
+                    confirmed += wait_oldest()
+
+                now = time.time()
+                if progress_callback and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    progress_callback(confirmed, length)
+
+            while outstanding:
+                confirmed += wait_oldest()
+        finally:
+            # Si algo falla, recoger las respuestas pendientes para dejar el canal limpio
+            for num, _ in outstanding:
+                if num not in tracker.done:
+                    try:
+                        sftp._read_response(num)
+                    except Exception:
+                        pass
+
+        if progress_callback:
+            progress_callback(confirmed, length)
+        return confirmed
+
+    def _iter_packets(self, local_path: str, offset: int,
+                      length: int) -> Iterator[Tuple[int, bytes]]:
+        """Genera (posición, datos) en trozos de packet_size dentro del rango"""
+        end = offset + length
+        with open(local_path, 'rb') as f:
+            mapped = None
+            if length > 0:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    mapped = None
+
+            if mapped is not None:
+                try:
+                    if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    position = offset
+                    while position < end:
+                        stop = min(position + self.packet_size, end)
+                        yield position, mapped[position:stop]
+                        position = stop
+                finally:
+                    mapped.close()
+                return
+
+            # Sin mmap: leer bloques grandes y trocearlos
+            f.seek(offset)
+            position = offset
+            while position < end:
+                block = f.read(min(self.read_block_size, end - position))
+                if not block:
+                    raise IOError(f"El archivo local terminó antes de lo esperado: {local_path}")
+                view = memoryview(block)
+                for start in range(0, len(block), self.packet_size):
+                    chunk = bytes(view[start:start + self.packet_size])
+                    yield position, chunk
+                    position += len(chunk)
+
+
+def split_ranges(total: int, parts: int, align: int = 1) -> list:
+    """
+    Divide un tamaño en rangos contiguos de tamaño parecido
+
+    Args:
+        total: Bytes totales
+        parts: Número de rangos
+        align: Los límites entre rangos caen en múltiplos de este tamaño
+
+    Returns:
+        list: [(offset, length), ...] sin rangos vacíos
+    """
+    align = max(1, int(align))
+    units = -(-total // align)
+    parts = max(1, min(int(parts), units or 1))
+    base, extra = divmod(units, parts)
+    ranges = []
+    offset = 0
+    for index in range(parts):
+        end = min(total, offset + (base + (1 if index < extra else 0)) * align)
+        if end > offset:
+            ranges.append((offset, end - offset))
+        offset = end
+    return ranges
+
+
+class BlockHasher:
+    """
+    SHA-256 por bloques fijos, calculado con los mismos bytes que se envían
+
+    Cada bloque se puede comparar por separado con el del servidor, así que si
+    algo no coincide solo se vuelve a subir ese bloque. Mientras los datos
+    llegan en orden desde el byte 0 también se calcula el SHA-256 del archivo
+    completo. Bloques distintos se pueden alimentar desde hilos distintos; un
+    mismo bloque, desde uno solo.
+    """
+
+    def __init__(self, total: int, block_size: int = SFTP_VERIFY_BLOCK_SIZE):
+        """
+        Inicializa el calculador
+
+        Args:
+            total: Tamaño del archivo
+            block_size: Bytes por bloque verificado
+        """
+        self.total = total
+        self.block_size = max(1, int(block_size))
+        self.count = max(1, -(-total // self.block_size))
+        self._digests = {}
+        self._next = {}
+        self._broken = set()
+        self._full = hashlib.sha256()
+        self._full_next = 0
+        self._lock = threading.Lock()
+
+    def block_range(self, index: int) -> Tuple[int, int]:
+        """(offset, length) de un bloque"""
+        start = index * self.block_size
+        return start, min(self.block_size, self.total - start)
+
+    def update(self, position: int, data: bytes):
+        """Añade datos que empiezan en position"""
+        with self._lock:
+            if position == self._full_next and self._full is not None:
+                self._full.update(data)
+                self._full_next += len(data)
+            elif self._full is not None:
+                self._full = None
+
+        view = memoryview(data)
+        while view:
+            index = position // self.block_size
+            start, length = self.block_range(index)
+            take = min(len(view), start + length - position)
+            expected = self._next.get(index, start)
+            if position != expected:
+                # Hueco o salto (p. ej. al continuar una subida): se recalcula del disco
+                self._broken.add(index)
+            elif index not in self._broken:
+                self._digests.setdefault(index, hashlib.sha256()).update(view[:take])
+                self._next[index] = position + take
+            view = view[take:]
+            position += take
+
+    def reset(self, index: int):
+        """Descarta lo calculado para un bloque (antes de volver a enviarlo)"""
+        self._digests.pop(index, None)
+        self._next.pop(index, None)
+        self._broken.discard(index)
+        with self._lock:
+            self._full = None
+
+    def block_digests(self, local_path: str) -> list:
+        """
+        Resúmenes de todos los bloques
+
+        Los bloques que no se vieron completos se leen del disco (solo ocurre
+        al continuar una subida o en rangos no enviados).
+
+        Returns:
+            list: SHA-256 en hexadecimal de cada bloque, en orden
+        """
+        result = []
+        for index in range(self.count):
+            start, length = self.block_range(index)
+            complete = index not in self._broken and self._next.get(index) == start + length
+            if complete:
+                result.append(self._digests[index].hexdigest())
+            else:
+                result.append(file_sha256(local_path, start, length))
+        return result
+
+    def file_digest(self) -> Optional[str]:
+        """SHA-256 del archivo completo, o None si los datos no llegaron en orden"""
+        with self._lock:
+            if self._full is None or self._full_next != self.total:
+                return None
+            return self._full.hexdigest()
+
+
+def file_sha256(local_path: str, offset: int = 0, length: Optional[int] = None,
+                block_size: int = SFTP_READ_BLOCK_SIZE) -> str:
+    """
+    Calcula el SHA-256 de un archivo local (o de un tramo)
+
+    Returns:
+        str: Resumen en hexadecimal
+    """
+    digest = hashlib.sha256()
+    remaining = length
+    with open(local_path, 'rb') as f:
+        f.seek(offset)
+        while remaining is None or remaining > 0:
+            size = block_size if remaining is None else min(block_size, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
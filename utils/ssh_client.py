@@ -4,19 +4,50 @@
 Cliente SSH para transferencia de archivos a servidor remoto
 """
 
+import hashlib
 import os
+import posixpath
+import queue
+import shlex
+import socket
+import stat
+import threading
 import paramiko
 from pathlib import Path
 from typing import Optional, Tuple
 
+from config import (
+    SFTP_WINDOW_SIZE, SFTP_MAX_PACKET_SIZE, SFTP_PACKET_SIZE, SFTP_MAX_IN_FLIGHT,
+    SFTP_SEGMENT_THRESHOLD, SFTP_SEGMENTS, SFTP_SEGMENT_SEPARATE_SESSIONS,
+    SFTP_PART_SUFFIX, SFTP_RESUME_CHECK_BYTES,
+    SFTP_VERIFY_BLOCK_SIZE, SFTP_VERIFY_RETRIES, SFTP_REQUIRE_VERIFICATION,
+    SSH_SEARCH_MAX_DEPTH, SSH_SEARCH_WALK_WORKERS
+)
+from utils.sftp_transfer import (
+    BlockHasher, PipelinedUploader, UploadVerificationError, file_sha256, split_ranges
+)
+from utils.ssh_pool import SSHConnectionPool, get_ssh_pool
+
 
 class SSHClient:
-    """Cliente SSH para conexión y transferencia de archivos"""
+    """
+    Cliente SSH para conexión y transferencia de archivos
+    
+    La conexión se toma de un pool compartido: varios SSHClient hacia el
+    mismo servidor y usuario usan una sola sesión autenticada, cada uno con
+    su propio canal SFTP.
+    """
     
-    def __init__(self):
+    def __init__(self, pool: Optional[SSHConnectionPool] = None):
         self.client = None
         self.sftp = None
         self.ssh_config = None
+        self.session = None
+        self.pool = pool or get_ssh_pool()
+        # SHA-256 del último archivo subido, si se pudo calcular durante la subida
+        self.last_upload_sha256 = None
+        # Comandos remotos ejecutados (cada uno es al menos una ida y vuelta)
+        self.round_trips = 0
     
     def connect(self, host: str, port: int, username: str, 
                 password: Optional[str] = None, 
@@ -34,6 +65,9 @@ class SSHClient:
         Returns:
             tuple: (éxito: bool, mensaje: str)
         """
+        if self.session:
+            self.disconnect()
+        
         try:
             # Guardar configuración para uso posterior
             self.ssh_config = {
@@ -44,51 +78,27 @@ class SSHClient:
                 'key_file': key_file
             }
             
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            # Reutilizar la sesión autenticada del pool si ya hay una
+            self.session = self.pool.acquire(host, port, username, password, key_file)
+            self.client = self.session.client
             
-            # Intentar con clave privada primero
-            if key_file and os.path.exists(key_file):
-                try:
-                    self.client.connect(
-                        hostname=host,
-                        port=port,
-                        username=username,
-                        key_filename=key_file,
-                        timeout=10
-                    )
-                except Exception as e:
-                    # Si falla con clave, intentar con contraseña
-                    if password:
-                        self.client.connect(
-                            hostname=host,
-                            port=port,
-                            username=username,
-                            password=password,
-                            timeout=10
-                        )
-                    else:
-                        raise e
-            elif password:
-                # Conectar con contraseña
-                self.client.connect(
-                    hostname=host,
-                    port=port,
-                    username=username,
-                    password=password,
-                    timeout=10
-                )
-            else:
-                # Intentar con clave por defecto
-                self.client.connect(
-                    hostname=host,
-                    port=port,
-                    username=username,
-                    timeout=10
+            # Canal SFTP propio sobre la sesión compartida
+            try:
+                self.sftp = paramiko.SFTPClient.from_transport(
+                    self.client.get_transport(),
+                    window_size=SFTP_WINDOW_SIZE,
+                    max_packet_size=SFTP_MAX_PACKET_SIZE
                 )
-            
-            # Crear cliente SFTP
-            self.sftp = self.client.open_sftp()
+            except Exception:
+                # Si la sesión se ha caído se descarta; si no (p. ej. el servidor
+                # limita los canales), se devuelve para los demás usuarios
+                if self.session.is_active():
+                    self.pool.release(self.session)
+                else:
+                    self.pool.discard(self.session)
+                self.session = None
+                self.client = None
+                raise
             
             return True, "Conexión exitosa"
         
@@ -100,14 +110,98 @@ class SSHClient:
             return False, f"Error de conexión: {str(e)}"
     
     def disconnect(self):
-        """Cierra la conexión SSH"""
+        """Cierra el canal SFTP y devuelve la sesión al pool"""
         try:
             if self.sftp:
                 self.sftp.close()
-            if self.client:
-                self.client.close()
         except:
             pass
+        if self.session:
+            self.pool.release(self.session)
+        self.sftp = None
+        self.client = None
+        self.session = None
+    
+    def _exec(self, command: str):
+        """Ejecuta un comando remoto contándolo en round_trips"""
+        self.round_trips += 1
+        return self.client.exec_command(command)
+    
+    def preflight(self, remote_folder: str, create: bool = True,
+                  refresh: bool = False) -> Optional[dict]:
+        """
+        Comprueba una carpeta remota con un único comando
+        
+        En una sola respuesta se obtiene si existe (creándola si hace falta),
+        si se puede escribir, el espacio libre, el directorio home y si hay
+        sha256sum. Las carpetas que resultan utilizables se recuerdan en la
+        sesión del pool, así que los siguientes trabajos no repiten el comando
+        mientras la sesión siga abierta.
+        
+        Args:
+            remote_folder: Carpeta a comprobar
+            create: Crearla (mkdir -p) si no existe
+            refresh: Ignorar el resultado guardado en la sesión
+            
+        Returns:
+            dict: home, exists, writable, created, free_bytes (o None) y
+                sha256sum; None si no se pudo ejecutar el comando
+        """
+        if not self.client:
+            return None
+        
+        cache = self.session.preflight if self.session else {}
+        if not refresh and remote_folder in cache:
+            return dict(cache[remote_folder])
+        
+        command = (
+            f"d={shlex.quote(remote_folder)}; c=0; "
+            f"if [ ! -d \"$d\" ] && [ {1 if create else 0} = 1 ]; then mkdir -p \"$d\" 2>/dev/null && c=1; fi; "
+            "printf 'home=%s\\n' \"$HOME\"; "
+            "[ -d \"$d\" ] && echo exists=1 || echo exists=0; "
+            "[ -w \"$d\" ] && echo writable=1 || echo writable=0; "
+            "echo created=$c; "
+            "df -Pk \"$d\" 2>/dev/null | awk 'NR==2 {print \"free_kb=\" $4}'; "
+            "command -v sha256sum >/dev/null 2>&1 && echo sha256sum=1 || echo sha256sum=0"
+        )
+        try:
+            stdin, stdout, stderr = self._exec(command)
+            output = stdout.read().decode(errors='replace')
+        except Exception:
+            return None
+        
+        values = dict(line.split('=', 1) for line in output.splitlines() if '=' in line)
+        free_kb = values.get('free_kb', '').strip()
+        result = {
+            'home': values.get('home', '').strip(),
+            'exists': values.get('exists') == '1',
+            'writable': values.get('writable') == '1',
+            'created': values.get('created') == '1',
+            'free_bytes': int(free_kb) * 1024 if free_kb.isdigit() else None,
+            'sha256sum': values.get('sha256sum') == '1',
+        }
+        if result['exists'] and result['writable']:
+            # 'created' solo vale para la primera comprobación
+            cache[remote_folder] = dict(result, created=False)
+        return result
+    
+    def ensure_directory(self, remote_path: str) -> Tuple[bool, str]:
+        """
+        Se asegura de que una carpeta remota existe y se puede escribir
+        
+        Usa preflight, así que si la sesión ya la comprobó no hay ida y vuelta.
+        
+        Returns:
+            tuple: (éxito: bool, mensaje: str)
+        """
+        result = self.preflight(remote_path)
+        if result is None:
+            return self.create_directory(remote_path)
+        if not result['exists']:
+            return False, f"No se pudo crear la carpeta remota: {remote_path}"
+        if not result['writable']:
+            return False, f"La carpeta remota no tiene permisos de escritura: {remote_path}"
+        return True, "Carpeta remota lista"
     
     def test_connection(self) -> Tuple[bool, str]:
         """
@@ -120,7 +214,7 @@ class SSHClient:
             return False, "No hay conexión establecida"
         
         try:
-            stdin, stdout, stderr = self.client.exec_command('echo "test"')
+            stdin, stdout, stderr = self._exec('echo "test"')
             stdout.channel.recv_exit_status()
             return True, "Conexión activa"
         except Exception as e:
@@ -147,6 +241,169 @@ class SSHClient:
         except Exception as e:
             return False, [], f"Error al listar directorio: {str(e)}"
     
+    def list_directory_attr(self, remote_path: str) -> Tuple[bool, list, str]:
+        """
+        Lista un directorio remoto con sus atributos en una sola petición
+        
+        Los enlaces simbólicos se resuelven con un stat adicional cada uno
+        para saber si apuntan a un directorio.
+        
+        Args:
+            remote_path: Ruta del directorio remoto
+            
+        Returns:
+            tuple: (éxito: bool, entradas: list, mensaje: str). Cada entrada es
+                un dict con name, is_dir, size y mtime.
+        """
+        if not self.sftp:
+            return False, [], "No hay conexión SFTP establecida"
+        
+        try:
+            entries = []
+            for attr in self.sftp.listdir_attr(remote_path):
+                mode = attr.st_mode or 0
+                if stat.S_ISLNK(mode):
+                    try:
+                        mode = self.sftp.stat(posixpath.join(remote_path, attr.filename)).st_mode or 0
+                    except (IOError, OSError):
+                        pass  # Enlace roto: se muestra como archivo
+                entries.append({
+                    'name': attr.filename,
+                    'is_dir': stat.S_ISDIR(mode),
+                    'size': attr.st_size,
+                    'mtime': attr.st_mtime,
+                })
+            return True, entries, "Directorio listado correctamente"
+        except FileNotFoundError:
+            return False, [], f"El directorio '{remote_path}' no existe"
+        except Exception as e:
+            return False, [], f"Error al listar directorio: {str(e)}"
+    
+    def find_directories(self, root: str, pattern: str,
+                         max_depth: int = SSH_SEARCH_MAX_DEPTH,
+                         cancel_event: Optional[threading.Event] = None):
+        """
+        Busca carpetas cuyo nombre contiene un texto, devolviéndolas a medida que aparecen
+        
+        Usa un único find remoto cuya salida se lee por trozos. Si el servidor
+        no tiene find, recorre el árbol por SFTP con varios canales a la vez.
+        
+        Args:
+            root: Carpeta desde la que buscar
+            pattern: Texto a buscar en el nombre (sin distinguir mayúsculas)
+            max_depth: Niveles bajo root en los que buscar
+            cancel_event: threading.Event opcional para detener la búsqueda
+            
+        Yields:
+            str: Ruta de cada carpeta encontrada
+        """
+        if not self.client:
+            return
+        
+        stop = cancel_event or threading.Event()
+        command = (
+            f"command -v find >/dev/null 2>&1 || exit 127; "
+            f"find {shlex.quote(root)} -mindepth 1 -maxdepth {int(max_depth)} -type d "
+            f"-iname {shlex.quote('*' + pattern + '*')} 2>/dev/null; exit 0"
+        )
+        channel = self.client.get_transport().open_session()
+        try:
+            # Timeout corto para poder comprobar la cancelación mientras find no escribe
+            channel.settimeout(0.5)
+            channel.exec_command(command)
+            self.round_trips += 1
+            pending = b""
+            while True:
+                if stop.is_set():
+                    return
+                try:
+                    data = channel.recv(65536)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                pending += data
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if line:
+                        yield line.decode(errors='replace')
+            if pending:
+                yield pending.decode(errors='replace')
+            status = channel.recv_exit_status()
+        finally:
+            channel.close()
+        
+        if status == 127:
+            yield from self._walk_directories(root, pattern, max_depth, stop)
+    
+    def _walk_directories(self, root: str, pattern: str, max_depth: int,
+                          stop: threading.Event, workers: int = SSH_SEARCH_WALK_WORKERS):
+        """Búsqueda por SFTP (sin find): cada hilo lista carpetas con su propio canal"""
+        transport = self.client.get_transport()
+        needle = pattern.lower()
+        directories = queue.Queue()
+        directories.put((root, 0))
+        found = queue.Queue()
+        finished = object()
+        state = {'pending': 1}
+        lock = threading.Lock()
+        # Detiene los hilos al terminar o si quien consume deja de leer
+        halt = threading.Event()
+        
+        def worker():
+            sftp = None
+            try:
+                sftp = paramiko.SFTPClient.from_transport(transport)
+                while not (stop.is_set() or halt.is_set()):
+                    try:
+                        path, depth = directories.get(timeout=0.2)
+                    except queue.Empty:
+                        with lock:
+                            if state['pending'] == 0:
+                                return
+                        continue
+                    try:
+                        for attr in sftp.listdir_attr(path):
+                            if not stat.S_ISDIR(attr.st_mode or 0):
+                                continue
+                            child = posixpath.join(path, attr.filename)
+                            if needle in attr.filename.lower():
+                                found.put(child)
+                            if depth + 1 < max_depth:
+                                with lock:
+                                    state['pending'] += 1
+                                directories.put((child, depth + 1))
+                    except (IOError, OSError):
+                        pass  # Sin permiso para listar: se sigue con el resto
+                    finally:
+                        with lock:
+                            state['pending'] -= 1
+            except Exception:
+                pass
+            finally:
+                if sftp:
+                    sftp.close()
+                found.put(finished)
+        
+        threads = [threading.Thread(target=worker, name="ssh-search-walk", daemon=True)
+                   for _ in range(max(1, workers))]
+        for thread in threads:
+            thread.start()
+        
+        running = len(threads)
+        try:
+            while running and not stop.is_set():
+                try:
+                    item = found.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if item is finished:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            halt.set()
+    
     def create_directory(self, remote_path: str) -> Tuple[bool, str]:
         """
         Crea un directorio en el servidor remoto
@@ -162,7 +419,7 @@ class SSHClient:
         
         try:
             # Crear directorio recursivamente
-            stdin, stdout, stderr = self.client.exec_command(f'mkdir -p "{remote_path}"')
+            stdin, stdout, stderr = self._exec(f'mkdir -p "{remote_path}"')
             exit_status = stdout.channel.recv_exit_status()
             
             if exit_status == 0:
@@ -176,7 +433,7 @@ class SSHClient:
     def upload_file(self, local_path: str, remote_path: str, 
                    progress_callback=None) -> Tuple[bool, str]:
         """
-        Sube un archivo al servidor remoto usando SFTP optimizado
+        Sube un archivo al servidor remoto con escrituras SFTP en tubería
         
         Args:
             local_path: Ruta local del archivo
@@ -189,6 +446,7 @@ class SSHClient:
         if not self.sftp:
             return False, "No hay conexión SFTP establecida"
         
+        self.last_upload_sha256 = None
         try:
             # Verificar que el archivo local existe
             if not os.path.exists(local_path):
@@ -196,10 +454,21 @@ class SSHClient:
             
             file_size = os.path.getsize(local_path)
             
-            # Crear directorio remoto si no existe
+            # Crear directorio remoto si no existe (sin ida y vuelta si la sesión ya lo comprobó)
             remote_dir = os.path.dirname(remote_path)
             if remote_dir:
-                self.create_directory(remote_dir)
+                self.ensure_directory(remote_dir)
+            
+            # Archivos grandes: varios rangos a la vez, cada uno por su conexión
+            # (salvo que haya una subida anterior a medias que se pueda continuar)
+            if file_size >= SFTP_SEGMENT_THRESHOLD and SFTP_SEGMENTS > 1 \
+                    and not self._remote_size(remote_path + SFTP_PART_SUFFIX):
+                segmented_success, segmented_msg = self.upload_file_segmented(
+                    local_path, remote_path, progress_callback
+                )
+                if segmented_success:
+                    return True, segmented_msg
+                # Si falla, se reintenta con un solo canal
             
             # Usar SFTP con transferencia optimizada
             try:
@@ -207,27 +476,29 @@ class SSHClient:
                 channel = self.sftp.get_channel()
                 if channel:
                     channel.settimeout(600)  # 10 minutos
-                    # Aumentar tamaño de buffer para mejor rendimiento
-                    channel.set_combine_stderr(True)
                 
-                # Subir archivo directamente
-                # Paramiko SFTP es confiable para archivos grandes
-                # Nota: Paramiko no soporta callback en put(), así que subimos directamente
-                self.sftp.put(local_path, remote_path)
+                # Escribe en <nombre>.part (continuando lo que ya hubiera) y renombra al terminar
+                resumed_from, verify_msg = self._upload_resumable(local_path, remote_path, progress_callback)
+                resumed_msg = f", continuando desde {resumed_from / 1024 / 1024:.2f} MB" if resumed_from else ""
                 
                 # Verificar que el archivo se subió correctamente
                 try:
                     remote_stat = self.sftp.stat(remote_path)
                     if remote_stat.st_size == file_size:
-                        return True, f"Archivo subido correctamente ({file_size / 1024 / 1024:.2f} MB)"
+                        return True, f"Archivo subido correctamente ({file_size / 1024 / 1024:.2f} MB{resumed_msg}, {verify_msg})"
                     else:
                         return False, f"Error: El archivo remoto tiene un tamaño diferente ({remote_stat.st_size} vs {file_size} bytes)"
-                except:
-                    # Si no se puede verificar, asumir que se subió correctamente
-                    return True, "Archivo subido correctamente"
+                except (IOError, OSError) as e:
+                    return False, f"No se pudo comprobar el archivo subido: {str(e)}"
             
+            except UploadVerificationError as e:
+                return False, str(e)
             except Exception as sftp_error:
                 error_msg = str(sftp_error)
+                # Si ya hay parte subida, no empezar de cero con scp: el
+                # siguiente intento continuará desde el .part
+                if self._remote_size(remote_path + SFTP_PART_SUFFIX):
+                    return False, f"Subida interrumpida (se podrá continuar): {error_msg}"
                 # Si SFTP falla, intentar con scp como fallback
                 try:
                     import subprocess
@@ -286,6 +557,433 @@ class SSHClient:
         except Exception as e:
             return False, f"Error al subir archivo: {str(e)}"
     
+    def _upload_resumable(self, local_path: str, remote_path: str,
+                          progress_callback=None) -> Tuple[int, str]:
+        """
+        Sube un archivo a <remote_path>.part, continuando si ya existe, lo
+        verifica y lo renombra
+        
+        Returns:
+            tuple: (posición desde la que se continuó, mensaje de verificación)
+        """
+        part_path = remote_path + SFTP_PART_SUFFIX
+        file_size = os.path.getsize(local_path)
+        offset = self._resume_offset(local_path, part_path, file_size)
+        
+        def on_progress(done, _length):
+            if progress_callback:
+                progress_callback(offset + done, file_size)
+        
+        # 'r+b' conserva lo ya escrito; 'wb' empieza de cero
+        hasher = BlockHasher(file_size)
+        with self.sftp.open(part_path, 'r+b' if offset else 'wb') as remote_file:
+            PipelinedUploader(self.sftp).write_range(
+                local_path, remote_file, offset, file_size - offset, on_progress, hasher
+            )
+            if offset:
+                # El .part podía ser más largo que el punto de continuación
+                remote_file.truncate(file_size)
+        
+        part_size = self._remote_size(part_path)
+        if part_size != file_size:
+            raise Exception(f"El archivo parcial tiene un tamaño diferente ({part_size} vs {file_size} bytes)")
+        
+        verify_msg = self._verify_upload(local_path, part_path, hasher)
+        self.rename(part_path, remote_path)
+        # Al continuar una subida el hash completo no se vio en orden: se lee del disco
+        self.last_upload_sha256 = hasher.file_digest() or file_sha256(local_path)
+        return offset, verify_msg
+    
+    def _verify_upload(self, local_path: str, part_path: str, hasher: BlockHasher) -> str:
+        """
+        Compara el SHA-256 del archivo remoto con el calculado durante la subida
+        
+        Si no coincide, se comparan los bloques y se reenvían solo los que
+        difieren (hasta SFTP_VERIFY_RETRIES veces). Si aun así no coincide, el
+        .part se borra para que el siguiente intento empiece de cero.
+        
+        Returns:
+            str: Descripción de la verificación
+            
+        Raises:
+            UploadVerificationError: si no coincide o no se pudo comprobar
+                (y SFTP_REQUIRE_VERIFICATION está activo)
+        """
+        # Caso normal: un único sha256sum del archivo completo
+        full_digest = hasher.file_digest()
+        if full_digest:
+            remote_digest = self.remote_sha256(part_path)
+            if remote_digest == full_digest:
+                return "SHA-256 verificado"
+        
+        local_digests = hasher.block_digests(local_path)
+        pending = list(range(hasher.count))
+        resent = 0
+        for attempt in range(SFTP_VERIFY_RETRIES + 1):
+            remote_digests = self._remote_block_digests(part_path, hasher, pending)
+            if remote_digests is None:
+                if SFTP_REQUIRE_VERIFICATION:
+                    raise UploadVerificationError(
+                        "No se pudo verificar la subida: el servidor no tiene sha256sum"
+                    )
+                return "sin verificar SHA-256"
+            
+            pending = [i for i in pending if remote_digests.get(i) != local_digests[i]]
+            if not pending:
+                if resent:
+                    return f"SHA-256 verificado tras reenviar {resent} bloque(s)"
+                return "SHA-256 verificado"
+            if attempt == SFTP_VERIFY_RETRIES:
+                break
+            
+            # Reenviar solo los bloques que no coinciden
+            with self.sftp.open(part_path, 'r+b') as remote_file:
+                uploader = PipelinedUploader(self.sftp)
+                for index in pending:
+                    start, length = hasher.block_range(index)
+                    uploader.write_range(local_path, remote_file, start, length)
+            resent += len(pending)
+        
+        try:
+            self.sftp.remove(part_path)
+        except Exception:
+            pass
+        raise UploadVerificationError(
+            f"El SHA-256 del archivo remoto no coincide en {len(pending)} bloque(s)"
+        )
+    
+    def _remote_block_digests(self, remote_path: str, hasher: BlockHasher,
+                              indexes: list) -> Optional[dict]:
+        """
+        SHA-256 de varios bloques de un archivo remoto, con una sola ejecución
+        
+        Returns:
+            dict: {índice: hash} o None si el servidor no puede calcularlo
+        """
+        if not indexes:
+            return {}
+        
+        quoted = shlex.quote(remote_path)
+        commands = []
+        for index in indexes:
+            start, length = hasher.block_range(index)
+            commands.append(f"tail -c +{start + 1} {quoted} | head -c {length} | sha256sum")
+        
+        try:
+            stdin, stdout, stderr = self._exec(" && ".join(commands))
+            lines = stdout.read().decode(errors='replace').split('\n')
+            if stdout.channel.recv_exit_status() != 0:
+                return None
+        except Exception:
+            return None
+        
+        digests = [line.split()[0].lower() for line in lines if line.strip()]
+        if len(digests) != len(indexes):
+            return None
+        return dict(zip(indexes, digests))
+    
+    def _resume_offset(self, local_path: str, part_path: str, file_size: int) -> int:
+        """
+        Calcula desde dónde continuar una subida interrumpida
+        
+        Las escrituras van en tubería, así que si la conexión se cortó puede
+        haber huecos en el último tramo sin confirmar. Por eso se retrocede lo
+        que cabe en vuelo y se compara el hash del tramo anterior con el local.
+        
+        Returns:
+            int: Posición segura para continuar, o 0 si hay que empezar de cero
+        """
+        part_size = self._remote_size(part_path)
+        if not part_size or part_size > file_size:
+            return 0
+        
+        offset = max(0, part_size - SFTP_PACKET_SIZE * SFTP_MAX_IN_FLIGHT)
+        check = min(SFTP_RESUME_CHECK_BYTES, offset)
+        if not check:
+            return 0
+        
+        start = offset - check
+        with open(local_path, 'rb') as f:
+            f.seek(start)
+            local_hash = hashlib.sha256(f.read(check)).hexdigest()
+        
+        if self._remote_range_sha256(part_path, start, check) != local_hash:
+            return 0
+        return offset
+    
+    def _remote_range_sha256(self, remote_path: str, start: int, length: int) -> Optional[str]:
+        """SHA-256 de un tramo de un archivo remoto (en el servidor, o leyéndolo por SFTP)"""
+        try:
+            stdin, stdout, stderr = self._exec(
+                f"tail -c +{int(start) + 1} {shlex.quote(remote_path)} | head -c {int(length)} | sha256sum"
+            )
+            output = stdout.read().decode(errors='replace').strip()
+            if stdout.channel.recv_exit_status() == 0 and output:
+                return output.split()[0].lower()
+        except Exception:
+            pass
+        
+        try:
+            with self.sftp.open(remote_path, 'rb') as remote_file:
+                remote_file.seek(start)
+                remote_file.prefetch(start + length)
+                return hashlib.sha256(remote_file.read(length)).hexdigest()
+        except Exception:
+            return None
+    
+    def _remote_size(self, remote_path: str) -> Optional[int]:
+        """Tamaño de un archivo remoto, o None si no existe"""
+        try:
+            return self.sftp.stat(remote_path).st_size
+        except Exception:
+            return None
+    
+    def rename(self, source: str, target: str):
+        """Renombra un archivo remoto sustituyendo el destino de forma atómica si se puede"""
+        try:
+            self.sftp.posix_rename(source, target)
+        except (IOError, OSError):
+            # Servidores sin la extensión posix-rename: borrar el destino y renombrar
+            try:
+                self.sftp.remove(target)
+            except IOError:
+                pass
+            self.sftp.rename(source, target)
+    
+    def upload_file_segmented(self, local_path: str, remote_path: str,
+                              progress_callback=None,
+                              segments: int = SFTP_SEGMENTS) -> Tuple[bool, str]:
+        """
+        Sube un archivo grande dividiéndolo en rangos que se escriben a la vez
+        
+        El archivo remoto se reserva con su tamaño final y cada rango se escribe
+        en su posición por un canal SFTP propio (en conexiones distintas si
+        SFTP_SEGMENT_SEPARATE_SESSIONS). Al final se comprueban el tamaño y el
+        SHA-256 de cada bloque, calculado mientras se enviaba.
+        
+        Args:
+            local_path: Ruta local del archivo
+            remote_path: Ruta remota donde guardar
+            progress_callback: Función callback para progreso (bytes_transferred, total_bytes)
+            segments: Número de rangos simultáneos
+            
+        Returns:
+            tuple: (éxito: bool, mensaje: str)
+        """
+        if not self.sftp:
+            return False, "No hay conexión SFTP establecida"
+        
+        self.last_upload_sha256 = None
+        file_size = os.path.getsize(local_path)
+        part_path = remote_path + SFTP_PART_SUFFIX
+        progress_lock = threading.Lock()
+        errors = []
+        
+        try:
+            # Reservar el archivo remoto con su tamaño final
+            with self.sftp.open(part_path, 'wb') as remote_file:
+                if not self._preallocate(part_path, file_size):
+                    remote_file.truncate(file_size)
+            
+            def report(index, done, _length):
+                if not progress_callback:
+                    return
+                with progress_lock:
+                    progress[index] = done
+                    transferred = sum(progress)
+                progress_callback(transferred, file_size)
+            
+            def upload_range(index, offset, length, sftp):
+                try:
+                    with sftp.open(part_path, 'r+b') as remote_file:
+                        PipelinedUploader(sftp).write_range(
+                            local_path, remote_file, offset, length,
+                            lambda done, total: report(index, done, total), hasher
+                        )
+                except Exception as e:
+                    errors.append(f"rango {index + 1}: {str(e)}")
+            
+            # Un rango por canal abierto (si el servidor limita las conexiones, menos rangos)
+            channels = self._open_segment_channels(segments)
+            # Los límites coinciden con los bloques verificados: cada bloque lo calcula un solo hilo
+            ranges = split_ranges(file_size, len(channels), align=SFTP_VERIFY_BLOCK_SIZE)
+            hasher = BlockHasher(file_size)
+            progress = [0] * len(ranges)
+            try:
+                threads = []
+                for index, ((offset, length), (session, sftp)) in enumerate(zip(ranges, channels)):
+                    thread = threading.Thread(
+                        target=upload_range, args=(index, offset, length, sftp),
+                        name=f"sftp-segment-{index + 1}", daemon=True
+                    )
+                    threads.append(thread)
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                self._close_segment_channels(channels)
+            
+            if errors:
+                raise Exception("; ".join(errors))
+            
+            # Verificar tamaño y contenido
+            remote_size = self.sftp.stat(part_path).st_size
+            if remote_size != file_size:
+                raise Exception(f"El archivo remoto tiene un tamaño diferente ({remote_size} vs {file_size} bytes)")
+            
+            # Bloques comparados con sha256sum; solo se reenvían los que no coinciden
+            verify_msg = self._verify_upload(local_path, part_path, hasher)
+            
+            self.rename(part_path, remote_path)
+            # Los rangos llegan desordenados: el SHA-256 completo (para el índice
+            # remoto) se calcula del archivo local, ya en la caché del sistema
+            self.last_upload_sha256 = hasher.file_digest() or file_sha256(local_path)
+            return True, (f"Archivo subido correctamente en {len(ranges)} rangos "
+                          f"({file_size / 1024 / 1024:.2f} MB, {verify_msg})")
+        
+        except Exception as e:
+            # Un .part segmentado puede tener huecos en cualquier rango: no se reanuda
+            try:
+                self.sftp.remove(part_path)
+            except Exception:
+                pass
+            return False, f"Error en la subida segmentada: {str(e)}"
+    
+    def _open_segment_channels(self, count: int) -> list:
+        """
+        Abre un canal SFTP por rango
+        
+        El primero es el canal de este cliente; los demás van por otras
+        sesiones del pool (o por la misma si SFTP_SEGMENT_SEPARATE_SESSIONS es False).
+        
+        Returns:
+            list: [(sesión prestada o None, SFTPClient), ...]
+        """
+        channels = [(None, self.sftp)]
+        used_sessions = [self.session]
+        try:
+            for _ in range(count - 1):
+                if SFTP_SEGMENT_SEPARATE_SESSIONS and self.ssh_config:
+                    session = self.pool.acquire(
+                        self.ssh_config['host'], self.ssh_config['port'],
+                        self.ssh_config['username'], self.ssh_config.get('password'),
+                        self.ssh_config.get('key_file'), exclude=used_sessions
+                    )
+                    used_sessions.append(session)
+                    transport = session.transport
+                else:
+                    session = None
+                    transport = self.client.get_transport()
+                sftp = paramiko.SFTPClient.from_transport(
+                    transport, window_size=SFTP_WINDOW_SIZE, max_packet_size=SFTP_MAX_PACKET_SIZE
+                )
+                channels.append((session, sftp))
+        except Exception:
+            # Con menos canales también se puede: se usan los que se abrieron
+            pass
+        return channels
+    
+    def _close_segment_channels(self, channels: list):
+        """Cierra los canales extra abiertos por _open_segment_channels"""
+        for session, sftp in channels[1:]:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+            if session:
+                self.pool.release(session)
+    
+    def _preallocate(self, remote_path: str, size: int) -> bool:
+        """
+        Reserva espacio en disco para el archivo remoto (fallocate)
+        
+        Returns:
+            bool: True si se reservó; False si no está disponible
+        """
+        try:
+            stdin, stdout, stderr = self._exec(
+                f"fallocate -l {int(size)} {shlex.quote(remote_path)}"
+            )
+            return stdout.channel.recv_exit_status() == 0
+        except Exception:
+            return False
+    
+    def remote_sha256(self, remote_path: str) -> Optional[str]:
+        """
+        Calcula el SHA-256 de un archivo en el servidor
+        
+        Args:
+            remote_path: Ruta del archivo remoto
+            
+        Returns:
+            str: Resumen en hexadecimal, o None si el servidor no tiene sha256sum
+        """
+        if not self.client:
+            return None
+        
+        try:
+            stdin, stdout, stderr = self._exec(f"sha256sum {shlex.quote(remote_path)}")
+            output = stdout.read().decode(errors='replace').strip()
+            if stdout.channel.recv_exit_status() != 0 or not output:
+                return None
+            return output.split()[0].lower()
+        except Exception:
+            return None
+    
+    def upload_stream(self, chunks, remote_path: str, total_bytes: Optional[int] = None,
+                      progress_callback=None) -> Tuple[bool, str]:
+        """
+        Escribe en un archivo remoto los bloques de un iterable, a medida que llegan
+        
+        Args:
+            chunks: Iterable de bloques de bytes (p. ej. MediaStreamer.iter_chunks)
+            remote_path: Ruta remota donde guardar
+            total_bytes: Tamaño esperado si se conoce (solo para el progreso)
+            progress_callback: Función callback para progreso (bytes_transferred, total_bytes)
+            
+        Returns:
+            tuple: (éxito: bool, mensaje: str)
+        """
+        if not self.sftp:
+            return False, "No hay conexión SFTP establecida"
+        
+        self.last_upload_sha256 = None
+        transferred = 0
+        digest = hashlib.sha256()
+        part_path = remote_path + SFTP_PART_SUFFIX
+        try:
+            with self.sftp.open(part_path, 'wb') as remote_file:
+                # Escrituras en tubería: no se espera la confirmación de cada paquete
+                remote_file.set_pipelined(True)
+                for chunk in chunks:
+                    remote_file.write(chunk)
+                    digest.update(chunk)
+                    transferred += len(chunk)
+                    if progress_callback:
+                        progress_callback(transferred, total_bytes)
+            
+            if transferred == 0:
+                raise Exception("No se recibió ningún dato")
+            
+            # Hash calculado con los mismos bytes que se enviaron
+            remote_digest = self.remote_sha256(part_path)
+            if remote_digest is None and SFTP_REQUIRE_VERIFICATION:
+                raise Exception("No se pudo verificar la subida: el servidor no tiene sha256sum")
+            if remote_digest is not None and remote_digest != digest.hexdigest():
+                raise Exception("El SHA-256 del archivo remoto no coincide con el transmitido")
+            
+            self.rename(part_path, remote_path)
+            self.last_upload_sha256 = digest.hexdigest()
+            return True, f"Archivo transmitido correctamente ({transferred / 1024 / 1024:.2f} MB)"
+        
+        except Exception as e:
+            # No dejar un archivo remoto a medias
+            try:
+                self.sftp.remove(part_path)
+            except Exception:
+                pass
+            return False, f"Error al transmitir archivo: {str(e)}"
+    
     def file_exists(self, remote_path: str) -> bool:
         """
         Verifica si un archivo existe en el servidor remoto
@@ -319,7 +1017,7 @@ class SSHClient:
             return None
         
         try:
-            stat = self.sftp.stat(remote_path)
-            return stat.st_size
+            file_stat = self.sftp.stat(remote_path)
+            return file_stat.st_size
         except:
             return None
@@ -42,37 +42,37 @@ def test_ssh_upload(host, port, username, password, key_file, remote_folder, tes
     else:
         print(f"⚠️ {test_msg}")
     
-    # Verificar carpeta remota
+    # Verificar carpeta remota, permisos y espacio (un solo comando remoto)
     print(f"\n3. Verificando carpeta remota: {remote_folder}")
-    stdin, stdout, stderr = ssh_client.client.exec_command(f'test -d "{remote_folder}" && echo "EXISTS" || echo "NOT_EXISTS"')
-    folder_exists = stdout.read().decode().strip()
+    preflight = ssh_client.preflight(remote_folder)
     
-    if folder_exists == "EXISTS":
-        print("✅ La carpeta existe")
-        
-        # Verificar permisos de escritura
-        stdin, stdout, stderr = ssh_client.client.exec_command(f'test -w "{remote_folder}" && echo "WRITABLE" || echo "NOT_WRITABLE"')
-        is_writable = stdout.read().decode().strip()
-        
-        if is_writable == "WRITABLE":
-            print("✅ La carpeta tiene permisos de escritura")
-        else:
-            print("❌ La carpeta NO tiene permisos de escritura")
-            print("   Solución: chmod 755 en el servidor")
+    if preflight is None:
+        print("❌ No se pudo comprobar la carpeta remota")
     else:
-        print("❌ La carpeta NO existe")
-        print(f"   Intentando crear: {remote_folder}")
-        create_success, create_msg = ssh_client.create_directory(remote_folder)
-        if create_success:
-            print("✅ Carpeta creada")
+        print(f"   Directorio home: {preflight['home'] or '(desconocido)'}")
+        if preflight['created']:
+            print("✅ La carpeta no existía y se ha creado")
+        elif preflight['exists']:
+            print("✅ La carpeta existe")
         else:
-            print(f"❌ No se pudo crear: {create_msg}")
+            print("❌ La carpeta NO existe y no se pudo crear")
+        
+        if preflight['exists']:
+            if preflight['writable']:
+                print("✅ La carpeta tiene permisos de escritura")
+            else:
+                print("❌ La carpeta NO tiene permisos de escritura")
+                print("   Solución: chmod 755 en el servidor")
+        
+        if not preflight['sha256sum']:
+            print("⚠️ El servidor no tiene sha256sum: no se podrán verificar las subidas")
     
     # Verificar espacio en disco
     print(f"\n4. Verificando espacio en disco...")
-    stdin, stdout, stderr = ssh_client.client.exec_command(f'df -h "{remote_folder}"')
-    disk_info = stdout.read().decode()
-    print(disk_info)
+    if preflight and preflight['free_bytes'] is not None:
+        print(f"   Libre: {preflight['free_bytes'] / 1024 / 1024 / 1024:.2f} GB")
+    else:
+        print("⚠️ No se pudo obtener el espacio libre")
     
     # Probar subida de archivo pequeño si se proporciona
     if test_file_path:
@@ -93,6 +93,7 @@ def test_ssh_upload(host, port, username, password, key_file, remote_folder, tes
         else:
             print(f"⚠️ Archivo de prueba no encontrado: {test_file_path}")
     
+    print(f"\nComandos remotos ejecutados: {ssh_client.round_trips}")
     ssh_client.disconnect()
     print("\n" + "=" * 50)
     print("✅ Diagnóstico completado")
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de sesiones SSH compartidas entre trabajos, pruebas y el explorador remoto
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import paramiko
+
+from config import (
+    SSH_POOL_IDLE_TIMEOUT, SSH_POOL_KEEPALIVE,
+    SSH_POOL_HEALTH_CHECK_AFTER, SSH_POOL_MAX_CHANNELS
+)
+
+
+class PooledSession:
+    """Sesión SSH autenticada que varios usuarios comparten abriendo canales"""
+
+    def __init__(self, key: tuple, client: paramiko.SSHClient):
+        self.key = key
+        self.client = client
+        self.leases = 0
+        # Resultados de SSHClient.preflight por carpeta, válidos mientras dure la sesión
+        self.preflight = {}
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    @property
+    def transport(self) -> Optional[paramiko.Transport]:
+        return self.client.get_transport()
+
+    def is_active(self) -> bool:
+        """True si el transporte sigue abierto (sin ida y vuelta al servidor)"""
+        transport = self.transport
+        return bool(transport and transport.is_active() and transport.is_authenticated())
+
+    def is_healthy(self) -> bool:
+        """
+        Comprueba que el servidor responde abriendo y cerrando un canal
+
+        Returns:
+            bool: True si la sesión se puede reutilizar
+        """
+        if not self.is_active():
+            return False
+        try:
+            channel = self.transport.open_session(timeout=5)
+            channel.close()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """Cierra la conexión"""
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """
+    Pool de conexiones SSH por (host, puerto, usuario, clave)
+
+    Cada sesión es un único transporte autenticado; quien la usa abre sus
+    propios canales (SFTP, exec) sobre él, así que el TCP, el intercambio de
+    claves y la autenticación se pagan una sola vez por servidor. Las sesiones
+    envían keepalives, se comprueban antes de reutilizarse si llevan un rato
+    sin uso y se cierran cuando pasan SSH_POOL_IDLE_TIMEOUT segundos libres.
+    """
+
+    def __init__(self, idle_timeout: float = SSH_POOL_IDLE_TIMEOUT,
+                 keepalive: int = SSH_POOL_KEEPALIVE,
+                 max_channels: int = SSH_POOL_MAX_CHANNELS):
+        """
+        Inicializa el pool
+
+        Args:
+            idle_timeout: Segundos sin uso antes de cerrar una sesión
+            keepalive: Segundos entre keepalives (0 = desactivados)
+            max_channels: Usuarios simultáneos por sesión; si se supera se abre otra
+        """
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.max_channels = max(1, max_channels)
+        self._sessions: Dict[tuple, List[PooledSession]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._reaper = None
+
+    @staticmethod
+    def make_key(host: str, port: int, username: str,
+                 password: Optional[str] = None, key_file: Optional[str] = None) -> tuple:
+        """
+        Clave de una sesión
+
+        La contraseña entra como huella: una sesión abierta con otra contraseña
+        no debe servir para validar credenciales distintas.
+        """
+        secret = hashlib.sha256(password.encode()).hexdigest() if password else None
+        key_path = os.path.abspath(os.path.expanduser(key_file)) if key_file else None
+        return (host, int(port), username, key_path, secret)
+
+    def acquire(self, host: str, port: int, username: str,
+                password: Optional[str] = None,
+                key_file: Optional[str] = None,
+                exclude: Optional[list] = None) -> PooledSession:
+        """
+        Obtiene una sesión autenticada, reutilizando una existente si es posible
+
+        Args:
+            host: Dirección del servidor
+            port: Puerto SSH
+            username: Nombre de usuario
+            password: Contraseña (opcional si se usa clave)
+            key_file: Ruta al archivo de clave privada (opcional)
+            exclude: Sesiones que no se deben devolver (para repartir una
+                transferencia entre varias conexiones TCP)
+
+        Returns:
+            PooledSession: Sesión prestada (devolverla con release)
+
+        Raises:
+            paramiko.AuthenticationException, paramiko.SSHException, OSError:
+                si no se puede abrir una sesión nueva
+        """
+        key = self.make_key(host, port, username, password, key_file)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Un lock por servidor: dos trabajos que arrancan a la vez comparten
+        # la misma conexión en vez de abrir dos
+        with key_lock:
+            session = self._lease_existing(key, exclude or [])
+            if session:
+                return session
+
+            client = self._open_client(host, port, username, password, key_file)
+            session = PooledSession(key, client)
+            session.leases = 1
+            with self._lock:
+                self._sessions.setdefault(key, []).append(session)
+                self._start_reaper()
+            return session
+
+    def release(self, session: PooledSession):
+        """Devuelve una sesión al pool (sigue abierta para el siguiente uso)"""
+        with self._lock:
+            session.leases = max(0, session.leases - 1)
+            session.last_used = time.time()
+        if not session.is_active():
+            self._discard(session)
+
+    def discard(self, session: PooledSession):
+        """Saca del pool y cierra una sesión que ha fallado"""
+        self._discard(session)
+
+    def close_all(self):
+        """Cierra todas las sesiones"""
+        with self._lock:
+            sessions = [s for group in self._sessions.values() for s in group]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> dict:
+        """
+        Estado del pool
+
+        Returns:
+            dict: {'sessions': sesiones abiertas, 'leases': préstamos en curso}
+        """
+        with self._lock:
+            sessions = [s for group in self._sessions.values() for s in group]
+            return {
+                'sessions': len(sessions),
+                'leases': sum(s.leases for s in sessions),
+            }
+
+    def _lease_existing(self, key: tuple, exclude: list) -> Optional[PooledSession]:
+        """Presta una sesión abierta con canales libres (requiere el lock del servidor)"""
+        with self._lock:
+            candidates = [
+                s for s in self._sessions.get(key, [])
+                if s.leases < self.max_channels and not any(s is e for e in exclude)
+            ]
+            candidates.sort(key=lambda s: s.leases)
+
+        for session in candidates:
+            idle = time.time() - session.last_used
+            healthy = session.is_active() if session.leases or idle < SSH_POOL_HEALTH_CHECK_AFTER \
+                else session.is_healthy()
+            if not healthy:
+                self._discard(session)
+                continue
+            with self._lock:
+                # El reaper puede haberla cerrado mientras se comprobaba
+                if session not in self._sessions.get(key, []):
+                    continue
+                session.leases += 1
+                session.last_used = time.time()
+            return session
+        return None
+
+    def _open_client(self, host, port, username, password, key_file) -> paramiko.SSHClient:
+        """Abre y autentica una conexión nueva"""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        try:
+            # Intentar con clave privada primero
+            if key_file and os.path.exists(key_file):
+                try:
+                    client.connect(
+                        hostname=host,
+                        port=port,
+                        username=username,
+                        key_filename=key_file,
+                        timeout=10
+                    )
+                except Exception as e:
+                    # Si falla con clave, intentar con contraseña
+                    if password:
+                        client.connect(
+                            hostname=host,
+                            port=port,
+                            username=username,
+                            password=password,
+                            timeout=10
+                        )
+                    else:
+                        raise e
+            elif password:
+                # Conectar con contraseña
+                client.connect(
+                    hostname=host,
+                    port=port,
+                    username=username,
+                    password=password,
+                    timeout=10
+                )
+            else:
+                # Intentar con clave por defecto
+                client.connect(
+                    hostname=host,
+                    port=port,
+                    username=username,
+                    timeout=10
+                )
+        except Exception:
+            client.close()
+            raise
+
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        return client
+
+    def _discard(self, session: PooledSession):
+        """Quita una sesión del pool y la cierra"""
+        with self._lock:
+            group = self._sessions.get(session.key, [])
+            if session in group:
+                group.remove(session)
+            if not group:
+                self._sessions.pop(session.key, None)
+        session.close()
+
+    def _start_reaper(self):
+        """Arranca el hilo que cierra sesiones inactivas (requiere el lock)"""
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self):
+        """Cierra sesiones libres que superan el tiempo de inactividad o están caídas"""
+        interval = max(1.0, min(self.idle_timeout / 4, 30))
+        while True:
+            time.sleep(interval)
+            now = time.time()
+            with self._lock:
+                sessions = [s for group in self._sessions.values() for s in group]
+                expired = [
+                    s for s in sessions
+                    if s.leases == 0 and (now - s.last_used > self.idle_timeout or not s.is_active())
+                ]
+                # Se quitan con el lock tomado para que nadie las preste mientras se cierran
+                for session in expired:
+                    group = self._sessions[session.key]
+                    group.remove(session)
+                    if not group:
+                        del self._sessions[session.key]
+                finished = not self._sessions
+                if finished:
+                    # El pool queda vacío: el hilo termina y se vuelve a crear si hace falta
+                    self._reaper = None
+            for session in expired:
+                session.close()
+            if finished:
+                return
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_ssh_pool() -> SSHConnectionPool:
+    """
+    Obtiene el pool de conexiones compartido del proceso
+
+    Returns:
+        SSHConnectionPool: Instancia única
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SSHConnectionPool()
+        return _default_pool